@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from fake_sheets import FakeSheetsService
+import request_scheduler
+from google_sheets_to_json_batch_oauth import get_sheet_data, export_to_json
+from json_splitter import split_json_file, split_sheets_data, add_split_arguments, split_options_from_args
+
+# 设置控制台输出编码为UTF-8
+if sys.platform == 'win32':
+    # 使用更安全的方式设置编码
+    try:
+        import codecs
+        # 检查sys.stdout是否已经是TextIOWrapper
+        if hasattr(sys.stdout, 'buffer'):
+            sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+            sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    except Exception as e:
+        print(f"设置控制台编码时出错: {e}")
+
+# 基准测试使用的表格ID和表格名称
+BENCHMARK_SPREADSHEET_ID = 'benchmark'
+BENCHMARK_TABLE_NAME = 'Bench'
+
+# 默认的结果输出目录
+DEFAULT_RESULT_DIR = 'benchmark_results'
+
+# startup阶段在新进程中导入的模块（导出脚本的入口）
+STARTUP_MODULE = 'google_sheets_to_json_batch_oauth'
+
+# 生成的列按顺序循环使用这些类型（第一列固定为number类型的id）
+COLUMN_TYPES = ['number', 'float', 'bool', 'arraynumber', 'string', 'note']
+
+def generate_cell(field_type, rng):
+    """按字段类型生成一个单元格的值（与Sheets API以UNFORMATTED_VALUE返回的值类型一致）"""
+    if field_type == 'number':
+        return rng.randint(-1000, 100000)
+    if field_type == 'float':
+        return round(rng.uniform(0, 100), rng.choice((1, 2, 3)))
+    if field_type == 'bool':
+        return rng.random() < 0.5
+    if field_type == 'arraynumber':
+        return ','.join(str(rng.randint(0, 9999)) for _ in range(rng.randint(1, 5)))
+    if field_type == 'string':
+        return f"Text_{rng.randint(0, 500)}"
+    return f"备注 {rng.randint(0, 100)}"
+
+def generate_sheet_values(rows, columns, sparsity=0.2, seed=0):
+    """
+    生成一个工作表的values二维数组：标题行、字段类型行、字段描述行和数据行
+    
+    Args:
+        rows (int): 数据行数
+        columns (int): 列数（包含id列）
+        sparsity (float): 空单元格的比例（id列除外）
+        seed (int): 随机数种子，相同参数总是生成相同的数据
+    
+    Returns:
+        list: values二维数组，与Sheets API的返回一致（每行末尾的空单元格已去掉）
+    """
+    rng = random.Random(seed)
+    field_types = ['number'] + [COLUMN_TYPES[i % len(COLUMN_TYPES)] for i in range(columns - 1)]
+    headers = ['id'] + [f"{field_type}{i + 1}" for i, field_type in enumerate(field_types[1:])]
+    
+    values = [headers, field_types, [f"{header}的描述" for header in headers]]
+    for row_index in range(rows):
+        row = [row_index + 1]
+        for field_type in field_types[1:]:
+            row.append('' if rng.random() < sparsity else generate_cell(field_type, rng))
+        while row and row[-1] == '':
+            row.pop()
+        values.append(row)
+    return values
+
+def generate_workbook(sheets, rows, columns, sparsity=0.2, seed=0):
+    """
+    生成合成的表格数据
+    
+    Returns:
+        dict: {工作表名称: values二维数组}，可直接传给FakeSheetsService
+    """
+    return {f"Sheet{i + 1}": generate_sheet_values(rows, columns, sparsity, seed + i) for i in range(sheets)}
+
+def measure(func, repeat=1, trace_memory=True):
+    """
+    测量函数的耗时和峰值内存
+    
+    耗时取repeat次中最快的一次（不开启tracemalloc）；峰值内存额外运行一次并用tracemalloc统计，
+    只包含当前进程中本阶段新分配的内存
+    
+    Returns:
+        tuple: (最后一次的返回值, 耗时秒数, 峰值内存MB或None)
+    """
+    best_time = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start_time = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start_time
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+    
+    return result, best_time, peak_mb
+
+def import_in_subprocess(module_name=STARTUP_MODULE):
+    """在新的Python进程中导入模块，用于测量启动（导入）耗时，返回是否导入成功"""
+    result = subprocess.run([sys.executable, '-c', f"import {module_name}"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return result.returncode == 0
+
+def run_benchmark(sheets, rows, columns, sparsity=0.2, seed=0, repeat=1, trace_memory=True, **split_options):
+    """
+    在离线环境中依次测量启动、拉取、导出合并JSON、拆分JSON文件和内存拆分各阶段
+    
+    Args:
+        sheets (int): 工作表数量
+        rows (int): 每个工作表的数据行数
+        columns (int): 每个工作表的列数
+        sparsity (float): 空单元格的比例
+        seed (int): 随机数种子
+        repeat (int): 每个阶段的计时次数
+        trace_memory (bool): 是否统计峰值内存
+        **split_options: 传给split_sheets_data的拆分选项
+    
+    Returns:
+        dict: 基准测试结果
+    """
+    workbook = generate_workbook(sheets, rows, columns, sparsity, seed)
+    service = FakeSheetsService({BENCHMARK_SPREADSHEET_ID: workbook})
+    # 进程内的替身没有配额，不限制请求速率，避免重复计时的请求被令牌桶拖慢
+    request_scheduler.configure(requests_per_minute=None)
+    total_rows = sheets * rows
+    
+    stages = {}
+    work_dir = Path(tempfile.mkdtemp(prefix='gg2json_benchmark_'))
+    json_file = work_dir / 'output' / f"{BENCHMARK_TABLE_NAME}.json"
+    
+    def record(name, func, rows=total_rows, memory=trace_memory):
+        result, seconds, peak_mb = measure(func, repeat, memory)
+        stages[name] = {
+            'seconds': round(seconds, 6),
+            'rows_per_sec': round(rows / seconds, 1) if seconds and rows else None,
+            'peak_memory_mb': round(peak_mb, 3) if peak_mb is not None else None
+        }
+        return result
+    
+    def split_file():
+        # 每次都从空目录开始，测量完整写出的耗时
+        shutil.rmtree(work_dir / 'file', ignore_errors=True)
+        return split_json_file(json_file, work_dir / 'file' / 'export', work_dir / 'file', **split_options)
+    
+    def split_memory():
+        shutil.rmtree(work_dir / 'memory', ignore_errors=True)
+        return split_sheets_data(data, BENCHMARK_TABLE_NAME, work_dir / 'memory' / 'export', work_dir / 'memory',
+                                 **split_options)
+    
+    try:
+        # 各阶段的进度输出与测量无关，全部丢弃
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            # 启动耗时与数据量无关，子进程的内存也不在tracemalloc的统计范围内
+            startup_ok = record('startup', import_in_subprocess, rows=0, memory=False)
+            data = record('fetch', lambda: get_sheet_data(service, BENCHMARK_SPREADSHEET_ID))
+            record('export_json', lambda: export_to_json(data, str(json_file), 'sheet_grouped'))
+            split_ok = record('split_file', split_file)
+            split_ok = record('split_memory', split_memory) and split_ok
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workbook': {'sheets': sheets, 'rows': rows, 'columns': columns, 'sparsity': sparsity, 'seed': seed},
+        'split_options': split_options,
+        'repeat': repeat,
+        'success': startup_ok and bool(data) and split_ok,
+        'stages': stages
+    }
+
+def print_report(report, baseline=None):
+    """打印各阶段的结果，提供基准结果时同时打印耗时变化"""
+    print(f"{'阶段':<14}{'耗时(秒)':>12}{'行/秒':>14}{'峰值内存(MB)':>16}{'对比基准':>12}")
+    for name, stage in report['stages'].items():
+        peak = f"{stage['peak_memory_mb']:.1f}" if stage['peak_memory_mb'] is not None else '-'
+        change = '-'
+        base_stage = (baseline or {}).get('stages', {}).get(name)
+        if base_stage and base_stage.get('seconds'):
+            change = f"{(stage['seconds'] / base_stage['seconds'] - 1) * 100:+.1f}%"
+        rows_per_sec = f"{stage['rows_per_sec']:.0f}" if stage['rows_per_sec'] else '-'
+        print(f"{name:<14}{stage['seconds']:>12.4f}{rows_per_sec:>14}{peak:>16}{change:>12}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='使用合成数据和进程内的Sheets API替身离线测量导出各阶段的性能')
+    parser.add_argument('--sheets', type=int, default=5, help='工作表数量，默认为5')
+    parser.add_argument('--rows', type=int, default=10000, help='每个工作表的数据行数，默认为10000')
+    parser.add_argument('--columns', type=int, default=12, help='每个工作表的列数，默认为12')
+    parser.add_argument('--sparsity', type=float, default=0.2, help='空单元格的比例，默认为0.2')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段的计时次数，取最快的一次，默认为3')
+    parser.add_argument('--no-memory', action='store_true', help='不统计峰值内存（可以缩短测试时间）')
+    parser.add_argument('--output', help=f'结果JSON文件路径，默认写入{DEFAULT_RESULT_DIR}目录')
+    parser.add_argument('--compare', help='与之前保存的结果JSON文件对比')
+    add_split_arguments(parser)
+    args = parser.parse_args()
+    
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except Exception as e:
+            print(f"读取基准结果 {args.compare} 时出错: {e}")
+            return 1
+    
+    print(f"正在测试: {args.sheets} 个工作表 × {args.rows} 行 × {args.columns} 列")
+    report = run_benchmark(args.sheets, args.rows, args.columns, args.sparsity, args.seed, args.repeat,
+                           not args.no_memory, **split_options_from_args(args))
+    print_report(report, baseline)
+    
+    output_file = Path(args.output or Path(DEFAULT_RESULT_DIR) / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output_file.parent.mkdir(exist_ok=True, parents=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到: {output_file}")
+    
+    if not report['success']:
+        print("警告: 部分阶段执行失败，结果可能不准确")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
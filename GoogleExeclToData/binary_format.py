@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import struct
+
+# 二进制配置文件的文件头标识
+BINARY_MAGIC = b'GGB1'
+
+# 二进制配置文件的扩展名（Unity会将.bytes文件导入为TextAsset）
+BINARY_EXTENSION = '.bytes'
+
+# 字段类型在二进制文件中的编码，未知类型按字符串处理（与convert_type_to_csharp一致）
+TYPE_CODES = {
+    'number': 1,
+    'float': 2,
+    'bool': 3,
+    'string': 4,
+    'arraynumber': 5,
+    'arraystring': 6,
+}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+_FLOAT = struct.Struct('<f')
+
+def binary_field_type(field_type):
+    """获取字段类型在二进制格式中使用的类型名称，未知类型按字符串处理"""
+    return field_type if field_type in TYPE_CODES else 'string'
+
+def split_array_string(value):
+    """
+    将arraystring单元格的值转换为字符串列表
+    
+    字符串按逗号分隔并去除首尾空白，与arraynumber的规则一致；列表中的元素转换为字符串
+    """
+    if isinstance(value, list):
+        return [item if isinstance(item, str) else str(item) for item in value]
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return [str(value)]
+
+def _write_varint(buffer, value):
+    """写入无符号变长整数"""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _write_int(buffer, value):
+    """写入ZigZag编码的有符号32位整数"""
+    _write_varint(buffer, ((value << 1) ^ (value >> 31)) & 0xFFFFFFFF)
+
+def _write_string(buffer, value):
+    """写入UTF-8字符串（字节长度 + 内容）"""
+    data = value.encode('utf-8')
+    _write_varint(buffer, len(data))
+    buffer.extend(data)
+
+def _to_int(value):
+    """将转换后的number值转换为整数，无法无损转换时抛出ValueError"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        result = value
+    elif isinstance(value, float) and value.is_integer():
+        result = int(value)
+    else:
+        raise ValueError(f"{value!r} 不是整数")
+    if not -2 ** 31 <= result < 2 ** 31:
+        raise ValueError(f"{value!r} 超出int范围")
+    return result
+
+def _write_value(buffer, field_type, value):
+    """按字段类型写入一个单元格的值"""
+    if field_type == 'number':
+        _write_int(buffer, _to_int(value))
+    elif field_type == 'float':
+        if isinstance(value, str):
+            raise ValueError(f"{value!r} 不是数字")
+        buffer.extend(_FLOAT.pack(float(value)))
+    elif field_type == 'bool':
+        if isinstance(value, str):
+            raise ValueError(f"{value!r} 不是布尔值")
+        buffer.append(1 if value else 0)
+    elif field_type == 'arraynumber':
+        items = value if isinstance(value, list) else [value]
+        _write_varint(buffer, len(items))
+        for item in items:
+            _write_int(buffer, _to_int(item))
+    elif field_type == 'arraystring':
+        items = split_array_string(value)
+        _write_varint(buffer, len(items))
+        for item in items:
+            _write_string(buffer, item)
+    else:
+        _write_string(buffer, value if isinstance(value, str) else str(value))
+
+def encode_sheet(rows, field_types, sheet_name=''):
+    """
+    将转换后的数据行编码为二进制格式
+    
+    文件结构：
+        文件头标识 GGB1
+        字段数量(varint)，每个字段：字段名(string) + 类型编码(byte)
+        行数(varint)，每行：字段存在位图((字段数量+7)/8字节) + 存在的字段值
+    
+    字段值编码：number为ZigZag varint，float为小端float32，bool为1字节，
+    string为varint字节长度+UTF-8内容，数组为varint元素数量+各元素
+    
+    Args:
+        rows (list): 转换后的数据行列表（已忽略note字段和空值）
+        field_types (dict): 字段类型行，note字段会被忽略
+        sheet_name (str): 工作表名称，仅用于错误信息
+    
+    Returns:
+        bytes: 二进制内容
+    """
+    fields = [(field_name, binary_field_type(field_type))
+              for field_name, field_type in field_types.items() if field_type != 'note']
+    
+    buffer = bytearray(BINARY_MAGIC)
+    _write_varint(buffer, len(fields))
+    for field_name, field_type in fields:
+        _write_string(buffer, field_name)
+        buffer.append(TYPE_CODES[field_type])
+    
+    _write_varint(buffer, len(rows))
+    presence_size = (len(fields) + 7) // 8
+    for row_index, row in enumerate(rows):
+        presence = bytearray(presence_size)
+        values = bytearray()
+        for field_index, (field_name, field_type) in enumerate(fields):
+            if field_name not in row:
+                continue
+            presence[field_index >> 3] |= 1 << (field_index & 7)
+            try:
+                _write_value(values, field_type, row[field_name])
+            except ValueError as e:
+                # 数据行从表格的第4行开始（标题行、类型行、描述行之后）
+                raise ValueError(f"工作表 {sheet_name} 第 {row_index + 4} 行字段 {field_name} 无法写入为 {field_type}: {e}")
+        buffer.extend(presence)
+        buffer.extend(values)
+    
+    return bytes(buffer)
+
+class _Reader:
+    """二进制配置文件的读取器，与生成的C#读取代码使用相同的格式"""
+    
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+    
+    def read_varint(self):
+        result = 0
+        shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+    
+    def read_int(self):
+        value = self.read_varint()
+        return (value >> 1) ^ -(value & 1)
+    
+    def read_string(self):
+        length = self.read_varint()
+        value = self.data[self.pos:self.pos + length].decode('utf-8')
+        self.pos += length
+        return value
+    
+    def read_value(self, field_type):
+        if field_type == 'number':
+            return self.read_int()
+        if field_type == 'float':
+            value = _FLOAT.unpack_from(self.data, self.pos)[0]
+            self.pos += 4
+            return value
+        if field_type == 'bool':
+            self.pos += 1
+            return self.data[self.pos - 1] != 0
+        if field_type == 'arraynumber':
+            return [self.read_int() for _ in range(self.read_varint())]
+        if field_type == 'arraystring':
+            return [self.read_string() for _ in range(self.read_varint())]
+        return self.read_string()
+
+def decode_sheet(data):
+    """
+    解码二进制配置文件
+    
+    Args:
+        data (bytes): encode_sheet生成的二进制内容
+    
+    Returns:
+        tuple: (字段类型字典, 数据行列表)
+    """
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError("不是有效的二进制配置文件")
+    
+    reader = _Reader(data)
+    reader.pos = len(BINARY_MAGIC)
+    
+    fields = []
+    for _ in range(reader.read_varint()):
+        field_name = reader.read_string()
+        fields.append((field_name, TYPE_NAMES[reader.data[reader.pos]]))
+        reader.pos += 1
+    
+    rows = []
+    presence_size = (len(fields) + 7) // 8
+    for _ in range(reader.read_varint()):
+        presence = reader.data[reader.pos:reader.pos + presence_size]
+        reader.pos += presence_size
+        row = {}
+        for field_index, (field_name, field_type) in enumerate(fields):
+            if presence[field_index >> 3] & (1 << (field_index & 7)):
+                row[field_name] = reader.read_value(field_type)
+        rows.append(row)
+    
+    return dict(fields), rows
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import argparse
+from json_splitter import make_field_converter, compile_field_converters, convert_rows
+
+# pandas为可选依赖，未安装时只能使用逐行转换
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+# 设置控制台输出编码为UTF-8
+if sys.platform == 'win32':
+    # 使用更安全的方式设置编码
+    try:
+        import codecs
+        # 检查sys.stdout是否已经是TextIOWrapper
+        if hasattr(sys.stdout, 'buffer'):
+            sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+            sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    except Exception as e:
+        print(f"设置控制台编码时出错: {e}")
+
+def columnar_available():
+    """是否可以使用基于pandas的列式转换"""
+    return pd is not None
+
+# 各字段类型下转换前后取值不变的单元格类型，这些单元格不需要逐个转换
+PASSTHROUGH_TYPES = {
+    'string': (str,),
+    'number': (int, float, bool),
+    'float': (float,),
+    'bool': (bool,),
+    'arraynumber': (list,),
+}
+
+def _convert_column(values, empty, field_type):
+    """
+    按列转换单元格的值
+    
+    同一类型、相同取值的单元格只转换一次：先按Python类型分组（避免1、1.0和True被当作同一个值），
+    再在每组内用pandas.factorize去重，转换去重后的值，最后按编码取回每个单元格的结果
+    
+    Args:
+        values (numpy.ndarray): object类型的单元格数组
+        empty (numpy.ndarray): 布尔数组，标记需要忽略的空单元格
+        field_type (str): 字段类型
+    
+    Returns:
+        list: 转换后的值列表（空单元格的位置保持原值）
+    """
+    convert = make_field_converter(field_type)
+    if convert is None:
+        return values.tolist()
+    
+    result = values.copy()
+    passthrough_types = PASSTHROUGH_TYPES.get(field_type, ())
+    cell_types = pd.Series(values).map(type).to_numpy()
+    for cell_type in pd.unique(cell_types[~empty]):
+        if cell_type in passthrough_types:
+            continue
+        
+        indexes = np.flatnonzero((cell_types == cell_type) & ~empty)
+        group = values[indexes]
+        
+        codes, uniques = pd.factorize(group)
+        converted = np.empty(len(uniques), dtype=object)
+        for i, unique_value in enumerate(uniques):
+            converted[i] = convert(unique_value)
+        result[indexes] = converted[codes]
+    
+    result = result.tolist()
+    
+    # 去重后多行会共用同一个列表对象，复制一份避免相互影响
+    if field_type == 'arraynumber':
+        result = [list(value) if isinstance(value, list) else value for value in result]
+    
+    return result
+
+def convert_rows_columnar(rows, field_types, headers=None):
+    """
+    使用pandas按列转换数据行，输出与json_splitter.convert_rows完全相同
+    
+    数据行的字段顺序需要与字段类型行一致（从Google表格拉取或由本工具导出的数据都满足该条件）
+    
+    Args:
+        rows (list): 数据行（字典）列表，不包含字段类型行和字段描述行
+        field_types (dict): 字段类型行，{字段名: 字段类型}
+        headers (tuple, optional): 数据行是与标题行等长的元组（SheetTable.rows）时的标题行
+    
+    Returns:
+        list: 转换后的数据行列表，已忽略note字段和空值
+    """
+    columns = [field_name for field_name, field_type in field_types.items() if field_type != 'note']
+    if not rows or not columns:
+        return [{} for _ in range(len(rows))]
+    
+    # 指定object类型，避免pandas把整数列推断为浮点数等改变单元格的值
+    if headers is not None:
+        # 元组行按列序号取值；标题重复时与dict(zip(headers, row))一样取最后一列
+        indexes = {}
+        for index, header in enumerate(headers):
+            indexes[header] = index
+        frame = pd.DataFrame(rows, dtype=object)
+        column_values = {field_name: frame[indexes[field_name]] for field_name in columns}
+    else:
+        frame = pd.DataFrame(rows, columns=columns, dtype=object)
+        column_values = {field_name: frame[field_name] for field_name in columns}
+    
+    converted_columns = []
+    empty_indexes = []
+    for field_name in columns:
+        values = column_values[field_name].to_numpy(dtype=object)
+        # 缺失的字段和None都视为空值，与空字符串一样忽略
+        empty = pd.isna(values) | (values == "")
+        converted_columns.append(_convert_column(values, empty, field_types[field_name]))
+        empty_indexes.append((field_name, np.flatnonzero(empty).tolist()))
+    
+    # 先整行组装字典（字段顺序与逐行转换一致），再删除空单元格
+    filtered_data = [dict(zip(columns, row_values)) for row_values in zip(*converted_columns)]
+    for field_name, indexes in empty_indexes:
+        for index in indexes:
+            del filtered_data[index][field_name]
+    
+    return filtered_data
+
+def benchmark_engines(rows, field_types, repeat=3):
+    """
+    测量两种转换方式的速度，并检查结果是否一致
+    
+    Args:
+        rows (list): 数据行列表
+        field_types (dict): 字段类型行
+        repeat (int): 重复次数，取最快的一次
+    
+    Returns:
+        dict: {'python': 每秒行数, 'pandas': 每秒行数或None, 'same': 结果是否一致}
+    """
+    def measure(convert):
+        best_time = None
+        result = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            result = convert()
+            elapsed = time.perf_counter() - start_time
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        return len(rows) / best_time if best_time else float('inf'), result
+    
+    python_speed, python_result = measure(lambda: convert_rows(rows, compile_field_converters(field_types)))
+    report = {'python': python_speed, 'pandas': None, 'same': True}
+    
+    if columnar_available():
+        pandas_speed, pandas_result = measure(lambda: convert_rows_columnar(rows, field_types))
+        report['pandas'] = pandas_speed
+        report['same'] = json.dumps(python_result, ensure_ascii=False) == json.dumps(pandas_result, ensure_ascii=False)
+    
+    return report
+
+def main():
+    """主函数 - 测量合并JSON文件中每个工作表两种转换方式的速度"""
+    parser = argparse.ArgumentParser(description='比较逐行转换与pandas列式转换的速度')
+    parser.add_argument('--input', required=True, help='输入JSON文件路径（按工作表分组的格式）')
+    parser.add_argument('--repeat', type=int, default=3, help='每种方式的重复次数')
+    args = parser.parse_args()
+    
+    if not columnar_available():
+        print("未安装pandas，无法测量列式转换")
+    
+    with open(args.input, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    for sheet_name, value in data.items():
+        if not isinstance(value, list) or len(value) < 3:
+            continue
+        rows = value[2:]
+        report = benchmark_engines(rows, value[0], args.repeat)
+        pandas_speed = f"{report['pandas']:.0f}" if report['pandas'] else '-'
+        print(f"{sheet_name}: {len(rows)} 行，逐行转换 {report['python']:.0f} 行/秒，"
+              f"列式转换 {pandas_speed} 行/秒，结果{'一致' if report['same'] else '不一致'}")
+    
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import hashlib
+from pathlib import Path
+
+# 清单文件名，保存在表格的数据文件目录中
+MANIFEST_FILE_NAME = 'manifest.json'
+
+def schema_fingerprint(field_types, key_field=None, data_format='json', interned=False):
+    """
+    工作表结构的指纹：字段名称和类型（不包括note字段）、主键以及数据文件的编码方式
+    
+    只修改数据行时指纹不变，增删字段、修改字段类型或主键、切换编码方式时指纹变化，
+    下游可以据此判断是否需要重新生成代码或重新构建依赖该结构的资源
+    
+    Args:
+        field_types (dict): 字段类型行
+        key_field (str, optional): 主键字段名
+        data_format (str): 数据文件格式，json或binary
+        interned (bool): string和arraystring字段是否写为字符串表序号
+    
+    Returns:
+        str: SHA-256哈希值
+    """
+    schema = {
+        'fields': [[field_name, field_type] for field_name, field_type in field_types.items() if field_type != 'note'],
+        'key': key_field,
+        'format': data_format,
+        'interned': interned
+    }
+    return hashlib.sha256(json.dumps(schema, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def load_manifest(manifest_file):
+    """
+    读取上一次写出的清单
+    
+    Returns:
+        dict: 清单内容，文件不存在或无法读取时为空
+    """
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def manifest_entry(content_hash, size, info=None):
+    """
+    清单中一个文件的记录
+    
+    Args:
+        content_hash (str): 文件内容（按字节）的SHA-256哈希值
+        size (int): 文件大小（字节）
+        info (dict, optional): {'sheet': 工作表名称, 'rows': 行数, 'schema': 结构指纹}，不属于某个工作表的文件没有这些信息
+    
+    Returns:
+        dict: {'hash', 'size', 'sheet', 'rows', 'schema'}
+    """
+    info = info or {}
+    return {
+        'hash': content_hash,
+        'size': size,
+        'sheet': info.get('sheet'),
+        'rows': info.get('rows'),
+        'schema': info.get('schema')
+    }
+
+def relative_name(file, root):
+    """文件相对于root的路径（使用/分隔），作为清单中的键"""
+    return Path(file).relative_to(root).as_posix()
+
+def dump_manifest(table_name, data_entries, code_entries):
+    """
+    清单文件的内容，所有键排序且不包含时间等会变化的信息，相同的输出总是生成相同的文本
+    
+    Args:
+        table_name (str): 表格名称
+        data_entries (dict): {相对于数据文件目录的路径: manifest_entry}
+        code_entries (dict): {相对于C#代码目录的路径: manifest_entry}
+    
+    Returns:
+        str: JSON文本
+    """
+    manifest = {'workbook': table_name, 'data': data_entries, 'code': code_entries}
+    return json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
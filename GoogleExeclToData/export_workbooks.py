@@ -0,0 +1,446 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from google_sheets_to_json_batch_oauth import (
+    load_credentials, build_services, get_revision_marker, request_revision_marker,
+    add_replay_arguments, create_recorder,
+    get_sheet_data, export_and_split, should_prune_columns, BATCH_GET_MAX_RANGES, DEFAULT_TOKEN_FILE
+)
+from fetch_cache import FetchCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from json_splitter import add_split_arguments, split_options_from_args
+import profiler
+from profiler import add_profile_arguments, profile_from_args
+import request_scheduler
+from request_scheduler import add_scheduler_arguments, configure_from_args, error_status
+
+# 设置控制台输出编码为UTF-8
+if sys.platform == 'win32':
+    # 使用更安全的方式设置编码
+    try:
+        import codecs
+        # 检查sys.stdout是否已经是TextIOWrapper
+        if hasattr(sys.stdout, 'buffer'):
+            sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+            sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    except Exception as e:
+        print(f"设置控制台编码时出错: {e}")
+
+# 默认的并发拉取线程数
+DEFAULT_WORKERS = 4
+
+# 监视模式默认的轮询间隔和配额紧张时退避的最大间隔（秒）
+DEFAULT_WATCH_INTERVAL = 30
+DEFAULT_WATCH_MAX_INTERVAL = 600
+
+def load_workbook_config(config_file, require_credentials=True):
+    """
+    读取多表格导出配置文件
+    
+    Args:
+        config_file (str): 配置文件路径（JSON格式）
+        require_credentials (bool): 是否要求配置凭证文件（回放时不需要）
+    
+    Returns:
+        dict: 配置内容，失败时返回None
+    """
+    config_path = Path(config_file)
+    if not config_path.exists():
+        print(f"错误: 配置文件 '{config_file}' 不存在")
+        return None
+    
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"读取配置文件 {config_file} 时出错: {e}")
+        return None
+    
+    if require_credentials and not config.get('credentials'):
+        print("错误: 配置文件中缺少'credentials'字段")
+        return None
+    
+    workbooks = config.get('workbooks')
+    if not workbooks:
+        print("错误: 配置文件中没有配置任何表格('workbooks')")
+        return None
+    
+    for index, workbook in enumerate(workbooks):
+        if not workbook.get('name') or not workbook.get('sheet_id'):
+            print(f"错误: 第 {index + 1} 个表格配置缺少'name'或'sheet_id'字段")
+            return None
+    
+    return config
+
+def select_workbooks(workbooks, targets):
+    """
+    按编号或名称选择需要导出的表格，与bcMerge.sh的参数规则一致
+    
+    Args:
+        workbooks (list): 配置中的表格列表
+        targets (list): 表格编号（从1开始，0表示全部）或名称（不区分大小写）
+    
+    Returns:
+        list: 选中的表格配置，存在无法识别的参数时返回None
+    """
+    if not targets or '0' in targets:
+        return list(workbooks)
+    
+    selected = []
+    for target in targets:
+        if target.isdigit():
+            index = int(target)
+            if index < 1 or index > len(workbooks):
+                print(f"参数错误: 表格编号 {target} 超出范围 1-{len(workbooks)}")
+                return None
+            workbook = workbooks[index - 1]
+        else:
+            matches = [w for w in workbooks if w['name'].lower() == target.lower()]
+            if not matches:
+                print(f"参数错误: 找不到名为 {target} 的表格")
+                return None
+            workbook = matches[0]
+        
+        if workbook not in selected:
+            selected.append(workbook)
+    
+    return selected
+
+def workbook_format(workbook):
+    """表格的导出格式：未配置时，指定了工作表的为list，否则为sheet_grouped"""
+    return workbook.get('format') or ('list' if workbook.get('sheet_name') else 'sheet_grouped')
+
+class FetchPool:
+    """
+    拉取表格的有界线程池，所有线程共用同一份凭证
+    
+    googleapiclient的服务对象底层的httplib2连接不是线程安全的，因此每个线程第一次拉取时各自创建服务，
+    之后在线程池的整个生命周期内复用；监视模式的每一轮都使用同一个线程池，不会重复创建线程和服务
+    """
+    
+    def __init__(self, creds, workers=DEFAULT_WORKERS, cache=None, recorder=None, replay_dir=None):
+        """
+        Args:
+            creds (Credentials): 已加载的OAuth 2.0凭证，回放时为None
+            workers (int): 最大并发线程数
+            cache (FetchCache, optional): 拉取缓存，使用缓存时每个线程同时创建Drive API服务
+            recorder (SheetsRecorder, optional): 录制器，所有请求的响应都会保存到录制目录
+            replay_dir (str, optional): 回放目录，指定时从录制的响应中读取数据
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._local = threading.local()
+        self._service_args = (creds, bool(cache), recorder, replay_dir)
+    
+    def services(self):
+        """
+        当前线程的服务对象，第一次调用时创建
+        
+        Returns:
+            tuple: (Sheets API服务, Drive API服务)，参见build_services
+        """
+        if not hasattr(self._local, 'service'):
+            self._local.service, self._local.drive_service = build_services(*self._service_args)
+        return self._local.service, self._local.drive_service
+    
+    def shutdown(self):
+        """等待正在进行的拉取完成并结束所有线程"""
+        self.executor.shutdown()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+def fetch_workbooks(creds, workbooks, workers=DEFAULT_WORKERS, batch_size=BATCH_GET_MAX_RANGES, cache=None,
+                    recorder=None, replay_dir=None, markers=None, prune_columns=None, pool=None):
+    """
+    使用有界线程池并发拉取多个表格的数据，所有线程共用同一份凭证
+    
+    Args:
+        creds (Credentials): 已加载的OAuth 2.0凭证，回放时为None
+        workbooks (list): 需要拉取的表格配置
+        workers (int): 最大并发线程数
+        batch_size (int): 每个values.batchGet请求最多包含的工作表数量
+        cache (FetchCache, optional): 拉取缓存，为None时不使用缓存
+        recorder (SheetsRecorder, optional): 录制器，所有请求的响应都会保存到录制目录
+        replay_dir (str, optional): 回放目录，指定时从录制的响应中读取数据
+        markers (dict, optional): 已经获取的修改标记，{表格ID: 修改标记}，其中的表格不再重复请求
+        prune_columns (callable, optional): 接收表格配置，返回是否按列裁剪拉取该表格
+        pool (FetchPool, optional): 复用的线程池，为None时创建只用于本次拉取的线程池
+    
+    Yields:
+        tuple: 按完成顺序返回(表格配置, 表格数据或None)
+    """
+    def fetch(workbook):
+        service, drive_service = pool.services()
+        if not service:
+            return None
+        
+        start_time = time.time()
+        print(f"正在拉取: {workbook['name']} (ID: {workbook['sheet_id']})")
+        with profiler.stage('workbook.fetch', workbook=workbook['name']):
+            marker = None
+            if cache:
+                marker = (markers or {}).get(workbook['sheet_id']) or get_revision_marker(drive_service,
+                                                                                         workbook['sheet_id'])
+            data = get_sheet_data(service, workbook['sheet_id'], workbook.get('sheet_name'), batch_size,
+                                  cache, marker, bool(prune_columns and prune_columns(workbook)))
+        print(f"拉取完成: {workbook['name']}，耗时 {time.time() - start_time:.2f} 秒")
+        return data
+    
+    own_pool = pool is None
+    if own_pool:
+        pool = FetchPool(creds, workers, cache, recorder, replay_dir)
+    try:
+        futures = {pool.executor.submit(fetch, workbook): workbook for workbook in workbooks}
+        for future in as_completed(futures):
+            workbook = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"拉取表格 {workbook['name']} 时出错: {e}")
+                data = None
+            yield workbook, data
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+def export_workbook(workbook, data, config, split=True, **split_options):
+    """
+    将已拉取的表格数据导出为JSON，并执行拆分和代码生成
+    
+    Args:
+        workbook (dict): 表格配置
+        data (dict|list): 表格数据
+        config (dict): 完整配置，提供输出目录等公共参数
+        split (bool): 是否拆分JSON文件
+        **split_options: 传给split_sheets_data的拆分选项
+    
+    Returns:
+        bool: 是否成功
+    """
+    name = workbook['name']
+    output_file = workbook.get('output') or f"output/{name}.json"
+    format_type = workbook_format(workbook)
+    key_field = workbook.get('key_field')
+    
+    if format_type == 'nested' and not key_field:
+        print(f"错误: 表格 {name} 使用嵌套格式但未指定key_field")
+        return False
+    
+    with profiler.stage('workbook.export', workbook=name):
+        return export_and_split(data, output_file, format_type, key_field, split,
+                                config.get('output_dir'), config.get('output_script_dir'),
+                                config.get('write_json', False), **split_options)
+
+def fetch_workers(config, args):
+    """并发拉取的线程数：命令行参数优先，其次是配置中的workers"""
+    return args.workers or config.get('workers') or DEFAULT_WORKERS
+
+def export_fetched_workbooks(creds, workbooks, config, args, cache=None, recorder=None, markers=None, pool=None):
+    """
+    拉取并导出表格：拉取在线程池中并发进行，拆分和代码生成在主线程中按拉取完成的顺序依次执行
+    
+    Args:
+        markers (dict, optional): 已经获取的修改标记，参见fetch_workbooks
+        pool (FetchPool, optional): 复用的线程池，参见fetch_workbooks
+    
+    Returns:
+        list: 导出失败的表格名称
+    """
+    workers = fetch_workers(config, args)
+    
+    def prune_columns(workbook):
+        return should_prune_columns(workbook_format(workbook), not args.no_split, config.get('write_json', False),
+                                    args.no_prune_columns)
+    
+    failed = []
+    for workbook, data in fetch_workbooks(creds, workbooks, workers, args.batch_size, cache, recorder, args.replay,
+                                          markers, prune_columns, pool):
+        name = workbook['name']
+        if data and export_workbook(workbook, data, config, not args.no_split, **split_options_from_args(args)):
+            print(f"✓ 成功导出: {name}")
+        else:
+            print(f"✗ 导出失败: {name}")
+            failed.append(name)
+        print("----------------------------------------")
+    return failed
+
+def is_quota_error(error):
+    """请求失败是否因为配额或频率限制（HTTP 429，或原因为频率限制的403）"""
+    status = error_status(error)
+    return status == 429 or (status == 403 and 'rate' in str(error).lower())
+
+def poll_revision_markers(drive_service, workbooks):
+    """
+    获取每个表格当前的修改标记（每个表格ID只请求一次）
+    
+    Returns:
+        tuple: ({表格ID: 修改标记}, 是否遇到了配额限制)；遇到配额限制时停止本轮剩余的请求
+    """
+    markers = {}
+    for sheet_id in dict.fromkeys(workbook['sheet_id'] for workbook in workbooks):
+        try:
+            markers[sheet_id] = request_revision_marker(drive_service, sheet_id)
+        except Exception as e:
+            if is_quota_error(e):
+                print(f"获取修改标记时触发配额限制，将延长轮询间隔: {e}")
+                return markers, True
+            print(f"获取表格 {sheet_id} 的修改标记失败: {e}")
+    return markers, False
+
+def next_poll_interval(interval, backoff, base_interval, max_interval):
+    """需要退避时轮询间隔加倍（不超过最大间隔），否则逐步缩短回基础间隔"""
+    if backoff:
+        return min(interval * 2, max_interval)
+    return max(base_interval, interval / 2)
+
+def watch_workbooks(creds, workbooks, config, args, cache=None, recorder=None):
+    """
+    持续监视表格的修改标记，只重新拉取和导出修改过的表格，按Ctrl+C结束
+    
+    每轮只对每个表格发出一次Drive API的元数据请求；第一轮会导出所有表格。
+    轮询遇到配额限制或导出失败时延长轮询间隔，导出失败的表格在下一轮重试
+    
+    Returns:
+        int: 进程退出码
+    """
+    # 凭证和Drive API服务在整个监视期间保持不变
+    _, drive_service = build_services(creds, True, recorder, args.replay)
+    if not drive_service:
+        print("错误: 监视模式需要通过Drive API读取表格的修改标记")
+        return 1
+    
+    if args.interval <= 0:
+        print("错误: --interval必须大于0")
+        return 1
+    interval = args.interval
+    max_interval = max(args.max_interval, args.interval)
+    exported_markers = {}
+    print(f"开始监视 {len(workbooks)} 个表格，轮询间隔 {interval} 秒，按Ctrl+C结束")
+    
+    # 拉取线程和每个线程的服务对象在整个监视期间复用
+    pool = FetchPool(creds, fetch_workers(config, args), cache, recorder, args.replay)
+    try:
+        while True:
+            markers, throttled = poll_revision_markers(drive_service, workbooks)
+            changed = [workbook for workbook in workbooks
+                       if workbook['sheet_id'] in markers
+                       and markers[workbook['sheet_id']] != exported_markers.get(workbook['name'])]
+            
+            failed = []
+            if changed:
+                print(f"[{time.strftime('%H:%M:%S')}] 需要导出 {len(changed)} 个表格: "
+                      f"{', '.join(workbook['name'] for workbook in changed)}")
+                start_time = time.time()
+                failed = export_fetched_workbooks(creds, changed, config, args, cache, recorder, markers, pool)
+                for workbook in changed:
+                    if workbook['name'] not in failed:
+                        exported_markers[workbook['name']] = markers[workbook['sheet_id']]
+                if cache:
+                    cache.evict()
+                print(f"本轮导出完成，失败 {len(failed)} 个，耗时 {time.time() - start_time:.2f} 秒")
+            
+            new_interval = next_poll_interval(interval, throttled or bool(failed), args.interval, max_interval)
+            if new_interval != interval:
+                print(f"轮询间隔调整为 {new_interval:.0f} 秒")
+            interval = new_interval
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("已停止监视")
+    finally:
+        pool.shutdown()
+    
+    if recorder:
+        print(f"已记录 {recorder.count} 个API响应到: {args.record}")
+    return 0
+
+def main():
+    """主函数"""
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description='在单个进程中从Google Sheets批量导出多个表格')
+    parser.add_argument('targets', nargs='*', help='要导出的表格编号（从1开始，0表示全部）或名称，默认导出全部')
+    parser.add_argument('--config', default='workbooks.json', help='表格配置文件路径，默认为workbooks.json')
+    parser.add_argument('--workers', type=int, help=f'并发拉取的线程数，默认为配置中的workers或{DEFAULT_WORKERS}')
+    parser.add_argument('--no-split', action='store_true', help='不拆分JSON文件（默认会拆分）')
+    parser.add_argument('--batch-size', type=int, default=BATCH_GET_MAX_RANGES, help=f'每个values.batchGet请求最多包含的工作表数量，默认为{BATCH_GET_MAX_RANGES}')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'拉取缓存目录，默认为{DEFAULT_CACHE_DIR}')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // 1024 // 1024, help='拉取缓存的容量上限（MB）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用拉取缓存')
+    parser.add_argument('--refresh', action='store_true', help='忽略已有缓存，重新拉取所有数据并更新缓存')
+    parser.add_argument('--no-prune-columns', action='store_true', help='按工作表分组并拆分时，仍然拉取note列和标题行以外的列')
+    parser.add_argument('--watch', action='store_true', help='持续监视表格，只在表格被修改后重新导出，按Ctrl+C结束')
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help=f'监视模式的轮询间隔（秒），默认为{DEFAULT_WATCH_INTERVAL}')
+    parser.add_argument('--max-interval', type=float, default=DEFAULT_WATCH_MAX_INTERVAL,
+                        help=f'配额紧张时轮询间隔最多延长到的秒数，默认为{DEFAULT_WATCH_MAX_INTERVAL}')
+    add_split_arguments(parser)
+    add_replay_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_profile_arguments(parser)
+    
+    args = parser.parse_args()
+    
+    configure_from_args(args)
+    with profile_from_args(args):
+        return export_selected_workbooks(args)
+
+def export_selected_workbooks(args):
+    """
+    按命令行参数导出选择的表格
+    
+    Returns:
+        int: 进程退出码
+    """
+    config = load_workbook_config(args.config, require_credentials=not args.replay)
+    if not config:
+        return 1
+    
+    workbooks = select_workbooks(config['workbooks'], args.targets)
+    if not workbooks:
+        return 1
+    
+    workers = fetch_workers(config, args)
+    print(f"共选择了 {len(workbooks)} 个表格，并发线程数: {workers}")
+    
+    # 所有表格共用同一份凭证，只加载（必要时授权）一次；回放时不需要凭证
+    creds = None
+    if not args.replay:
+        creds = load_credentials(config['credentials'], config.get('token_file', DEFAULT_TOKEN_FILE))
+        if not creds:
+            return 1
+    recorder = create_recorder(args)
+    
+    # 录制时忽略已有缓存，确保所有工作表的响应都被记录下来
+    cache = None
+    if not args.no_cache:
+        cache = FetchCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, args.refresh or bool(args.record))
+    
+    if args.watch:
+        return watch_workbooks(creds, workbooks, config, args, cache, recorder)
+    
+    start_time = time.time()
+    failed = export_fetched_workbooks(creds, workbooks, config, args, cache, recorder)
+    
+    if cache:
+        cache.evict()
+    if recorder:
+        print(f"已记录 {recorder.count} 个API响应到: {args.record}")
+    request_scheduler.print_summary()
+    
+    print(f"全部导出完成！共 {len(workbooks)} 个表格，失败 {len(failed)} 个，总耗时 {time.time() - start_time:.2f} 秒")
+    if failed:
+        print(f"失败的表格: {', '.join(failed)}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import json
+import time
+from types import SimpleNamespace
+
+# A1表示法中范围部分的格式：A1:C10、A:C、1:2、A1
+A1_RANGE_PATTERN = re.compile(r'^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$')
+
+class FakeHttpError(Exception):
+    """模拟googleapiclient的HttpError，通过resp.status获取HTTP状态码"""
+    
+    def __init__(self, status, message=''):
+        super().__init__(f"<HttpError {status}: {message}>")
+        self.resp = SimpleNamespace(status=status)
+        self.status_code = status
+
+def column_index(letters):
+    """将列字母转换为从0开始的列序号，例如A为0、AA为26"""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def parse_a1_range(range_name):
+    """
+    解析A1表示法的范围
+    
+    Args:
+        range_name (str): 例如 'Sheet 1'!A1:C10、Sheet1!1:2、'Sheet'
+    
+    Returns:
+        tuple: (工作表名称, 起始行, 结束行, 起始列, 结束列)，行列都从0开始且包含结束位置，未限制时为None
+    """
+    if range_name.startswith("'"):
+        # 带引号的工作表名称中，两个单引号表示一个单引号
+        end = 1
+        while True:
+            end = range_name.index("'", end)
+            if range_name[end + 1:end + 2] == "'":
+                end += 2
+                continue
+            break
+        sheet_name = range_name[1:end].replace("''", "'")
+        rest = range_name[end + 1:]
+    else:
+        sheet_name, _, rest = range_name.partition('!')
+        rest = '!' + rest if rest else ''
+    
+    if not rest:
+        return sheet_name, None, None, None, None
+    if not rest.startswith('!'):
+        raise FakeHttpError(400, f"Unable to parse range: {range_name}")
+    
+    match = A1_RANGE_PATTERN.match(rest[1:].upper())
+    if not match or not any(match.groups()):
+        raise FakeHttpError(400, f"Unable to parse range: {range_name}")
+    
+    start_col, start_row, end_col, end_row = match.groups()
+    if match.group(3) is None and match.group(4) is None:
+        # 单个单元格或单行/单列
+        end_col, end_row = start_col, start_row
+    return (
+        sheet_name,
+        int(start_row) - 1 if start_row else None,
+        int(end_row) - 1 if end_row else None,
+        column_index(start_col) if start_col else None,
+        column_index(end_col) if end_col else None,
+    )
+
+def slice_values(values, start_row, end_row, start_col, end_col):
+    """
+    按范围截取工作表数据，并像Sheets API一样去掉每行末尾的空单元格和末尾的空行
+    """
+    rows = values[start_row or 0:None if end_row is None else end_row + 1]
+    result = []
+    for row in rows:
+        row = row[start_col or 0:None if end_col is None else end_col + 1]
+        while row and row[-1] in ('', None):
+            row = row[:-1]
+        result.append(list(row))
+    while result and not result[-1]:
+        result.pop()
+    return result
+
+class FakeRequest:
+    """模拟googleapiclient的HttpRequest，execute时才生成响应"""
+    
+    def __init__(self, service, method, build_response):
+        self.service = service
+        self.method = method
+        self.build_response = build_response
+    
+    def execute(self, http=None, num_retries=0):
+        self.service.requests.append(self.method)
+        if self.service.latency:
+            time.sleep(self.service.latency)
+        # 经过一次JSON序列化，与真实客户端解析响应的开销和返回的对象结构一致
+        return json.loads(json.dumps(self.build_response(), ensure_ascii=False))
+
+class FakeSheetsService:
+    """
+    进程内的Sheets API替身，支持spreadsheets().get、values().get和values().batchGet
+    
+    可以直接代替build_service返回的服务对象，用于基准测试和离线调试，不需要网络和凭证
+    """
+    
+    # 新建工作表的默认列数（A到Z）
+    DEFAULT_COLUMN_COUNT = 26
+    
+    def __init__(self, spreadsheets, latency=0.0, column_counts=None):
+        """
+        Args:
+            spreadsheets (dict): {表格ID: {工作表名称: values二维数组（第一行为标题行）}}
+            latency (float): 每个请求模拟的网络延迟（秒）
+            column_counts (dict, optional): {表格ID: {工作表名称: 列数}}，未指定时为默认列数和最宽的行中较大的一个
+        """
+        self.spreadsheets_data = spreadsheets
+        self.latency = latency
+        self.column_counts = column_counts or {}
+        # 按顺序记录每个已执行的请求，例如 'spreadsheets.get'、'values.batchGet'
+        self.requests = []
+    
+    def _workbook(self, spreadsheet_id):
+        if spreadsheet_id not in self.spreadsheets_data:
+            raise FakeHttpError(404, f"Requested entity was not found: {spreadsheet_id}")
+        return self.spreadsheets_data[spreadsheet_id]
+    
+    def _column_count(self, spreadsheet_id, sheet_name):
+        column_count = self.column_counts.get(spreadsheet_id, {}).get(sheet_name)
+        if column_count is None:
+            values = self._workbook(spreadsheet_id).get(sheet_name) or []
+            column_count = max([self.DEFAULT_COLUMN_COUNT] + [len(row) for row in values])
+        return column_count
+    
+    def _value_range(self, spreadsheet_id, range_name):
+        sheet_name, *bounds = parse_a1_range(range_name)
+        workbook = self._workbook(spreadsheet_id)
+        if sheet_name not in workbook:
+            raise FakeHttpError(400, f"Unable to parse range: {range_name}")
+        # 与Sheets API一样，范围的列超出表格网格时请求失败
+        if any(column is not None and column >= self._column_count(spreadsheet_id, sheet_name)
+               for column in bounds[2:]):
+            raise FakeHttpError(400, f"Range ({range_name}) exceeds grid limits")
+        value_range = {'range': range_name, 'majorDimension': 'ROWS'}
+        values = slice_values(workbook[sheet_name], *bounds)
+        if values:
+            value_range['values'] = values
+        return value_range
+    
+    def spreadsheets(self):
+        return _FakeSpreadsheets(self)
+
+class _FakeSpreadsheets:
+    def __init__(self, service):
+        self.service = service
+    
+    def get(self, spreadsheetId, fields=None, **kwargs):
+        def build_response():
+            sheets = [{'properties': {'title': title, 'index': index, 'gridProperties': {
+                          'columnCount': self.service._column_count(spreadsheetId, title)}}}
+                      for index, title in enumerate(self.service._workbook(spreadsheetId))]
+            return {'spreadsheetId': spreadsheetId, 'sheets': sheets}
+        return FakeRequest(self.service, 'spreadsheets.get', build_response)
+    
+    def values(self):
+        return _FakeValues(self.service)
+
+class _FakeValues:
+    def __init__(self, service):
+        self.service = service
+    
+    def get(self, spreadsheetId, range, **kwargs):
+        return FakeRequest(self.service, 'values.get',
+                           lambda: self.service._value_range(spreadsheetId, range))
+    
+    def batchGet(self, spreadsheetId, ranges, **kwargs):
+        def build_response():
+            return {
+                'spreadsheetId': spreadsheetId,
+                'valueRanges': [self.service._value_range(spreadsheetId, range_name) for range_name in ranges]
+            }
+        return FakeRequest(self.service, 'values.batchGet', build_response)
+
+class FakeDriveService:
+    """Drive API替身，只支持files().get，用于获取表格的修改标记"""
+    
+    def __init__(self, versions=None):
+        """
+        Args:
+            versions (dict, optional): {表格ID: 版本号}，修改版本号即模拟表格被修改
+        """
+        self.versions = versions if versions is not None else {}
+        self.requests = []
+        self.latency = 0.0
+    
+    def files(self):
+        return self
+    
+    def get(self, fileId, fields=None, **kwargs):
+        def build_response():
+            version = self.versions.get(fileId, 1)
+            return {'version': str(version), 'modifiedTime': f"2024-01-01T00:00:{version % 60:02d}.000Z"}
+        return FakeRequest(self, 'files.get', build_response)
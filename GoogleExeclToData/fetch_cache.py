@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# 默认的缓存目录（相对于当前工作目录）
+DEFAULT_CACHE_DIR = '.sheets_cache'
+# 默认的缓存容量上限（字节）
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# 保存工作表名称列表的索引文件名
+INDEX_FILE_NAME = 'index.json'
+
+class FetchCache:
+    """
+    按表格ID和工作表缓存Sheets API返回的原始values数据
+    
+    每个缓存条目都记录了表格的修改标记，只有标记与当前标记一致时才会命中。
+    缓存总大小超过上限时，按最近使用时间淘汰最旧的条目。
+    """
+    
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES, refresh=False):
+        """
+        Args:
+            cache_dir (str): 缓存目录路径
+            max_bytes (int): 缓存总大小上限（字节）
+            refresh (bool): 为True时忽略已有缓存，重新拉取并覆盖缓存
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+    
+    def _workbook_dir(self, spreadsheet_id):
+        return self.cache_dir / spreadsheet_id
+    
+    def _sheet_file(self, spreadsheet_id, sheet_name, variant=None):
+        # 工作表名称可能包含文件名中不允许的字符，使用哈希作为文件名；同一工作表的不同变体使用不同的文件
+        key = f"{sheet_name}\n{variant}" if variant else sheet_name
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self._workbook_dir(spreadsheet_id) / f"{digest}.json"
+    
+    def _read(self, path, marker):
+        """读取缓存文件，标记不一致或文件损坏时返回None"""
+        if self.refresh or not marker or not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"读取缓存文件 {path} 时出错: {e}")
+            return None
+        if entry.get('marker') != marker:
+            return None
+        # 更新访问时间，用于按最近使用时间淘汰
+        os.utime(path)
+        return entry
+    
+    def _write(self, path, entry):
+        """原子地写入缓存文件"""
+        path.parent.mkdir(exist_ok=True, parents=True)
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    def get_sheet_names(self, spreadsheet_id, marker):
+        """获取缓存的工作表名称列表，未命中时返回None"""
+        entry = self._read(self._workbook_dir(spreadsheet_id) / INDEX_FILE_NAME, marker)
+        return entry['sheets'] if entry else None
+    
+    def put_sheet_names(self, spreadsheet_id, marker, sheet_names):
+        """缓存工作表名称列表"""
+        if marker:
+            self._write(self._workbook_dir(spreadsheet_id) / INDEX_FILE_NAME,
+                        {'marker': marker, 'sheets': list(sheet_names)})
+    
+    def get(self, spreadsheet_id, sheet_name, marker, variant=None):
+        """
+        获取缓存的工作表原始values数据，未命中时返回None
+        
+        variant用于区分同一工作表按不同方式拉取的数据，例如按列裁剪拉取的数据
+        """
+        entry = self._read(self._sheet_file(spreadsheet_id, sheet_name, variant), marker)
+        if entry is None or entry.get('sheet') != sheet_name:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['values']
+    
+    def put(self, spreadsheet_id, sheet_name, marker, values, variant=None):
+        """缓存工作表原始values数据"""
+        if marker:
+            self._write(self._sheet_file(spreadsheet_id, sheet_name, variant),
+                        {'marker': marker, 'sheet': sheet_name, 'values': values})
+    
+    def evict(self):
+        """
+        按最近使用时间淘汰缓存文件，直到缓存总大小不超过上限
+        
+        Returns:
+            int: 删除的文件数量
+        """
+        if not self.cache_dir.exists():
+            return 0
+        
+        files = []
+        total_bytes = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            stat = path.stat()
+            files.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+        
+        removed = 0
+        for _, size, path in sorted(files):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total_bytes -= size
+                removed += 1
+            except Exception as e:
+                print(f"删除缓存文件 {path} 时出错: {e}")
+        
+        if removed:
+            print(f"已淘汰 {removed} 个缓存文件，当前缓存大小: {total_bytes / 1024 / 1024:.1f} MB")
+        return removed
@@ -7,12 +7,19 @@ import argparse
 import pickle
 import sys
 from pathlib import Path
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-import pandas as pd
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 # 导入JSON拆分模块
-from json_splitter import split_json_file, ensure_codegen_dir
+from json_splitter import (
+    split_json_file, split_sheets_data, resolve_output_paths, ensure_codegen_dir,
+    add_split_arguments, split_options_from_args, iter_json_rows
+)
+from fetch_cache import FetchCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from sheet_table import SheetTable, materialize_rows
+import profiler
+from profiler import add_profile_arguments, profile_from_args
+import request_scheduler
+from request_scheduler import authorized_http, add_scheduler_arguments, configure_from_args
 
 # 设置控制台输出编码为UTF-8
 if sys.platform == 'win32':
@@ -27,129 +34,594 @@ if sys.platform == 'win32':
         print(f"设置控制台编码时出错: {e}")
 
 # 定义访问Google Sheets所需的权限范围
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+# drive.metadata.readonly用于读取表格的修改标记（版本号），以便跳过未修改的表格
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly',
+          'https://www.googleapis.com/auth/drive.metadata.readonly']
 
-def setup_credentials(creds_file):
-    """设置Google Sheets API凭证（使用OAuth 2.0）"""
-    creds = None
-    token_file = 'token.pickle'
+# 单个values.batchGet请求最多包含的工作表范围数量
+BATCH_GET_MAX_RANGES = 50
+# 单个values.batchGet请求中范围参数编码后的最大总长度
+BATCH_GET_MAX_CHARS = 1500
+
+# 按列裁剪拉取时先读取的行（标题行和字段类型行），以及数据部分的起始行（字段描述行）
+HEADER_ROWS_RANGE = '1:2'
+DATA_START_ROW = 3
+# 按列裁剪拉取的数据在拉取缓存中的变体名称，与整表拉取的数据分开缓存
+# （早期版本裁剪拉取的数据可能缺少末尾的行，更换名称后不再使用这些缓存）
+PRUNED_CACHE_VARIANT = 'pruned-v2'
+# 标题行和字段类型行的行数
+HEADER_ROW_COUNT = DATA_START_ROW - 1
+
+# 默认保存已授权凭证的文件
+DEFAULT_TOKEN_FILE = 'token.pickle'
+# 凭证在过期前这么多秒内就提前刷新，避免导出过程中过期
+CREDENTIAL_REFRESH_MARGIN = 300
+
+# 进程内的凭证缓存，{token文件绝对路径: Credentials}，同一进程多次导出时不再重复读取和刷新
+_credentials_cache = {}
+
+def credentials_need_refresh(creds):
+    """凭证是否已经失效或即将过期"""
+    if not creds.valid:
+        return True
+    # expiry是不带时区的UTC时间，没有过期时间的凭证不需要刷新
+    if creds.expiry is None:
+        return False
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now < timedelta(seconds=CREDENTIAL_REFRESH_MARGIN)
+
+def credentials_have_scopes(creds):
+    """凭证是否包含SCOPES中的所有权限，旧版本保存的凭证可能缺少后来增加的权限"""
+    has_scopes = getattr(creds, 'has_scopes', None)
+    return has_scopes is None or has_scopes(SCOPES)
+
+def save_credentials(creds, token_file):
+    """保存凭证以供下次使用"""
+    try:
+        with open(token_file, 'wb') as token:
+            pickle.dump(creds, token)
+    except Exception as e:
+        print(f"保存凭证到 {token_file} 时出错: {e}")
+
+def load_credentials(creds_file, token_file=DEFAULT_TOKEN_FILE):
+    """
+    加载Google OAuth 2.0凭证，必要时刷新或重新授权
+    
+    凭证有效且不会很快过期时直接使用，不导入认证库也不访问网络；刷新后的凭证会写回token文件，
+    下次运行不需要再次刷新
+    
+    Args:
+        creds_file (str): OAuth 2.0客户端ID凭证JSON文件路径
+        token_file (str): 保存已授权凭证的文件路径
+    
+    Returns:
+        Credentials: 有效的凭证，失败时返回None
+    """
+    with profiler.stage('auth'):
+        return _load_credentials(creds_file, token_file)
+
+def _load_credentials(creds_file, token_file):
+    """load_credentials的实现，返回值相同"""
+    cache_key = os.path.abspath(token_file)
+    creds = _credentials_cache.get(cache_key)
     
     # 如果存在token文件，则加载已保存的凭证
-    if os.path.exists(token_file):
+    if creds is None and os.path.exists(token_file):
         with open(token_file, 'rb') as token:
             try:
                 creds = pickle.load(token)
             except:
                 print("加载保存的凭证失败，将重新授权")
+        
+        # 缺少权限的凭证刷新后仍然缺少权限，例如没有drive.metadata.readonly时读取修改标记会返回403
+        if creds and not credentials_have_scopes(creds):
+            print(f"保存的凭证缺少所需的权限（需要: {', '.join(SCOPES)}），将重新授权")
+            creds = None
     
-    # 如果没有有效凭证，则请求用户授权
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
+    if creds and credentials_need_refresh(creds):
+        if creds.refresh_token:
             try:
+                # 只在需要刷新时才导入认证库的HTTP传输
+                from google.auth.transport.requests import Request
                 creds.refresh(Request())
+                save_credentials(creds, token_file)
             except:
                 print("刷新凭证失败，将重新授权")
                 creds = None
+        elif not creds.valid:
+            creds = None
+    
+    # 如果没有有效凭证，则请求用户授权
+    if not creds:
+        try:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(creds_file, SCOPES)
+            creds = flow.run_local_server(port=0)
+        except Exception as e:
+            print(f"授权过程出错: {e}")
+            return None
         
-        if not creds:
-            try:
-                flow = InstalledAppFlow.from_client_secrets_file(creds_file, SCOPES)
-                creds = flow.run_local_server(port=0)
-            except Exception as e:
-                print(f"授权过程出错: {e}")
-                return None
-            
-            # 保存凭证以供下次使用
-            with open(token_file, 'wb') as token:
-                pickle.dump(creds, token)
+        save_credentials(creds, token_file)
     
+    _credentials_cache[cache_key] = creds
+    return creds
+
+def build_service(creds):
+    """使用已加载的凭证创建Google Sheets API服务，失败时返回None"""
     try:
-        # 创建Google Sheets API服务
-        service = build('sheets', 'v4', credentials=creds)
+        # 创建Google Sheets API服务：使用客户端库自带的发现文档，不请求网络，也不尝试读写发现文档缓存；
+        # 同一线程中的服务共用一个已授权的HTTP连接池
+        with profiler.stage('discovery', api='sheets'):
+            from googleapiclient.discovery import build
+            service = build('sheets', 'v4', http=authorized_http(creds), static_discovery=True, cache_discovery=False)
         return service
     except Exception as e:
         print(f"创建API服务失败: {e}")
         return None
 
-def get_sheet_data(service, spreadsheet_id, sheet_name=None):
-    """获取Google表格数据"""
+def build_drive_service(creds):
+    """使用已加载的凭证创建Google Drive API服务（只用于读取修改标记），失败时返回None"""
     try:
-        # 获取表格信息
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+        with profiler.stage('discovery', api='drive'):
+            from googleapiclient.discovery import build
+            return build('drive', 'v3', http=authorized_http(creds), static_discovery=True, cache_discovery=False)
+    except Exception as e:
+        print(f"创建Drive API服务失败: {e}")
+        return None
+
+def build_services(creds, with_drive=False, recorder=None, replay_dir=None):
+    """
+    创建拉取数据使用的Sheets API服务和Drive API服务
+    
+    Args:
+        creds (Credentials): 已加载的凭证，回放时不需要
+        with_drive (bool): 是否同时创建Drive API服务（用于读取修改标记）
+        recorder (SheetsRecorder, optional): 录制器，所有请求的响应都会保存到录制目录
+        replay_dir (str, optional): 回放目录，指定时从录制的响应中读取数据，不访问网络
+    
+    Returns:
+        tuple: (Sheets API服务, Drive API服务)，创建失败或不需要时为None
+    """
+    if replay_dir:
+        from sheets_replay import ReplaySheetsService, ReplayDriveService
+        try:
+            service = ReplaySheetsService(replay_dir)
+        except Exception as e:
+            print(f"读取回放目录时出错: {e}")
+            return None, None
+        return service, ReplayDriveService(replay_dir) if with_drive else None
+    
+    service = build_service(creds)
+    drive_service = build_drive_service(creds) if with_drive and service else None
+    if recorder:
+        from sheets_replay import recording_service
+        service = recording_service(service, recorder)
+        drive_service = recording_service(drive_service, recorder)
+    return service, drive_service
+
+def add_replay_arguments(parser):
+    """为命令行解析器添加录制和回放相关的参数"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='DIR', help='将Sheets API的原始响应保存到DIR，之后可以用--replay离线重新导出')
+    group.add_argument('--replay', metavar='DIR', help='从--record保存的响应中读取数据，不需要网络和凭证')
+
+def create_recorder(args):
+    """按命令行参数创建录制器，未指定--record时返回None"""
+    if not args.record:
+        return None
+    from sheets_replay import SheetsRecorder
+    print(f"将API响应记录到: {args.record}")
+    return SheetsRecorder(args.record)
+
+def request_revision_marker(drive_service, spreadsheet_id):
+    """获取表格的修改标记，与get_revision_marker相同，但请求失败时抛出异常"""
+    profiler.count('api.drive.files.get')
+    with profiler.stage('metadata', spreadsheet=spreadsheet_id, request='revision'):
+        result = request_scheduler.execute(drive_service.files().get(
+            fileId=spreadsheet_id,
+            fields='version,modifiedTime',
+            supportsAllDrives=True
+        ), 'files.get')
+    return f"{result.get('version')}:{result.get('modifiedTime')}"
+
+def get_revision_marker(drive_service, spreadsheet_id):
+    """
+    获取表格的修改标记，表格的任何修改都会改变该标记
+    
+    Args:
+        drive_service: Google Drive API服务
+        spreadsheet_id (str): 表格ID
+    
+    Returns:
+        str: 修改标记，无法获取时返回None（此时不使用缓存）
+    """
+    if not drive_service:
+        return None
+    try:
+        return request_revision_marker(drive_service, spreadsheet_id)
+    except Exception as e:
+        print(f"获取表格修改标记失败，将不使用缓存（如果是权限不足，请删除token.pickle后重新授权）: {e}")
+        return None
+
+def setup_credentials(creds_file):
+    """设置Google Sheets API凭证（使用OAuth 2.0）"""
+    creds = load_credentials(creds_file)
+    if not creds:
+        return None
+    return build_service(creds)
+
+def quote_sheet_range(sheet_name):
+    """将工作表名称转换为A1表示法的范围（加单引号，兼容空格和特殊字符）"""
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+def chunk_ranges(ranges, max_ranges=BATCH_GET_MAX_RANGES, max_chars=BATCH_GET_MAX_CHARS):
+    """
+    将范围列表按数量和编码后的总长度分批，避免单个batchGet请求过大
+    
+    Args:
+        ranges (list): A1表示法的范围列表
+        max_ranges (int): 每批最多包含的范围数量
+        max_chars (int): 每批范围参数编码后的最大总长度
+    
+    Returns:
+        list: 分批后的范围列表
+    """
+    chunks = []
+    current = []
+    current_chars = 0
+    for range_name in ranges:
+        # 每个范围在URL中以"&ranges=<编码后的范围>"的形式出现
+        range_chars = len(quote(range_name, safe='')) + len('&ranges=')
+        if current and (len(current) >= max_ranges or current_chars + range_chars > max_chars):
+            chunks.append(current)
+            current = []
+            current_chars = 0
+        current.append(range_name)
+        current_chars += range_chars
+    if current:
+        chunks.append(current)
+    return chunks
+
+def batch_get_ranges(service, spreadsheet_id, ranges, batch_size=BATCH_GET_MAX_RANGES):
+    """
+    使用values.batchGet分批获取多个范围的原始数据
+    
+    Args:
+        service: Google Sheets API服务
+        spreadsheet_id (str): 表格ID
+        ranges (list): A1表示法的范围列表
+        batch_size (int): 每个batchGet请求最多包含的范围数量
+    
+    Returns:
+        dict: 以范围为键、原始values二维数组为值的字典（保持传入顺序）
+    """
+    all_values = {}
+    for chunk in chunk_ranges(ranges, max_ranges=batch_size):
+        profiler.count('api.values.batchGet')
+        with profiler.stage('fetch', spreadsheet=spreadsheet_id, ranges=len(chunk)):
+            result = request_scheduler.execute(service.spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=chunk,
+                valueRenderOption='UNFORMATTED_VALUE'
+            ), 'values.batchGet')
         
+        # valueRanges与请求的ranges顺序一致
+        for range_name, value_range in zip(chunk, result.get('valueRanges', [])):
+            all_values[range_name] = value_range.get('values', [])
+    
+    return all_values
+
+def batch_get_values(service, spreadsheet_id, sheet_names, batch_size=BATCH_GET_MAX_RANGES):
+    """
+    使用values.batchGet分批获取多个工作表的原始数据
+    
+    Args:
+        service: Google Sheets API服务
+        spreadsheet_id (str): 表格ID
+        sheet_names (list): 工作表名称列表
+        batch_size (int): 每个batchGet请求最多包含的工作表数量
+    
+    Returns:
+        dict: 以工作表名称为键、原始values二维数组为值的字典（保持传入顺序）
+    """
+    ranges = [quote_sheet_range(sheet_name) for sheet_name in sheet_names]
+    range_values = batch_get_ranges(service, spreadsheet_id, ranges, batch_size)
+    
+    all_values = {}
+    for sheet_name, range_name in zip(sheet_names, ranges):
+        all_values[sheet_name] = range_values.get(range_name, [])
+        record_fetched_sheet(spreadsheet_id, sheet_name, all_values[sheet_name])
+    return all_values
+
+def column_letter(index):
+    """将从0开始的列序号转换为列字母，例如0为A、26为AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def kept_column_spans(headers, field_types):
+    """
+    计算拆分时会保留的列：标题行范围内、字段类型不是note的列
+    
+    Args:
+        headers (list): 标题行
+        field_types (list): 字段类型行（可能比标题行短）
+    
+    Returns:
+        list: 连续的列区间[(起始列, 结束列)]，列序号从0开始且包含结束列
+    """
+    spans = []
+    for index in range(len(headers)):
+        if index < len(field_types) and field_types[index] == 'note':
+            continue
+        if spans and spans[-1][1] == index - 1:
+            spans[-1] = (spans[-1][0], index)
+        else:
+            spans.append((index, index))
+    return spans
+
+def stitch_column_spans(header_rows, spans, span_values, row_count=None):
+    """
+    将按列区间分别拉取的数据拼接为values二维数组，结构与整表拉取相同，但只包含保留的列
+    
+    Args:
+        header_rows (list): 标题行和字段类型行（字段类型行为空时响应中只有标题行）
+        spans (list): 连续的列区间，参见kept_column_spans
+        span_values (list): 每个列区间从数据起始行开始拉取到的values
+        row_count (int, optional): 整表拉取时数据起始行之后的行数，默认为各列区间中最长的行数；
+            之后的行只在note列或标题行以外的列中有内容时，整表拉取仍然包含这些行
+    
+    Returns:
+        list: values二维数组，数据行末尾的空单元格已去掉
+    """
+    if row_count is None:
+        row_count = max((len(rows) for rows in span_values), default=0)
+    if row_count:
+        # 之后还有行时整表拉取的结果中一定有字段类型行（可能为空），数据行才能对齐到第三行
+        header_rows = list(header_rows) + [[]] * (HEADER_ROW_COUNT - len(header_rows))
+    rows = [[row[index] if index < len(row) else '' for start, end in spans for index in range(start, end + 1)]
+            for row in header_rows]
+    
+    for row_index in range(row_count):
+        row = []
+        for (start, end), span_rows in zip(spans, span_values):
+            # 每个列区间的响应都去掉了行末的空单元格，需要补齐到区间宽度才能接上下一个区间
+            cells = span_rows[row_index] if row_index < len(span_rows) else []
+            row.extend(cells)
+            row.extend([''] * (end - start + 1 - len(cells)))
+        rows.append(row)
+    
+    values = []
+    for row in rows:
+        while row and row[-1] == '':
+            row.pop()
+        values.append(row)
+    return values
+
+def get_column_counts(service, spreadsheet_id):
+    """
+    获取每个工作表的列数（表格网格的列数，不是有内容的列数）
+    
+    Returns:
+        dict: {工作表名称: 列数}，按工作表顺序
+    """
+    profiler.count('api.spreadsheets.get')
+    with profiler.stage('metadata', spreadsheet=spreadsheet_id, request='sheets'):
+        spreadsheet = request_scheduler.execute(service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(title,gridProperties.columnCount)'
+        ), 'spreadsheets.get')
+    return {sheet['properties']['title']: sheet['properties'].get('gridProperties', {}).get('columnCount')
+            for sheet in spreadsheet['sheets']}
+
+def batch_get_pruned_values(service, spreadsheet_id, sheet_names, batch_size=BATCH_GET_MAX_RANGES, column_counts=None):
+    """
+    按列裁剪分批获取多个工作表的数据：先读取所有工作表的标题行和字段类型行，
+    再只请求拆分时会保留的列，跳过note列和标题行以外的列
+    
+    保留的列的最后一行之后，再整行读取一次剩余的行：这些行只在跳过的列中有内容，
+    整表拉取时仍然存在（拆分为空对象），读取后结果的行数与整表拉取完全相同
+    
+    Args:
+        service: Google Sheets API服务
+        spreadsheet_id (str): 表格ID
+        sheet_names (list): 工作表名称列表
+        batch_size (int): 每个batchGet请求最多包含的范围数量
+        column_counts (dict, optional): 每个工作表的列数，参见get_column_counts，为None时单独请求
+    
+    Returns:
+        dict: 以工作表名称为键、只包含保留的列的values二维数组为值的字典（保持传入顺序）
+    """
+    header_ranges = [f"{quote_sheet_range(sheet_name)}!{HEADER_ROWS_RANGE}" for sheet_name in sheet_names]
+    header_values = batch_get_ranges(service, spreadsheet_id, header_ranges, batch_size)
+    
+    # {工作表名称: (标题行和字段类型行, 列区间, 数据范围列表)}
+    sheet_ranges = {}
+    data_ranges = []
+    for sheet_name, header_range in zip(sheet_names, header_ranges):
+        header_rows = header_values.get(header_range, [])
+        spans = kept_column_spans(header_rows[0], header_rows[1] if len(header_rows) > 1 else []) if header_rows else []
+        if spans:
+            ranges = [f"{quote_sheet_range(sheet_name)}!{column_letter(start)}{DATA_START_ROW}:{column_letter(end)}"
+                      for start, end in spans]
+        else:
+            # 标题行为空或所有列都是note时仍然整表拉取，保持拆分结果不变
+            ranges = [quote_sheet_range(sheet_name)]
+        sheet_ranges[sheet_name] = (header_rows, spans, ranges)
+        data_ranges.extend(ranges)
+    
+    data_values = batch_get_ranges(service, spreadsheet_id, data_ranges, batch_size)
+    
+    # 保留的列的最后一行之后的剩余行，整行读取到表格的最后一列
+    pruned_sheets = [sheet_name for sheet_name in sheet_names if sheet_ranges[sheet_name][1]]
+    if pruned_sheets and column_counts is None:
+        column_counts = get_column_counts(service, spreadsheet_id)
+    tail_ranges = {}
+    for sheet_name in pruned_sheets:
+        header_rows, spans, ranges = sheet_ranges[sheet_name]
+        span_rows = max(len(data_values.get(range_name, [])) for range_name in ranges)
+        last_column = max(column_counts.get(sheet_name) or 0, len(header_rows[0])) - 1
+        tail_ranges[sheet_name] = (span_rows, f"{quote_sheet_range(sheet_name)}!"
+                                              f"A{DATA_START_ROW + span_rows}:{column_letter(last_column)}")
+    tail_values = batch_get_ranges(service, spreadsheet_id, [tail_range for _, tail_range in tail_ranges.values()],
+                                   batch_size) if tail_ranges else {}
+    
+    all_values = {}
+    for sheet_name in sheet_names:
+        header_rows, spans, ranges = sheet_ranges[sheet_name]
+        if spans:
+            span_rows, tail_range = tail_ranges[sheet_name]
+            all_values[sheet_name] = stitch_column_spans(header_rows, spans,
+                                                         [data_values.get(range_name, []) for range_name in ranges],
+                                                         span_rows + len(tail_values.get(tail_range, [])))
+        else:
+            all_values[sheet_name] = data_values.get(ranges[0], [])
+        record_fetched_sheet(spreadsheet_id, sheet_name, all_values[sheet_name])
+    return all_values
+
+def record_fetched_sheet(spreadsheet_id, sheet_name, values):
+    """将拉取到的工作表的行数和单元格数计入性能报告"""
+    if profiler.get_profiler():
+        profiler.add_sheet_metrics(spreadsheet_id, sheet_name, fetched_rows=len(values),
+                                   fetched_cells=sum(len(row) for row in values))
+
+def values_to_dicts(values):
+    """将工作表的values二维数组转换为以第一行为标题的字典列表"""
+    headers = values[0]
+    data = []
+    for row in values[1:]:
+        # 确保行长度与标题行一致
+        row_data = row + [''] * (len(headers) - len(row))
+        data.append(dict(zip(headers, row_data)))
+    return data
+
+def values_to_table(values):
+    """
+    将工作表的values二维数组转换为SheetTable，标题行只保存一份，每行保存为元组
+    
+    没有字段描述行的工作表在拆分时原样写出，仍然转换为字典列表
+    
+    Returns:
+        SheetTable|list: 与values_to_dicts的结果一一对应
+    """
+    if len(values) < 3:
+        return values_to_dicts(values)
+    return SheetTable.from_values(values)
+
+def get_sheet_data(service, spreadsheet_id, sheet_name=None, batch_size=BATCH_GET_MAX_RANGES, cache=None, marker=None,
+                   prune_columns=False):
+    """
+    获取Google表格数据
+    
+    Args:
+        service: Google Sheets API服务
+        spreadsheet_id (str): 表格ID
+        sheet_name (str, optional): 工作表名称，为None时读取所有工作表
+        batch_size (int): 每个values.batchGet请求最多包含的工作表数量
+        cache (FetchCache, optional): 拉取缓存，为None时不使用缓存
+        marker (str, optional): 表格当前的修改标记，只有标记一致的缓存才会被使用
+        prune_columns (bool): 读取所有工作表时是否只拉取拆分时会保留的列，参见batch_get_pruned_values；
+            结果中不包含note列，因此只能用于按工作表分组并拆分的导出
+    
+    Returns:
+        SheetTable|list|dict: 单个工作表的数据，或按工作表名称分组的数据，失败时返回None；
+            工作表的数据参见values_to_table，需要字典时使用materialize_rows转换
+    """
+    try:
         # 如果未指定工作表名称，则读取所有工作表
         if not sheet_name:
-            all_sheets = []
-            for sheet in spreadsheet['sheets']:
-                all_sheets.append(sheet['properties']['title'])
-            return get_all_sheets_data(service, spreadsheet_id, all_sheets)
-        
-        # 获取工作表范围
-        range_name = f"{sheet_name}"
+            all_sheets = cache.get_sheet_names(spreadsheet_id, marker) if cache else None
+            # 工作表列表来自缓存时不知道列数，按列裁剪拉取时再单独请求
+            column_counts = None
+            
+            if all_sheets is None:
+                # 获取表格信息（工作表标题和列数，同一个请求）
+                column_counts = get_column_counts(service, spreadsheet_id)
+                all_sheets = list(column_counts)
+                
+                if cache:
+                    cache.put_sheet_names(spreadsheet_id, marker, all_sheets)
+            
+            return get_all_sheets_data(service, spreadsheet_id, all_sheets, batch_size, cache, marker, prune_columns,
+                                       column_counts)
         
-        # 获取数据
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueRenderOption='UNFORMATTED_VALUE'
-        ).execute()
+        values = cache.get(spreadsheet_id, sheet_name, marker) if cache else None
         
-        values = result.get('values', [])
+        if values is None:
+            # 获取工作表范围
+            range_name = quote_sheet_range(sheet_name)
+            
+            # 获取数据
+            profiler.count('api.values.get')
+            with profiler.stage('fetch', spreadsheet=spreadsheet_id, sheets=1):
+                result = request_scheduler.execute(service.spreadsheets().values().get(
+                    spreadsheetId=spreadsheet_id,
+                    range=range_name,
+                    valueRenderOption='UNFORMATTED_VALUE'
+                ), 'values.get')
+            
+            values = result.get('values', [])
+            record_fetched_sheet(spreadsheet_id, sheet_name, values)
+            
+            if cache:
+                cache.put(spreadsheet_id, sheet_name, marker, values)
         
         if not values:
             print('未找到数据')
             return None
         
-        # 将数据转换为字典列表
-        headers = values[0]
-        data = []
-        for row in values[1:]:
-            # 确保行长度与标题行一致
-            row_data = row + [''] * (len(headers) - len(row))
-            data.append(dict(zip(headers, row_data)))
-        
-        return data
+        # 将数据转换为紧凑的表格
+        return values_to_table(values)
     except Exception as e:
         print(f"获取表格数据错误: {e}")
         return None
 
-def get_all_sheets_data(service, spreadsheet_id, sheet_names):
-    """获取所有工作表的数据，并按工作表名称分组"""
+def get_all_sheets_data(service, spreadsheet_id, sheet_names, batch_size=BATCH_GET_MAX_RANGES, cache=None, marker=None,
+                        prune_columns=False, column_counts=None):
+    """获取所有工作表的数据，并按工作表名称分组（使用values.batchGet批量请求，命中缓存的工作表不再请求）"""
     all_data = {}
     
+    # 按列裁剪的数据与整表数据分开缓存
+    cache_variant = PRUNED_CACHE_VARIANT if prune_columns else None
+    all_values = {}
+    if cache:
+        for sheet_name in sheet_names:
+            values = cache.get(spreadsheet_id, sheet_name, marker, cache_variant)
+            if values is not None:
+                all_values[sheet_name] = values
+    
+    missing_sheets = [sheet_name for sheet_name in sheet_names if sheet_name not in all_values]
+    if cache:
+        profiler.count('cache.hits', len(all_values))
+        profiler.count('cache.misses', len(missing_sheets))
+    if cache and marker:
+        print(f"缓存命中 {len(all_values)} 个工作表，需要拉取 {len(missing_sheets)} 个工作表")
+    
+    if missing_sheets:
+        # 批量获取未命中缓存的工作表的原始数据，任何一批失败都会抛出异常，避免导出不完整的数据
+        if prune_columns:
+            fetched_values = batch_get_pruned_values(service, spreadsheet_id, missing_sheets, batch_size,
+                                                     column_counts)
+        else:
+            fetched_values = batch_get_values(service, spreadsheet_id, missing_sheets, batch_size)
+        for sheet_name, values in fetched_values.items():
+            all_values[sheet_name] = values
+            if cache:
+                cache.put(spreadsheet_id, sheet_name, marker, values, cache_variant)
+    
     for sheet_name in sheet_names:
-        try:
-            # 获取工作表范围
-            range_name = f"{sheet_name}"
-            
-            # 获取数据
-            result = service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range_name,
-                valueRenderOption='UNFORMATTED_VALUE'
-            ).execute()
-            
-            values = result.get('values', [])
-            
-            if not values:
-                print(f'工作表 {sheet_name} 未找到数据')
-                continue
-            
-            # 将数据转换为字典列表
-            headers = values[0]
-            sheet_data = []
-            for row in values[1:]:
-                # 确保行长度与标题行一致
-                row_data = row + [''] * (len(headers) - len(row))
-                # 创建包含数据的字典
-                row_dict = dict(zip(headers, row_data))
-                sheet_data.append(row_dict)
-            
-            # 将当前工作表的数据添加到总数据中，以工作表名称为键
-            all_data[sheet_name] = sheet_data
-            
-        except Exception as e:
-            print(f"获取工作表 {sheet_name} 数据错误: {e}")
+        # 转换后即释放原始的values，不同时保留两份数据
+        values = all_values.pop(sheet_name, None)
+        
+        if not values:
+            print(f'工作表 {sheet_name} 未找到数据')
+            continue
+        
+        # 将当前工作表的数据添加到总数据中，以工作表名称为键
+        all_data[sheet_name] = values_to_table(values)
     
     return all_data
 
@@ -163,7 +635,10 @@ def export_to_json(data, output_file, format_type="list", key_field=None):
     output_path = Path(output_file)
     output_path.parent.mkdir(exist_ok=True)
     
-    # 根据格式类型处理数据
+    # 根据格式类型处理数据；需要修改每行数据时才生成字典（修改的是新生成的字典，不影响原数据）
+    if format_type in ("list", "nested") or not isinstance(data, dict):
+        data = materialize_rows(data)
+    
     if format_type == "list":
         # 列表对象格式 - 默认
         # 如果数据是按工作表分组的字典，则将其展平为列表
@@ -186,7 +661,7 @@ def export_to_json(data, output_file, format_type="list", key_field=None):
                     item['sheet_name'] = sheet_name
                     flat_data.append(item)
             data = flat_data
-            
+        
         if not key_field or key_field not in data[0].keys():
             print(f"错误: 字段 '{key_field}' 不存在或未指定")
             return False
@@ -217,9 +692,94 @@ def export_to_json(data, output_file, format_type="list", key_field=None):
         print(f"不支持的格式类型: {format_type}")
         return False
     
-    # 写入JSON文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # 写入JSON文件；按工作表分组的数据逐行生成字典并写出（工作表名称都是字符串，与json.dump的结果相同）
+    with profiler.stage('export_json', file=output_path.name), open(output_file, 'w', encoding='utf-8') as f:
+        if format_type == "sheet_grouped" and all(isinstance(key, str) for key in json_data):
+            f.writelines(iter_grouped_json(json_data))
+        else:
+            json.dump(json_data, f, ensure_ascii=False, indent=2)
+    
+    return True
+
+def iter_grouped_json(data):
+    """
+    逐个工作表、逐行生成按工作表分组的JSON文本，拼接结果与json.dumps(data, ensure_ascii=False, indent=2)完全相同
+    
+    Args:
+        data (dict): {键: 数据行列表、SheetTable或其他可以序列化为JSON的值}
+    
+    Yields:
+        str: JSON文本片段
+    """
+    if not data:
+        yield "{}"
+        return
+    
+    first = True
+    for key, value in data.items():
+        yield ("{\n  " if first else ",\n  ") + json.dumps(key, ensure_ascii=False) + ": "
+        first = False
+        # 字符串中的换行符会被转义，文本中的换行都来自缩进，整体再缩进一级即为对象成员的格式
+        if isinstance(value, (list, SheetTable)):
+            for chunk in iter_json_rows(value):
+                yield chunk.replace("\n", "\n  ")
+        else:
+            yield json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+    yield "\n}"
+
+def should_prune_columns(format_type, split, write_json=False, no_prune_columns=False):
+    """
+    是否可以按列裁剪拉取：只有按工作表分组并拆分时才会丢弃note列，
+    其他格式和调试用的合并JSON文件仍然需要完整的列
+    """
+    return format_type == 'sheet_grouped' and split and not write_json and not no_prune_columns
+
+def export_and_split(data, output_file, format_type="list", key_field=None, split=True,
+                     output_dir=None, output_script_dir=None, write_json=False, **split_options):
+    """
+    导出数据并拆分成子文件
+    
+    按工作表分组的数据直接在内存中拆分，只有write_json为True时才额外写出合并的JSON文件（用于调试）；
+    其他格式仍然先导出合并的JSON文件再拆分
+    
+    Args:
+        data (dict|list): get_sheet_data返回的数据
+        output_file (str): 合并的JSON文件路径，文件名（不含扩展名）即表格名称
+        format_type (str): JSON格式类型
+        key_field (str, optional): 嵌套格式的主键字段名，拆分时也用作生成代码中的查找主键
+        split (bool): 是否拆分
+        output_dir (str, optional): 拆分后的JSON文件输出目录
+        output_script_dir (str, optional): 拆分后的脚本文件输出目录
+        write_json (bool): 内存拆分时是否仍然写出合并的JSON文件
+        **split_options: 传给split_sheets_data的拆分选项
+    
+    Returns:
+        bool: 是否成功
+    """
+    if split and format_type == 'sheet_grouped' and isinstance(data, dict):
+        if write_json and not export_to_json(data, output_file, format_type, key_field):
+            return False
+        
+        print(f"正在拆分表格数据: {output_file}")
+        table_name, output_path, output_script_path = resolve_output_paths(output_file, output_dir, output_script_dir)
+        if not split_sheets_data(data, table_name, output_path, output_script_path, key_field=key_field,
+                                 **split_options):
+            print("拆分JSON文件失败")
+            return False
+        print("拆分JSON文件成功")
+        return True
+    
+    # 导出数据
+    if not export_to_json(data, output_file, format_type, key_field):
+        return False
+    
+    # 如果需要拆分JSON文件
+    if split:
+        print(f"正在拆分JSON文件: {output_file}")
+        if not split_json_file(output_file, output_dir, output_script_dir, key_field=key_field, **split_options):
+            print("拆分JSON文件失败")
+            return False
+        print("拆分JSON文件成功")
     
     return True
 
@@ -228,37 +788,67 @@ def main():
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='从Google Sheets导出数据到JSON文件')
     parser.add_argument('--sheet_id', required=True, help='Google表格ID')
-    parser.add_argument('--output', required=True, help='输出JSON文件路径')
-    parser.add_argument('--credentials', required=True, help='Google API OAuth 2.0凭证JSON文件路径')
+    parser.add_argument('--output', required=True, help='输出JSON文件路径（按工作表分组并拆分时，仅用于确定表格名称和输出位置）')
+    parser.add_argument('--credentials', help='Google API OAuth 2.0凭证JSON文件路径（使用--replay时不需要）')
+    parser.add_argument('--token-file', default=DEFAULT_TOKEN_FILE, help=f'保存已授权凭证的文件路径，默认为{DEFAULT_TOKEN_FILE}')
     parser.add_argument('--format', choices=['list', 'nested', 'sheet_grouped'], default='list', help='JSON格式类型: list, nested或sheet_grouped')
-    parser.add_argument('--key_field', help='嵌套格式的主键字段名')
+    parser.add_argument('--key_field', help='嵌套格式的主键字段名；拆分时也用作生成代码中的查找主键，默认使用名为id的字段')
     parser.add_argument('--sheet_name', help='工作表名称(默认为第一个工作表)')
     parser.add_argument('--split', action='store_true', help='是否将导出的JSON文件拆分成多个子文件')
     parser.add_argument('--no-split', action='store_true', help='不拆分JSON文件（默认会拆分）')
     parser.add_argument('--output-dir', help='拆分后的JSON文件输出目录路径，默认为输入文件的父目录的父目录下的export文件夹')
     parser.add_argument('--output-script-dir', help='拆分后的脚本文件输出目录路径')
+    parser.add_argument('--write-json', action='store_true', help='按工作表分组并拆分时，仍然写出合并的JSON文件（用于调试）')
+    add_split_arguments(parser)
+    parser.add_argument('--batch-size', type=int, default=BATCH_GET_MAX_RANGES, help=f'每个values.batchGet请求最多包含的工作表数量，默认为{BATCH_GET_MAX_RANGES}')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'拉取缓存目录，默认为{DEFAULT_CACHE_DIR}')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // 1024 // 1024, help='拉取缓存的容量上限（MB）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用拉取缓存')
+    parser.add_argument('--refresh', action='store_true', help='忽略已有缓存，重新拉取所有数据并更新缓存')
+    parser.add_argument('--no-prune-columns', action='store_true', help='按工作表分组并拆分时，仍然拉取note列和标题行以外的列')
+    add_replay_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
+    configure_from_args(args)
+    with profile_from_args(args):
+        return export_sheet(args)
+
+def export_sheet(args):
+    """
+    按命令行参数拉取表格数据并导出
+    
+    Returns:
+        int: 进程退出码
+    """
     # 检查参数
     if args.format == 'nested' and not args.key_field:
         print("错误: 嵌套格式需要指定--key_field参数")
         return 1
-    
-    # 设置凭证
-    service = setup_credentials(args.credentials)
-    if not service:
+    if not args.credentials and not args.replay:
+        print("错误: 需要指定--credentials参数（使用--replay时除外）")
         return 1
     
-    # 获取表格数据
-    data = get_sheet_data(service, args.sheet_id, args.sheet_name)
-    if not data:
+    # 设置凭证（回放时不需要）
+    creds = None
+    if not args.replay:
+        creds = load_credentials(args.credentials, args.token_file)
+        if not creds:
+            return 1
+    recorder = create_recorder(args)
+    service, drive_service = build_services(creds, not args.no_cache, recorder, args.replay)
+    if not service:
         return 1
     
-    # 导出数据
-    success = export_to_json(data, args.output, args.format, args.key_field)
-    if not success:
-        return 1
+    # 通过修改标记判断是否可以使用缓存的数据
+    cache = None
+    marker = None
+    if not args.no_cache:
+        # 录制时忽略已有缓存，确保所有工作表的响应都被记录下来
+        cache = FetchCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, args.refresh or bool(args.record))
+        marker = get_revision_marker(drive_service, args.sheet_id)
     
     # 默认拆分JSON文件，除非明确指定--no-split
     should_split = not args.no_split
@@ -267,14 +857,23 @@ def main():
     if args.split:
         should_split = True
     
-    # 如果需要拆分JSON文件
-    if should_split:
-        print(f"正在拆分JSON文件: {args.output}")
-        split_success = split_json_file(args.output, args.output_dir, args.output_script_dir)
-        if not split_success:
-            print("拆分JSON文件失败")
-            return 1
-        print("拆分JSON文件成功")
+    # 获取表格数据
+    prune_columns = should_prune_columns(args.format, should_split, args.write_json, args.no_prune_columns)
+    data = get_sheet_data(service, args.sheet_id, args.sheet_name, args.batch_size, cache, marker, prune_columns)
+    if cache:
+        cache.evict()
+    if recorder:
+        print(f"已记录 {recorder.count} 个API响应到: {args.record}")
+    request_scheduler.print_summary()
+    if not data:
+        return 1
+    
+    # 导出并拆分数据
+    success = export_and_split(data, args.output, args.format, args.key_field, should_split,
+                               args.output_dir, args.output_script_dir, args.write_json,
+                               **split_options_from_args(args))
+    if not success:
+        return 1
     
     return 0
 
@@ -5,8 +5,19 @@ import os
 import json
 import argparse
 import sys
+import time
+import hashlib
+import itertools
 from pathlib import Path
-import re
+from binary_format import encode_sheet, binary_field_type, split_array_string, BINARY_EXTENSION
+from template_engine import load_template
+from sheet_table import SheetTable
+from sheet_patch import (PATCH_DIR_NAME, VERSIONS_FILE_NAME, patch_file_name, load_versions, dump_versions,
+                         load_previous_rows, diff_rows, build_patch, kept_patch_files)
+from export_manifest import MANIFEST_FILE_NAME, schema_fingerprint, load_manifest, manifest_entry, relative_name, dump_manifest
+from sheet_shard import SHARD_INDEX_SUFFIX, shard_file_name, shard_index_file_name, should_shard, key_bounds, build_shard_index
+import profiler
+from profiler import add_profile_arguments, profile_from_args
 
 # 设置控制台输出编码为UTF-8
 if sys.platform == 'win32':
@@ -42,6 +53,153 @@ def ensure_codegen_dir(output_path, name):
     print(f"已确保目录存在: {codegen_dir}")
     return codegen_dir
 
+# 计算文件哈希时每次读取的大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def new_write_stats():
+    """创建用于统计输出文件写入情况的字典"""
+    return {'written': [], 'unchanged': [], 'deleted': []}
+
+def hash_text(text):
+    """计算文本内容（UTF-8编码）的SHA-256哈希值"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def hash_file(file_path, binary=False):
+    """
+    计算文件内容的SHA-256哈希值
+    
+    文本文件以文本模式读取，换行符统一为\n，与hash_text的结果可以直接比较
+    
+    Args:
+        file_path (Path): 文件路径
+        binary (bool): 是否按二进制内容计算
+    
+    Returns:
+        str: 哈希值，文件不存在或无法读取时返回None
+    """
+    try:
+        # 分块读取，避免大文件整个读入内存
+        digest = hashlib.sha256()
+        if binary:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), ''):
+                    digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def write_if_changed(output_file, content, stats=None):
+    """
+    只有内容与现有文件不同时才写入文件，写入时先写临时文件再原子替换
+    
+    Args:
+        output_file (Path): 输出文件路径
+        content (str|bytes): 文件内容，bytes按二进制写入
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        bool: 是否写入了文件（内容未变化时返回False）
+    """
+    output_file = Path(output_file)
+    binary = isinstance(content, bytes)
+    content_hash = hashlib.sha256(content).hexdigest() if binary else hash_text(content)
+    if output_file.exists() and hash_file(output_file, binary) == content_hash:
+        if stats is not None:
+            stats['unchanged'].append(output_file)
+        return False
+    
+    temp_file = output_file.with_name(output_file.name + '.tmp')
+    if binary:
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+    else:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+    os.replace(temp_file, output_file)
+    
+    if stats is not None:
+        stats['written'].append(output_file)
+    return True
+
+def write_temp_chunks(output_file, chunks):
+    """
+    逐段将文本写入输出文件旁的临时文件，并同时计算哈希，内存占用只与单段文本的大小有关；
+    生成文本时抛出异常会删除临时文件，现有文件保持不变
+    
+    Args:
+        output_file (Path): 输出文件路径
+        chunks (iterable): 逐段生成的文本
+    
+    Returns:
+        tuple: (临时文件路径, 文本的SHA-256哈希值)
+    """
+    temp_file = Path(output_file).with_name(Path(output_file).name + '.tmp')
+    digest = hashlib.sha256()
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk.encode('utf-8'))
+    except BaseException:
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+    return temp_file, digest.hexdigest()
+
+def replace_if_changed(temp_file, output_file, content_hash, stats=None):
+    """
+    用write_temp_chunks写出的临时文件替换输出文件，内容与现有文件相同时删除临时文件
+    
+    Returns:
+        bool: 是否替换了文件（内容未变化时返回False）
+    """
+    if output_file.exists() and hash_file(output_file) == content_hash:
+        temp_file.unlink()
+        if stats is not None:
+            stats['unchanged'].append(output_file)
+        return False
+    
+    os.replace(temp_file, output_file)
+    
+    if stats is not None:
+        stats['written'].append(output_file)
+    return True
+
+def remove_stale_files(directory, pattern, keep_files, stats=None):
+    """
+    删除目录中匹配pattern但不在keep_files中的文件（连同Unity的.meta文件）
+    
+    Args:
+        directory (Path): 目录路径
+        pattern (str): 文件匹配模式，例如"*.json"
+        keep_files (set): 需要保留的文件路径集合
+        stats (dict, optional): new_write_stats创建的统计字典
+    """
+    if not directory.exists():
+        return
+    
+    for file in directory.glob(pattern):
+        if file in keep_files:
+            continue
+        try:
+            file.unlink()
+            meta_file = file.with_name(file.name + '.meta')
+            if meta_file.exists():
+                meta_file.unlink()
+            if stats is not None:
+                stats['deleted'].append(file)
+            print(f"已删除文件: {file}")
+        except Exception as e:
+            print(f"删除文件 {file} 时出错: {e}")
+
+def print_write_stats(stats):
+    """打印输出文件的写入统计"""
+    print(f"输出文件统计: 写入 {len(stats['written'])} 个，未变化 {len(stats['unchanged'])} 个，删除 {len(stats['deleted'])} 个")
+
 def convert_type_to_csharp(json_type):
     """
     将JSON类型转换为C#类型
@@ -64,7 +222,94 @@ def convert_type_to_csharp(json_type):
     
     return type_mapping.get(json_type, 'string')  # 默认返回string类型
 
-def generate_config_manager(output_dir, table_name, sheet_names):
+# 未指定主键字段时，按约定使用名为id（不区分大小写）的字段作为主键
+DEFAULT_KEY_FIELD = 'id'
+
+# 可以作为主键的字段类型
+KEY_FIELD_TYPES = ('number', 'string')
+
+def detect_key_field(field_types, key_field=None):
+    """
+    确定工作表的主键字段
+    
+    优先使用指定的主键字段，工作表中没有该字段时按约定查找名为id（不区分大小写）的字段；
+    只有number和string类型的字段可以作为主键
+    
+    Args:
+        field_types (dict): 字段类型行
+        key_field (str, optional): 指定的主键字段名（--key_field参数）
+    
+    Returns:
+        str: 主键字段名，没有合适的字段时返回None
+    """
+    if key_field and field_types.get(key_field) in KEY_FIELD_TYPES:
+        return key_field
+    
+    for field_name, field_type in field_types.items():
+        if field_name.lower() == DEFAULT_KEY_FIELD and field_type in KEY_FIELD_TYPES:
+            return field_name
+    
+    return None
+
+def check_unique_keys(sheet_name, rows, key_field):
+    """
+    检查转换后的数据行中主键是否唯一，存在重复时抛出ValueError
+    
+    Args:
+        sheet_name (str): 工作表名称，用于错误信息
+        rows (list): 转换后的数据行列表
+        key_field (str): 主键字段名
+    """
+    for _ in iter_unique_keys(sheet_name, rows, key_field):
+        pass
+
+def iter_unique_keys(sheet_name, rows, key_field):
+    """
+    逐行检查主键是否唯一并原样返回每一行，所有行检查完后存在重复时抛出ValueError
+    
+    没有主键值的空行会被忽略；有其他字段但缺少主键的行只打印警告
+    
+    Args:
+        sheet_name (str): 工作表名称，用于错误信息
+        rows (iterable): 转换后的数据行
+        key_field (str): 主键字段名
+    
+    Yields:
+        dict: 数据行
+    """
+    first_rows = {}
+    duplicates = []
+    missing_rows = []
+    for index, row in enumerate(rows):
+        # 数据行从表格的第4行开始（标题行、类型行、描述行之后）
+        row_number = index + 4
+        if key_field not in row:
+            if row:
+                missing_rows.append(row_number)
+            yield row
+            continue
+        
+        yield row
+        key = row[key_field]
+        if key in first_rows:
+            duplicates.append(f"{key!r}（第 {first_rows[key]} 行和第 {row_number} 行）")
+        else:
+            first_rows[key] = row_number
+    
+    if missing_rows:
+        print(f"警告: 工作表 {sheet_name} 有 {len(missing_rows)} 行缺少主键 {key_field}: "
+              f"第 {', '.join(map(str, missing_rows[:10]))} 行")
+    
+    if duplicates:
+        raise ValueError(f"工作表 {sheet_name} 的主键 {key_field} 存在 {len(duplicates)} 个重复值: "
+                         f"{'; '.join(duplicates[:10])}")
+
+def key_field_getter_name(key_field):
+    """主键字段在生成的C#类中的属性名"""
+    return key_field[0].upper() + key_field[1:]
+
+def generate_config_manager(output_dir, table_name, sheet_names, stats=None, data_format='json',
+                            key_fields=None, intern_strings=False, patches=False, sharded_sheets=None):
     """
     生成ConfigManager类文件
     
@@ -72,6 +317,12 @@ def generate_config_manager(output_dir, table_name, sheet_names):
         output_dir (Path): 输出目录路径
         table_name (str): 表格名称
         sheet_names (list): 工作表名称列表
+        stats (dict, optional): new_write_stats创建的统计字典
+        data_format (str): 数据文件格式，json或binary
+        key_fields (dict, optional): {工作表名称: (主键字段名, 主键字段类型)}，为这些工作表生成按主键查找的方法
+        intern_strings (bool): 是否使用字符串表，是时加载数据文件前先加载字符串表
+        patches (bool): 是否生成补丁，是时为每个工作表生成应用补丁的方法
+        sharded_sheets (list, optional): 分片输出的工作表，从分片加载数据，按主键查找时只加载所在的分片
     
     Returns:
         bool: 是否成功
@@ -82,111 +333,69 @@ def generate_config_manager(output_dir, table_name, sheet_names):
         if not template_file.exists():
             print(f"错误: 模板文件 '{template_file}' 不存在")
             return False
-            
-        with open(template_file, 'r', encoding='utf-8') as f:
-            template = f.read()
         
-        # 准备数据
-        manager_class_name = f"{table_name}ConfigManager"
+        key_fields = key_fields or {}
+        sharded_sheets = set(sharded_sheets or ())
         
         # 准备字段数组
         field_array = []
         for sheet_name in sheet_names:
             field_array.append({
                 'configClassName': sheet_name,
-                'lowersheetname': sheet_name.lower()
+                'lowersheetname': sheet_name.lower(),
+                'hasKey': sheet_name in key_fields,
+                'keyGetterName': key_field_getter_name(key_fields[sheet_name][0]) if sheet_name in key_fields else None,
+                'isSharded': sheet_name in sharded_sheets,
+                'hasShardCache': sheet_name in sharded_sheets and sheet_name in key_fields
             })
         
-        # 创建结果字符串
-        result = template
-        
-        # 1. 替换命名空间和类名
-        result = result.replace("{{this.nameSpace}}", table_name)
-        result = result.replace("{{{this.managerClassName}}}", manager_class_name)
-        result = result.replace("{{{this.jsonPath}}}", f"Config/{table_name}")
-        
-        # 2. 移除子类型相关的部分
-        result = re.sub(r'{{#each subTypeArray}}.*?{{/each}}', '', result, flags=re.DOTALL)
-        
-        # 3. 处理配置属性
-        config_props = []
-        for field in field_array:
-            config_props.append(f"public List<{field['configClassName']}> {field['configClassName']}List => getConfig<{field['configClassName']}>();")
-        config_props_str = "\n        ".join(config_props)
-        
-        # 替换配置属性部分
-        result = re.sub(r'{{#each fieldArray}}public {{#isSingleTable this\.configClassName}}.*?{{/isSingleTable}}\n        {{/each}}', 
-                        config_props_str + "\n        ", result, flags=re.DOTALL)
-        
-        # 4. 处理私有字段列表
-        private_lists = []
-        for field in field_array:
-            private_lists.append(f"private List<{field['configClassName']}> {field['lowersheetname']}List;")
-        private_lists_str = "\n        ".join(private_lists)
-        
-        # 替换私有字段列表部分
-        result = re.sub(r'{{#each fieldArray}}private List<{{{this\.configClassName}}}> {{{this\.lowersheetname}}}List;\n        {{/each}}', 
-                        private_lists_str + "\n        ", result, flags=re.DOTALL)
-        
-        # 5. 处理类型字典
-        type_dict_entries = []
-        for i, field in enumerate(field_array):
-            entry = f"[typeof({field['configClassName']})] = \"{field['lowersheetname']}\""
-            if i < len(field_array) - 1:
-                entry += ","
-            type_dict_entries.append(entry)
-        type_dict_str = "\n            ".join(type_dict_entries)
-        
-        # 替换类型字典部分
-        result = re.sub(r'{{#each fieldArray}}\[typeof\({{{this\.configClassName}}}\)\] = "{{{this\.lowersheetname}}}",\n            {{/each}}', 
-                        type_dict_str, result, flags=re.DOTALL)
-        
-        # 6. 处理tryLoad方法中的case语句
-        try_load_cases = []
-        for field in field_array:
-            try_load_cases.append(f"case \"{field['lowersheetname']}\": if ({field['lowersheetname']}List != null) return; break;")
-        try_load_cases_str = "\n                ".join(try_load_cases)
-        
-        # 替换tryLoad方法中的case语句部分
-        result = re.sub(r'{{#each fieldArray}}case "{{{this\.lowersheetname}}}": if \({{{this\.lowersheetname}}}List != null\) return; break;\n                {{/each}}', 
-                        try_load_cases_str, result, flags=re.DOTALL)
-        
-        # 7. 处理tryLoad方法中的switch语句
-        switch_cases = []
-        for field in field_array:
-            switch_cases.append(f"case \"{field['lowersheetname']}\": {field['lowersheetname']}List = JsonConvert.DeserializeObject<List<{field['configClassName']}>>(ta.text); break;")
-        switch_cases_str = "\n                ".join(switch_cases)
-        
-        # 替换tryLoad方法中的switch语句部分
-        result = re.sub(r'{{#each fieldArray}}case "{{{this\.lowersheetname}}}": {{{this\.lowersheetname}}}List = JsonConvert\.DeserializeObject<List<{{{this\.configClassName}}}>>\(ta\.text\); break;\n                {{/each}}', 
-                        switch_cases_str, result, flags=re.DOTALL)
-        
-        # 8. 处理getConfig方法中的switch语句
-        get_config_cases = []
-        for field in field_array:
-            get_config_cases.append(f"case \"{field['lowersheetname']}\": return {field['lowersheetname']}List as List<T>;")
-        get_config_cases_str = "\n                ".join(get_config_cases)
-        
-        # 替换getConfig方法中的switch语句部分
-        result = re.sub(r'{{#each fieldArray}}case "{{{this\.lowersheetname}}}": return {{{this\.lowersheetname}}}List as List<T>;\n                {{/each}}', 
-                        get_config_cases_str, result, flags=re.DOTALL)
-        
-        # 9. 清理多余的空行
-        result = re.sub(r'\n\s*\n\s*\n', '\n\n', result)
+        # 准备按主键查找的工作表数组
+        key_field_array = []
+        for sheet_name, (key_field, key_type) in key_fields.items():
+            key_field_array.append({
+                'configClassName': sheet_name,
+                'lowersheetname': sheet_name.lower(),
+                'keyType': convert_type_to_csharp(key_type),
+                'keyGetterName': key_field_getter_name(key_field),
+                'isStringKey': key_type == 'string',
+                'isSharded': sheet_name in sharded_sheets
+            })
+        
+        manager_class_name = f"{table_name}ConfigManager"
+        result = load_template(template_file).render({
+            'nameSpace': table_name,
+            'managerClassName': manager_class_name,
+            'subTypeArray': [],
+            'fieldArray': field_array,
+            'keyFieldArray': key_field_array,
+            # 二进制格式使用生成的读取代码，不经过反射
+            'isBinary': data_format == 'binary',
+            'internStrings': intern_strings,
+            'stringTableName': STRING_TABLE_NAME,
+            'hasPatches': patches,
+            'hasShards': bool(sharded_sheets),
+            'shardIndexSuffix': SHARD_INDEX_SUFFIX,
+            'shardedSheetArray': [{'lowersheetname': sheet_name.lower()} for sheet_name in sheet_names
+                                  if sheet_name in sharded_sheets],
+            # Resources路径不包含扩展名
+            'versionsResource': f"{PATCH_DIR_NAME}/{Path(VERSIONS_FILE_NAME).stem}"
+        }, {
+            # 目前所有工作表都生成列表属性
+            'isSingleTable': lambda class_name: False
+        })
         
         # 写入输出文件
         output_file = output_dir / f"{manager_class_name}.Loader.cs"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(result)
-        
-        print(f"已生成ConfigManager文件: {output_file}")
+        if write_if_changed(output_file, result, stats):
+            print(f"已生成ConfigManager文件: {output_file}")
         return True
-        
+    
     except Exception as e:
         print(f"生成ConfigManager文件时出错: {e}")
         return False
 
-def generate_cs_file(template_path, output_dir, class_name, name_space, fields_data):
+def generate_cs_file(template_path, output_dir, class_name, name_space, fields_data, stats=None,
+                     intern_strings=False):
     """
     生成C#代码文件
     
@@ -196,6 +405,8 @@ def generate_cs_file(template_path, output_dir, class_name, name_space, fields_d
         class_name (str): 类名
         name_space (str): 命名空间
         fields_data (list): 字段数据列表
+        stats (dict, optional): new_write_stats创建的统计字典
+        intern_strings (bool): 数据文件中string和arraystring字段是否为字符串表序号，是时这些字段反序列化时从字符串表取值
     
     Returns:
         bool: 是否成功
@@ -206,9 +417,6 @@ def generate_cs_file(template_path, output_dir, class_name, name_space, fields_d
         if not template_file.exists():
             print(f"错误: 模板文件 '{template_file}' 不存在")
             return False
-            
-        with open(template_file, 'r', encoding='utf-8') as f:
-            template = f.read()
         
         # 准备字段数组
         field_array = []
@@ -216,23 +424,9 @@ def generate_cs_file(template_path, output_dir, class_name, name_space, fields_d
             # 忽略类型为"note"的字段
             if field_info['type'] == 'note':
                 continue
-                
-            field_data = {
-                'getterName': field_name[0].upper() + field_name[1:],
-                'realType': convert_type_to_csharp(field_info['type']),
-                'desc': field_info['desc']
-            }
-            field_array.append(field_data)
-        
-        # 替换模板中的变量
-        # 1. 替换类名和命名空间
-        result = template.replace('{{className}}', class_name).replace('{{nameSpace}}', name_space)
-        
-        # 2. 处理字段循环
-        fields_content = ""
-        for field in field_array:
+            
             # 处理描述中的换行符，确保注释格式正确
-            desc = field['desc']
+            desc = field_info['desc']
             if '\n' in desc:
                 # 将换行符替换为注释格式
                 desc_lines = desc.split('\n')
@@ -242,38 +436,528 @@ def generate_cs_file(template_path, output_dir, class_name, name_space, fields_d
                         formatted_desc += f"\n        /// {line}"
             else:
                 formatted_desc = desc
-                
-            field_template = """        /// <summary>
-        /// {{{desc}}}
-        /// </summary>
-        public {{{realType}}} {{getterName}} { get; set; }
-"""
-            field_content = field_template.replace('{{{desc}}}', formatted_desc)
-            field_content = field_content.replace('{{{realType}}}', field['realType'])
-            field_content = field_content.replace('{{getterName}}', field['getterName'])
-            fields_content += field_content
-        
-        # 替换字段循环部分
-        each_pattern = re.compile(r'{{#each fieldArray}}(.*?){{/each}}', re.DOTALL)
-        result = each_pattern.sub(fields_content, result)
-        
-        # 修复类定义的花括号和第一个注释在同一行的问题
-        result = result.replace("{\n    {{#each", "{\n        {{#each")
-        result = result.replace("{           ", "{\n        ")
+            
+            field_data = {
+                'getterName': field_name[0].upper() + field_name[1:],
+                'realType': convert_type_to_csharp(field_info['type']),
+                'desc': formatted_desc,
+                'interned': intern_strings and field_info['type'] in INTERNED_FIELD_TYPES
+            }
+            field_array.append(field_data)
+        
+        result = load_template(template_file).render({
+            'className': class_name,
+            'nameSpace': name_space,
+            'fieldArray': field_array,
+            'internStrings': intern_strings
+        })
         
         # 写入输出文件
         output_file = output_dir / f"{class_name}.cs"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(result)
+        if write_if_changed(output_file, result, stats):
+            print(f"已生成C#代码文件: {output_file}")
+        return True
+    
+    except Exception as e:
+        print(f"生成C#代码文件时出错: {e}")
+        return False
+
+def _memoize_string_parser(parse):
+    """
+    为字符串单元格的解析函数增加缓存，同一个字符串在工作表中只解析一次
+    
+    列表结果每次返回副本，避免多行共用同一个列表对象
+    """
+    cache = {}
+    
+    def parse_cached(value):
+        try:
+            result = cache[value]
+        except KeyError:
+            result = cache[value] = parse(value)
+        if isinstance(result, list):
+            return list(result)
+        return result
+    
+    return parse_cached
+
+def _parse_number(value):
+    """数字类型：解析字符串，包含小数点时为浮点数，转换失败时保留原始值"""
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        return value
+
+def _parse_bool(value):
+    """布尔类型：解析字符串，无法识别时保留原始值"""
+    lower_value = value.lower()
+    if lower_value in ('true', '1'):
+        return True
+    if lower_value in ('false', '0'):
+        return False
+    return value
+
+def _parse_array_number(value):
+    """数字数组类型：按逗号分隔解析字符串，单个数字也转换为列表，转换失败时包装原始值为列表"""
+    try:
+        if ',' in value:
+            return [int(x.strip()) if x.strip().isdigit() else float(x.strip()) for x in value.split(',') if x.strip()]
+        # 单个数字也转换为列表
+        try:
+            if value.strip().isdigit():
+                return [int(value.strip())]
+            return [float(value.strip())]
+        except ValueError:
+            print(f"转换失败，保留原始值: {value}")
+            return [value]
+    except ValueError:
+        return [value]
+
+def _parse_float(value):
+    """浮点数类型：解析字符串，转换失败时保留原始值"""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def make_field_converter(field_type):
+    """
+    根据字段类型创建单元格转换函数
+    
+    Args:
+        field_type (str): 第一行定义的字段类型
+    
+    Returns:
+        function: 接收单元格值（非空）并返回转换后的值的函数
+    """
+    # 字符串类型转换
+    if field_type == 'string':
+        def convert(value):
+            if isinstance(value, str):
+                return value
+            return str(value)
+        return convert
+    
+    # 数字类型转换
+    if field_type == 'number':
+        parse_number = _memoize_string_parser(_parse_number)
+        
+        def convert(value):
+            if isinstance(value, str):
+                return parse_number(value)
+            return value
+        return convert
+    
+    # 布尔类型转换
+    if field_type == 'bool':
+        parse_bool = _memoize_string_parser(_parse_bool)
+        
+        def convert(value):
+            if isinstance(value, str):
+                return parse_bool(value)
+            if isinstance(value, (int, float)):
+                return bool(value)
+            return value
+        return convert
+    
+    # 数组类型转换
+    if field_type == 'arraynumber':
+        parse_array_number = _memoize_string_parser(_parse_array_number)
+        
+        def convert(value):
+            # 如果已经是列表，无需处理
+            if isinstance(value, list):
+                return value
+            if isinstance(value, str):
+                return parse_array_number(value)
+            # 数字或其他类型，直接包装为列表
+            return [value]
+        return convert
+    
+    # 浮点数类型转换
+    if field_type == 'float':
+        parse_float = _memoize_string_parser(_parse_float)
         
-        print(f"已生成C#代码文件: {output_file}")
+        def convert(value):
+            if isinstance(value, str):
+                return parse_float(value)
+            if isinstance(value, int):
+                return float(value)
+            return value
+        return convert
+    
+    # 其他类型保留原始值
+    return None
+
+def compile_field_converters(field_types):
+    """
+    将字段类型行编译为字段转换函数字典，note字段直接丢弃
+    
+    Args:
+        field_types (dict): 字段类型行，{字段名: 字段类型}
+    
+    Returns:
+        dict: {字段名: 转换函数或None}，None表示保留原始值；不在字典中的字段会被忽略
+    """
+    converters = {}
+    for field_name, field_type in field_types.items():
+        if field_type != 'note':
+            converters[field_name] = make_field_converter(field_type)
+    return converters
+
+def convert_row(row, converters):
+    """按编译好的字段转换函数转换一行数据，忽略note字段、未定义类型的字段和空值"""
+    filtered_row = {}
+    for field_name, field_value in row.items():
+        # 忽略note字段和不在字段类型中的字段
+        if field_name not in converters:
+            continue
+        
+        # 忽略空值字段
+        if field_value is None or field_value == "":
+            continue
+        
+        convert = converters[field_name]
+        filtered_row[field_name] = convert(field_value) if convert else field_value
+    return filtered_row
+
+def convert_rows(rows, converters):
+    """按编译好的字段转换函数转换所有数据行"""
+    return [convert_row(row, converters) for row in rows]
+
+def compile_tuple_columns(headers, converters):
+    """
+    将字段转换函数与元组行的列序号对应起来，用于convert_tuple_row
+    
+    Args:
+        headers (tuple): 标题行
+        converters (dict): compile_field_converters的结果
+    
+    Returns:
+        list: [(字段名, 列序号, 转换函数或None)]，字段顺序与dict(zip(headers, row))一致
+    """
+    indexes = {}
+    for index, header in enumerate(headers):
+        indexes[header] = index
+    return [(field_name, index, converters[field_name]) for field_name, index in indexes.items()
+            if field_name in converters]
+
+def convert_tuple_row(row, columns):
+    """转换SheetTable中的一行元组，结果与convert_row转换对应的字典完全相同"""
+    filtered_row = {}
+    for field_name, index, convert in columns:
+        field_value = row[index]
+        
+        # 忽略空值字段
+        if field_value is None or field_value == "":
+            continue
+        
+        filtered_row[field_name] = convert(field_value) if convert else field_value
+    return filtered_row
+
+def convert_sheet_rows(rows, field_types, engine='auto', columnar_min_rows=None, headers=None):
+    """
+    转换一个工作表的所有数据行
+    
+    Args:
+        rows (list): 数据行列表，不包含字段类型行和字段描述行
+        field_types (dict): 字段类型行
+        engine (str): 转换方式，python为逐行转换，pandas为列式转换，auto按行数自动选择
+        columnar_min_rows (int, optional): auto模式下行数不少于该值时使用列式转换，为None时不自动使用
+        headers (tuple, optional): 数据行是与标题行等长的元组（SheetTable.rows）时的标题行，为None时数据行是字典
+    
+    Returns:
+        list: 转换后的数据行列表
+    """
+    use_columnar = engine == 'pandas' or (
+        engine == 'auto' and columnar_min_rows is not None and len(rows) >= columnar_min_rows)
+    
+    if use_columnar:
+        from columnar_converter import columnar_available, convert_rows_columnar
+        if columnar_available():
+            return convert_rows_columnar(rows, field_types, headers)
+        if engine == 'pandas':
+            print("未安装pandas，使用逐行转换")
+    
+    converters = compile_field_converters(field_types)
+    if headers is not None:
+        columns = compile_tuple_columns(headers, converters)
+        return [convert_tuple_row(row, columns) for row in rows]
+    return convert_rows(rows, converters)
+
+def iter_converted_rows(sheet_name, value, field_types, key_field=None):
+    """
+    逐行转换一个工作表的数据行，用于流式输出
+    
+    Args:
+        sheet_name (str): 工作表名称，用于错误信息
+        value (list|SheetTable): 工作表数据，[字段类型行, 字段描述行, 数据行...]
+        field_types (dict): 字段类型行
+        key_field (str, optional): 主键字段名，指定时同时检查主键是否唯一
+    
+    Returns:
+        iterator: 转换后的数据行
+    """
+    converters = compile_field_converters(field_types)
+    if isinstance(value, SheetTable):
+        columns = compile_tuple_columns(value.headers, converters)
+        rows = (convert_tuple_row(row, columns) for row in itertools.islice(value.rows, 2, None))
+    else:
+        rows = (convert_row(row, converters) for row in itertools.islice(value, 2, None))
+    return iter_unique_keys(sheet_name, rows, key_field) if key_field else rows
+
+def iter_json_rows(rows):
+    """
+    逐行生成JSON数组文本，拼接结果与json.dumps(rows, ensure_ascii=False, indent=2)完全相同
+    
+    Args:
+        rows (iterable): 数据行
+    
+    Yields:
+        str: JSON文本片段
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    first = True
+    for row in rows:
+        # 字符串中的换行符会被转义，因此文本中的换行都来自缩进，整体再缩进一级即为数组元素的格式
+        yield ("[\n  " if first else ",\n  ") + encoder.encode(row).replace("\n", "\n  ")
+        first = False
+    yield "[]" if first else "\n]"
+
+# 字符串表数据文件的名称（不含扩展名），以下划线开头，避免与工作表的数据文件重名
+STRING_TABLE_NAME = '_strings'
+
+# 使用字符串表时写为字符串表序号的字段类型
+INTERNED_FIELD_TYPES = ('string', 'arraystring')
+
+def interned_fields(field_types):
+    """字段类型行中需要写为字符串表序号的字段，{字段名: 字段类型}"""
+    return {field_name: field_type for field_name, field_type in field_types.items()
+            if field_type in INTERNED_FIELD_TYPES}
+
+def _interned_strings(field_type, value):
+    """非空单元格对应的字符串列表：string字段为转换后的字符串，arraystring字段为按逗号分隔的每个元素"""
+    if field_type == 'string':
+        return [value if isinstance(value, str) else str(value)]
+    return split_array_string(value)
+
+def build_string_table(data):
+    """
+    收集表格中所有工作表的string和arraystring字段的字符串，生成共享的字符串表
+    
+    出现次数多的字符串排在前面（序号更短），次数相同时按首次出现的顺序，因此相同的数据总是生成相同的字符串表
+    
+    Args:
+        data (dict): 按工作表名称分组的数据，{工作表名称: [字段类型行, 字段描述行, 数据行...]或SheetTable}
+    
+    Returns:
+        dict: {字符串: 序号}
+    """
+    counts = {}
+    for value in data.values():
+        if not isinstance(value, (list, SheetTable)) or len(value) < 2:
+            continue
+        fields = interned_fields(value[0])
+        if not fields:
+            continue
+        for field_name, field_type in fields.items():
+            if isinstance(value, SheetTable):
+                cells = value.column(field_name)
+            else:
+                cells = (row.get(field_name) for row in itertools.islice(value, 2, None))
+            for cell in cells:
+                if cell is None or cell == "":
+                    continue
+                for text in _interned_strings(field_type, cell):
+                    counts[text] = counts.get(text, 0) + 1
+    
+    ordered = sorted(counts, key=lambda text: -counts[text])
+    return {text: index for index, text in enumerate(ordered)}
+
+def intern_row(row, fields, string_table):
+    """将一行已转换的数据中的string字段替换为字符串表序号、arraystring字段替换为序号列表（原地修改并返回该行）"""
+    for field_name, field_type in fields.items():
+        if field_name in row:
+            indexes = [string_table[text] for text in _interned_strings(field_type, row[field_name])]
+            row[field_name] = indexes[0] if field_type == 'string' else indexes
+    return row
+
+def add_split_arguments(parser, format_option='--data-format'):
+    """
+    为命令行解析器添加拆分相关的参数
+    
+    Args:
+        parser (ArgumentParser): 命令行解析器
+        format_option (str): 数据文件格式参数的名称（导出脚本中--format已用于JSON格式类型）
+    """
+    parser.add_argument('--engine', choices=['auto', 'python', 'pandas'], default='auto',
+                        help='数据行转换方式：python为逐行转换，pandas为列式转换，auto按行数自动选择（默认）')
+    parser.add_argument('--columnar-min-rows', type=int,
+                        help='auto模式下行数不少于该值的工作表使用pandas列式转换，默认不自动使用')
+    parser.add_argument(format_option, dest='data_format', choices=['json', 'binary'], default='json',
+                        help='拆分后的数据文件格式：json（默认）或binary（紧凑的二进制格式，配合生成的C#读取代码使用）')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='并行拆分工作表的进程数，默认为1（在当前进程中依次处理）')
+    parser.add_argument('--stream', action='store_true',
+                        help='逐行转换并写出JSON数据文件，内存占用不随工作表大小增长（始终逐行转换）')
+    parser.add_argument('--intern-strings', action='store_true',
+                        help=f'JSON格式时将所有工作表的string和arraystring值收集到共享的{STRING_TABLE_NAME}.json字符串表，'
+                             f'数据文件中只写字符串表序号')
+    parser.add_argument('--shard-rows', type=int, metavar='N',
+                        help='JSON格式时行数超过N的工作表每N行写为一个分片，并写出记录各分片主键范围的索引，'
+                             '生成的代码按主键查找时只加载所在的分片')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help=f'不写出{MANIFEST_FILE_NAME}清单（默认在数据文件目录中记录所有数据文件和C#代码文件的哈希、大小、行数和结构指纹）')
+    parser.add_argument('--patches', action='store_true',
+                        help=f'JSON格式时在{PATCH_DIR_NAME}目录中记录每个工作表的版本，数据变化时生成只包含新增、修改和删除行的补丁文件')
+
+def split_options_from_args(args):
+    """从命令行参数中提取拆分选项，作为关键字参数传给split_sheets_data"""
+    return {
+        'engine': args.engine,
+        'columnar_min_rows': args.columnar_min_rows,
+        'data_format': args.data_format,
+        'stream': args.stream,
+        'jobs': args.jobs,
+        'intern_strings': args.intern_strings,
+        'patches': args.patches,
+        'shard_rows': args.shard_rows,
+        'manifest': not args.no_manifest,
+    }
+
+# 二进制格式下各字段类型对应的C#读取方法
+BINARY_READ_METHODS = {
+    'number': 'ReadInt',
+    'float': 'ReadFloat',
+    'bool': 'ReadBool',
+    'string': 'ReadString',
+    'arraynumber': 'ReadIntList',
+    'arraystring': 'ReadStringList',
+}
+
+# 二进制格式下各字段类型对应的ConfigBinaryReader类型常量
+BINARY_TYPE_CONSTANTS = {
+    'number': 'TypeNumber',
+    'float': 'TypeFloat',
+    'bool': 'TypeBool',
+    'string': 'TypeString',
+    'arraynumber': 'TypeArrayNumber',
+    'arraystring': 'TypeArrayString',
+}
+
+def generate_support_file(template_name, file_name, output_dir, name_space, stats=None):
+    """
+    生成只依赖命名空间的公共C#代码文件，例如二进制读取类ConfigBinaryReader、字符串表ConfigStringTable、
+    补丁类ConfigPatch和分片索引类ConfigShard
+    
+    Args:
+        template_name (str): Template目录中的模板文件名，例如ConfigPatch.template
+        file_name (str): 输出文件名，例如ConfigPatch.cs
+        output_dir (Path): 输出目录路径
+        name_space (str): 命名空间
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        template_file = Path("Template") / template_name
+        if not template_file.exists():
+            print(f"错误: 模板文件 '{template_file}' 不存在")
+            return False
+        
+        output_file = output_dir / file_name
+        result = load_template(template_file).render({'nameSpace': name_space})
+        if write_if_changed(output_file, result, stats):
+            print(f"已生成C#代码文件: {output_file}")
         return True
+    
+    except Exception as e:
+        print(f"生成{file_name}时出错: {e}")
+        return False
+
+def generate_binary_reader_file(output_dir, class_name, name_space, fields_data, stats=None):
+    """
+    生成按字段名匹配、直接调用属性setter填充配置类的二进制读取代码（不使用反射）
+    
+    Args:
+        output_dir (Path): 输出目录路径
+        class_name (str): 类名
+        name_space (str): 命名空间
+        fields_data (dict): 字段数据，{字段名: {'type': 类型, 'desc': 描述}}
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        template_file = Path("Template/ConfigReader.template")
+        if not template_file.exists():
+            print(f"错误: 模板文件 '{template_file}' 不存在")
+            return False
         
+        field_array = []
+        for field_name, field_info in fields_data.items():
+            # 忽略类型为"note"的字段
+            if field_info['type'] == 'note':
+                continue
+            
+            # 字段序号即each循环中的@index；文件中的字段类型与生成代码时不一致时跳过该字段
+            field_type = binary_field_type(field_info['type'])
+            field_array.append({
+                'nameLiteral': json.dumps(field_name, ensure_ascii=False),
+                'getterName': field_name[0].upper() + field_name[1:],
+                'typeConstant': BINARY_TYPE_CONSTANTS[field_type],
+                'readMethod': BINARY_READ_METHODS[field_type]
+            })
+        
+        result = load_template(template_file).render({
+            'className': class_name,
+            'nameSpace': name_space,
+            'fieldArray': field_array
+        })
+        
+        output_file = output_dir / f"{class_name}.Reader.cs"
+        if write_if_changed(output_file, result, stats):
+            print(f"已生成C#代码文件: {output_file}")
+        return True
+    
     except Exception as e:
-        print(f"生成C#代码文件时出错: {e}")
+        print(f"生成二进制读取代码时出错: {e}")
         return False
 
-def split_json_file(input_file, output_dir=None, output_script_dir=None):
+def resolve_output_paths(input_file, output_dir=None, output_script_dir=None):
+    """
+    根据（合并的）JSON文件路径计算表格名称和拆分后的输出目录
+    
+    输入文件本身不需要存在，内存中的数据也按同样的规则确定输出位置
+    
+    Args:
+        input_file (str): 合并的JSON文件路径，文件名（不含扩展名）即表格名称
+        output_dir (str, optional): 输出目录的路径，如果为None，则使用默认路径
+        output_script_dir (str, optional): 输出脚本目录的路径，如果为None，则使用默认路径
+    
+    Returns:
+        tuple: (表格名称, 数据输出目录Path, 脚本输出目录Path)
+    """
+    # 获取输入文件的绝对路径
+    input_path = Path(input_file).resolve()
+    
+    # 默认路径：输入文件的父目录的父目录下的export文件夹
+    output_path = input_path.parent.parent / 'export'
+    output_script_path = input_path.parent.parent
+    
+    if output_dir:
+        output_path = input_path.parent.parent.parent.parent / output_dir
+    if output_script_dir:
+        output_script_path = input_path.parent.parent.parent.parent / output_script_dir
+    
+    # 获取表格名称（输入文件名，不包含扩展名）
+    return input_path.stem, output_path, output_script_path
+
+def split_json_file(input_file, output_dir=None, output_script_dir=None, **split_options):
     """
     将JSON文件按照顶级键拆分成多个子文件，并生成对应的C#代码
     
@@ -281,6 +965,7 @@ def split_json_file(input_file, output_dir=None, output_script_dir=None):
         input_file (str): 输入JSON文件的路径
         output_dir (str, optional): 输出目录的路径，如果为None，则使用默认路径
         output_script_dir (str, optional): 输出脚本目录的路径，如果为None，则使用默认路径
+        **split_options: 传给split_sheets_data的拆分选项
     Returns:
         bool: 操作是否成功
     """
@@ -294,7 +979,7 @@ def split_json_file(input_file, output_dir=None, output_script_dir=None):
             return False
         
         # 读取JSON文件
-        with open(input_path, 'r', encoding='utf-8') as f:
+        with profiler.stage('load_json', file=input_path.name), open(input_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
         # 检查数据是否为字典
@@ -302,193 +987,582 @@ def split_json_file(input_file, output_dir=None, output_script_dir=None):
             print(f"错误: 文件 '{input_file}' 不是有效的JSON对象")
             return False
         
-        # 创建输出目录
-        if output_dir:
-            output_path = input_path.parent.parent.parent.parent / output_dir
-            output_script_path = input_path.parent.parent.parent.parent / output_script_dir
-        else:
-            # 否则，使用默认路径（输入文件的父目录的父目录下的export文件夹）
-            output_path = input_path.parent.parent / 'export'
-            output_script_path = input_path.parent.parent
-        
-        # 确保输出目录存在
-        output_path.mkdir(exist_ok=True, parents=True)
-        
-        # 获取表格名称（输入文件名，不包含扩展名）
-        table_name = input_path.stem
+        table_name, output_path, output_script_path = resolve_output_paths(input_file, output_dir, output_script_dir)
+    
+    except Exception as e:
+        print(f"拆分JSON文件时出错: {e}")
+        return False
+    
+    return split_sheets_data(data, table_name, output_path, output_script_path, **split_options)
+
+def process_sheet(sheet_name, value, table_name, table_folder, codegen_dir, engine='auto', columnar_min_rows=None,
+                  data_format='json', key_field=None, stream=False, string_table=None, patch_entry=None,
+                  shard_rows=None):
+    """
+    拆分一个工作表：转换数据行、写出数据文件并生成对应的C#代码
+    
+    各工作表之间互不依赖，可以在进程池中并行执行，因此定义在模块顶层，参数和返回值都可以pickle
+    
+    Args:
+        sheet_name (str): 工作表名称（用作类名）
+        value (list|SheetTable): 工作表数据，[字段类型行, 字段描述行, 数据行...]；不是这种结构时原样写出
+        table_name (str): 表格名称（用作命名空间）
+        table_folder (Path): 数据文件输出目录
+        codegen_dir (Path): C#代码输出目录
+        engine, columnar_min_rows, data_format, key_field, stream, shard_rows: 参见split_sheets_data
+        string_table (dict, optional): build_string_table生成的字符串表，指定时string和arraystring字段写为字符串表序号
+        patch_entry (dict, optional): 版本文件中该工作表上一次的记录（没有记录时为空字典），指定时数据变化后生成补丁文件
+    
+    Returns:
+        dict: {'sheet': 工作表名称, 'output_files': 数据文件列表, 'codegen_files': C#代码文件列表,
+               'key_field': (主键字段名, 主键字段类型)或None, 'file_rows': {数据文件: 行数}, 'schema': 结构指纹或None,
+               'stats': 写入统计, 'error': 错误信息或None,
+               'timings': {阶段名称: 耗时秒数}, 'metrics': {'rows': 数据行数, 'cells': 非空单元格数, 'bytes': 数据文件大小}}
+        生成补丁时还包含'patch': 该工作表新的版本记录，分片输出时还包含'sharded': True
+        流式输出时转换和序列化在写出的同时进行，耗时都计入write阶段
+    """
+    result = {
+        'sheet': sheet_name,
+        'output_files': [],
+        'codegen_files': [],
+        'key_field': None,
+        'file_rows': {},
+        'schema': None,
+        'stats': new_write_stats(),
+        'error': None,
+        'timings': {},
+        'metrics': {}
+    }
+    stats = result['stats']
+    timings = result['timings']
+    metrics = result['metrics']
+    raw_value = value
+    
+    try:
+        # 处理数据，忽略note类型字段和空值
+        field_types = None
+        sheet_key_field = None
+        row_count = 0
+        streaming = False
+        if isinstance(value, (list, SheetTable)) and len(value) >= 2:
+            # 第一个元素包含字段类型；只保留数据行（从第三个元素开始，即索引为2），不包含字段类型和字段描述
+            field_types = value[0]
+            row_count = len(value) - 2
+            sheet_key_field = detect_key_field(field_types, key_field)
+            
+            # 主键重复时导出失败，避免运行时按主键查找只能取到其中一行
+            streaming = stream and data_format == 'json'
+            fields = interned_fields(field_types) if string_table is not None else {}
+            start = time.perf_counter()
+            if streaming:
+                value = iter_converted_rows(sheet_name, value, field_types, sheet_key_field)
+                if fields:
+                    value = (intern_row(row, fields, string_table) for row in value)
+            else:
+                if isinstance(value, SheetTable):
+                    value = convert_sheet_rows(value.data_rows(), field_types, engine, columnar_min_rows, value.headers)
+                else:
+                    value = convert_sheet_rows(value[2:], field_types, engine, columnar_min_rows)
+                if sheet_key_field:
+                    check_unique_keys(sheet_name, value, sheet_key_field)
+                # 检查主键后再替换为序号，错误信息中仍然是原始的字符串
+                if fields:
+                    for row in value:
+                        intern_row(row, fields, string_table)
+                timings['convert'] = time.perf_counter() - start
+                metrics['cells'] = sum(map(len, value))
+            metrics['rows'] = row_count
+            result['schema'] = schema_fingerprint(field_types, sheet_key_field, data_format, string_table is not None)
         
-        # 确保$name/GodeGen文件夹存在
-        codegen_dir = ensure_codegen_dir(output_script_path, table_name)
+        # 创建输出文件路径（使用小写的工作表名称）
+        lowercase_key = sheet_name.lower()
         
-        # 收集所有工作表名称
-        sheet_names = []
-        
-        # 清空export目录中的现有文件
-        for file in output_path.glob("*.json"):
-            try:
-                file.unlink()
-                print(f"已删除文件: {file}")
-            except Exception as e:
-                print(f"删除文件 {file} 时出错: {e}")
-        
-        # 拆分JSON文件
-        for key, value in data.items():
-            # 添加工作表名称
-            sheet_names.append(key)
+        if data_format == 'json' and field_types is not None and should_shard(row_count, shard_rows):
+            # 分片输出：每个分片单独序列化并写出，另外写出记录各分片主键范围的索引，转换和序列化的耗时都计入write阶段
+            start = time.perf_counter()
+            key_strings = list(string_table) if string_table is not None and sheet_key_field in fields else None
+            result['file_rows'] = write_sheet_shards(sheet_name, value, table_folder, lowercase_key, shard_rows,
+                                                     sheet_key_field, key_strings, stats)
+            result['output_files'] = list(result['file_rows'])
+            timings['write'] = time.perf_counter() - start
+            metrics['bytes'] = sum(output_file.stat().st_size for output_file in result['output_files'])
+            result['sharded'] = True
+        else:
+            # 在内存中序列化，内容与现有文件相同时不重写，避免Unity重新导入
+            start = time.perf_counter()
+            if data_format == 'binary':
+                # 没有字段类型行的工作表写出不含字段和数据行的二进制文件
+                output_file = table_folder / f"{lowercase_key}{BINARY_EXTENSION}"
+                content = encode_sheet(value if field_types is not None else [], field_types or {}, sheet_name)
+            elif streaming:
+                # 流式输出：逐行转换并写出，内容与一次性序列化完全相同
+                output_file = table_folder / f"{lowercase_key}.json"
+                content = iter_json_rows(value)
+            else:
+                # 输出文件路径现在包含表格名子文件夹
+                output_file = table_folder / f"{lowercase_key}.json"
+                content = json.dumps(value, ensure_ascii=False, indent=2)
+            result['output_files'].append(output_file)
+            result['file_rows'][output_file] = row_count if field_types is not None else None
+            if not streaming:
+                timings['serialize'] = time.perf_counter() - start
+            
+            # 生成补丁需要上一次导出的数据文件的哈希，覆盖前先计算
+            previous_hash = None
+            if patch_entry is not None and field_types is not None:
+                previous_hash = hash_file(output_file)
             
-            # 处理数据，忽略note类型字段和空值
-            if isinstance(value, list) and len(value) >= 2:
-                # 第一个元素包含字段类型
-                field_types = value[0]
-                
-                # 过滤字段类型，移除note字段
-                filtered_field_types = {}
-                for field_name, field_type in field_types.items():
-                    if field_type != 'note':
-                        filtered_field_types[field_name] = field_type
-                
-                # 只保留数据行，不包含字段类型和字段描述
-                filtered_data = []
-                
-                # 处理所有数据行（从第三个元素开始，即索引为2）
-                for i in range(2, len(value)):
-                    row = value[i]
-                    filtered_row = {}
-                    
-                    for field_name, field_value in row.items():
-                        # 忽略类型为note的字段
-                        if field_name in field_types and field_types[field_name] == 'note':
-                            continue
-                        
-                        # 忽略不在过滤后的字段类型中的字段
-                        if field_name not in filtered_field_types:
-                            continue
-                        
-                        # 忽略空值字段
-                        if field_value is None or field_value == "":
-                            continue
-                        
-                        # 根据第一行定义的字段类型进行类型转换
-                        if field_name in field_types:
-                            field_type = field_types[field_name]
-                            
-                            # 字符串类型转换
-                            if field_type == 'string' and not isinstance(field_value, str):
-                                field_value = str(field_value)
-                            
-                            # 数字类型转换
-                            elif field_type == 'number' and isinstance(field_value, str):
-                                try:
-                                    if '.' in field_value:
-                                        field_value = float(field_value)
-                                    else:
-                                        field_value = int(field_value)
-                                except ValueError:
-                                    # 如果转换失败，保留原始值
-                                    pass
-                            
-                            # 布尔类型转换
-                            elif field_type == 'bool':
-                                if isinstance(field_value, str):
-                                    if field_value.lower() in ('true', '1'):
-                                        field_value = True
-                                    elif field_value.lower() in ('false', '0'):
-                                        field_value = False
-                                elif isinstance(field_value, (int, float)):
-                                    field_value = bool(field_value)
-                            
-                            # 数组类型转换
-                            elif field_type == 'arraynumber':
-                                # 如果已经是列表，无需处理
-                                if isinstance(field_value, list):
-                                    pass
-                                # 如果是字符串，按照逗号分隔或单个值转换
-                                elif isinstance(field_value, str):
-                                    try:
-                                        # 尝试将字符串转换为数字列表，无论是否包含逗号
-                                        if ',' in field_value:
-                                            field_value = [int(x.strip()) if x.strip().isdigit() else float(x.strip()) for x in field_value.split(',') if x.strip()]
-                                        else:
-                                            # 单个数字也转换为列表
-                                            try:
-                                                if field_value.strip().isdigit():
-                                                    field_value = [int(field_value.strip())]
-                                                else:
-                                                    field_value = [float(field_value.strip())]
-                                            except ValueError:
-                                                print(f"转换失败，保留原始值: {field_value}")
-                                                # 如果转换失败，包装原始值为列表
-                                                field_value = [field_value]
-                                    except ValueError:
-                                        # 如果转换失败，保留原始值，但包装为列表
-                                        field_value = [field_value]
-                                # 如果是数字（整数或浮点数），直接包装为列表
-                                elif isinstance(field_value, (int, float)):
-                                    field_value = [field_value]
-                                # 其他类型，尝试包装为列表
-                                else:
-                                    field_value = [field_value]
-                            
-                            # 浮点数类型转换
-                            elif field_type == 'float':
-                                if isinstance(field_value, str):
-                                    try:
-                                        field_value = float(field_value)
-                                    except ValueError:
-                                        # 如果转换失败，保留原始值
-                                        pass
-                                elif isinstance(field_value, int):
-                                    field_value = float(field_value)
-                        
-                        filtered_row[field_name] = field_value
-                    
-                    filtered_data.append(filtered_row)
-                
-                # 更新处理后的数据
-                value = filtered_data
+            start = time.perf_counter()
+            if streaming:
+                temp_file, content_hash = write_temp_chunks(output_file, content)
+            else:
+                content_hash = hash_text(content)
+            
+            # 只有数据变化时才读出上一次的数据行，未变化的工作表不需要解析旧文件
+            old_rows = None
+            if previous_hash is not None and previous_hash != content_hash and previous_hash == patch_entry.get('hash'):
+                old_rows = load_previous_rows(output_file)
+            
+            if streaming:
+                written = replace_if_changed(temp_file, output_file, content_hash, stats)
+            else:
+                written = write_if_changed(output_file, content, stats)
+            timings['write'] = time.perf_counter() - start
+            metrics['bytes'] = output_file.stat().st_size
+            if written:
+                print(f"已创建文件: {output_file}")
             
-            # 创建输出文件路径（使用小写的工作表名称）
-            lowercase_key = key.lower()
+            if patch_entry is not None:
+                # 数据文件已经替换，版本记录必须随之更新，因此紧接着写出补丁，不等C#代码生成完成
+                start = time.perf_counter()
+                new_rows = value if not streaming else None
+                result['patch'] = write_sheet_patch(sheet_name, output_file, patch_entry, previous_hash, old_rows,
+                                                    new_rows, sheet_key_field, stats)
+                timings['patch'] = time.perf_counter() - start
+        
+        # 为C#代码生成保存原始的字段类型和描述（至少有两行数据时才生成）
+        if field_types is not None and row_count >= 2:
+            # 获取原始数据中的字段类型和描述
+            original_field_descs = raw_value[1] if len(raw_value) > 1 else {}
             
-            # 创建与表格名相同的子文件夹
-            table_folder = output_path / table_name
-            table_folder.mkdir(exist_ok=True, parents=True)
+            # 准备字段数据
+            fields_data = {}
+            for field_name, field_type in field_types.items():
+                fields_data[field_name] = {
+                    'type': field_type,
+                    'desc': original_field_descs.get(field_name, "")
+                }
             
-            # 输出文件路径现在包含表格名子文件夹
-            output_file = table_folder / f"{lowercase_key}.json"
+            # 生成对应的C#代码文件
+            start = time.perf_counter()
+            if not generate_cs_file(Path("Template/Config.template"), codegen_dir, sheet_name, table_name,
+                                    fields_data, stats, string_table is not None):
+                raise RuntimeError("生成C#代码文件失败")
+            result['codegen_files'].append(codegen_dir / f"{sheet_name}.cs")
             
-            # 将数据写入输出文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(value, f, ensure_ascii=False, indent=2)
+            if sheet_key_field:
+                result['key_field'] = (sheet_key_field, field_types[sheet_key_field])
             
+            # 二进制格式还需要生成对应的读取代码
+            if data_format == 'binary':
+                if not generate_binary_reader_file(codegen_dir, sheet_name, table_name, fields_data, stats):
+                    raise RuntimeError("生成二进制读取代码失败")
+                result['codegen_files'].append(codegen_dir / f"{sheet_name}.Reader.cs")
+            timings['codegen'] = time.perf_counter() - start
+    
+    except Exception as e:
+        result['error'] = str(e)
+    
+    return result
+
+def write_sheet_shards(sheet_name, rows, table_folder, sheet_file_name, shard_rows, key_field=None, key_strings=None,
+                       stats=None):
+    """
+    按固定行数将工作表的数据行分片写出，并写出记录每个分片主键范围的索引文件
+    
+    分片保持工作表中的行顺序，按主键排序的工作表各分片的主键范围互不重叠，按主键查找时只需加载一个分片
+    
+    分片先写入临时文件，所有数据行都转换完成并生成索引后才替换现有文件；
+    流式输出时主键重复等错误会删除临时文件，现有的分片和索引保持不变
+    
+    Args:
+        sheet_name (str): 工作表名称
+        rows (iterable): 转换后的数据行，可以是逐行生成的迭代器
+        table_folder (Path): 数据文件输出目录
+        sheet_file_name (str): 数据文件名（小写的工作表名称）
+        shard_rows (int): 每个分片的行数
+        key_field (str, optional): 主键字段名
+        key_strings (list, optional): 主键已替换为字符串表序号时的字符串表，用于记录原始字符串的主键范围
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        dict: {写出的分片文件或索引文件: 行数}，索引文件的行数为工作表的总行数
+    """
+    rows = iter(rows)
+    output_files = {}
+    shards = []
+    # [(临时文件, 分片文件, 哈希)]
+    temp_files = []
+    try:
+        while True:
+            # 每次只在内存中保留一个分片的数据行
+            chunk = list(itertools.islice(rows, shard_rows))
+            if not chunk:
+                break
+            shard_name = shard_file_name(sheet_file_name, len(shards))
+            output_file = table_folder / f"{shard_name}.json"
+            temp_file, content_hash = write_temp_chunks(output_file, [json.dumps(chunk, ensure_ascii=False, indent=2)])
+            temp_files.append((temp_file, output_file, content_hash))
+            output_files[output_file] = len(chunk)
+            shard = {'file': shard_name, 'rows': len(chunk)}
+            shard.update(key_bounds(chunk, key_field, key_strings))
+            shards.append(shard)
+        index_content = build_shard_index(sheet_name, key_field, shard_rows, shards)
+    except BaseException:
+        for temp_file, _, _ in temp_files:
+            if temp_file.exists():
+                temp_file.unlink()
+        raise
+    
+    for temp_file, output_file, content_hash in temp_files:
+        if replace_if_changed(temp_file, output_file, content_hash, stats):
             print(f"已创建文件: {output_file}")
+    
+    # 索引最后替换，读取索引时对应的分片都已写出
+    index_file = table_folder / f"{shard_index_file_name(sheet_file_name)}.json"
+    if write_if_changed(index_file, index_content, stats):
+        print(f"已创建分片索引: {index_file}（{len(shards)} 个分片）")
+    output_files[index_file] = sum(shard['rows'] for shard in shards)
+    return output_files
+
+def write_sheet_patch(sheet_name, data_file, patch_entry, previous_hash, old_rows, new_rows=None, key_field=None,
+                      stats=None):
+    """
+    数据文件变化时版本号加一，并写出从上一个版本升级到新版本的补丁文件
+    
+    补丁文件保存在数据文件目录下的patches目录中，只包含新增、修改和删除的数据行，
+    客户端已有上一个版本时只需下载补丁，参见sheet_patch.diff_rows
+    
+    Args:
+        sheet_name (str): 工作表名称
+        data_file (Path): 已写出的数据文件
+        patch_entry (dict): 版本文件中该工作表上一次的记录，没有记录时为空字典
+        previous_hash (str): 覆盖前的数据文件的哈希，文件不存在时为None
+        old_rows (list, optional): 覆盖前的数据文件中的数据行；覆盖前的文件不是版本记录中的版本（例如被删除，
+            或者中间有一次没有记录版本的导出）时无法计算补丁，写出重置记录，客户端需要重新加载完整的数据文件，
+            参见sheet_patch.build_patch
+        new_rows (list, optional): 本次导出的数据行，默认从数据文件读取
+        key_field (str, optional): 主键字段名
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        dict: 新的版本记录{'version': 版本号, 'hash': 数据文件的哈希}
+    """
+    data_hash = hash_file(data_file)
+    version = patch_entry.get('version', 0)
+    if not version:
+        # 第一次记录的工作表从版本1开始，没有可以比较的版本
+        return {'version': 1, 'hash': data_hash}
+    if data_hash == patch_entry.get('hash'):
+        return {'version': version, 'hash': data_hash}
+    
+    new_version = version + 1
+    patch_file = data_file.parent / PATCH_DIR_NAME / patch_file_name(data_file.stem, new_version)
+    if old_rows is None or previous_hash != patch_entry.get('hash'):
+        # 每个版本都有补丁文件，客户端按版本依次更新时不会跳过这个版本
+        if write_if_changed(patch_file, build_patch(sheet_name, version, new_version), stats):
+            print(f"已创建重置记录: {patch_file}（上一次的数据文件不是版本 {version}，需要重新加载完整的数据文件）")
+        return {'version': new_version, 'hash': data_hash}
+    
+    if new_rows is None:
+        new_rows = load_previous_rows(data_file)
+    diff = diff_rows(old_rows, new_rows, key_field)
+    if write_if_changed(patch_file, build_patch(sheet_name, version, new_version, diff), stats):
+        print(f"已创建补丁: {patch_file}（新增 {len(diff['added'])} 行，修改 {len(diff['changed'])} 行，"
+              f"删除 {len(diff['removed']) if diff['keyField'] else diff['removedCount']} 行）")
+    return {'version': new_version, 'hash': data_hash}
+
+def write_manifest(manifest_file, table_name, table_folder, codegen_dir, data_files, codegen_files, file_info,
+                   stats=None):
+    """
+    写出表格的清单：每个数据文件和C#代码文件的内容哈希、大小、行数和结构指纹
+    
+    清单按上一次的清单增量更新：本次未重写（内容未变化）且大小相同的文件沿用上一次记录的哈希，
+    只重新计算写入过的文件的哈希；清单内容未变化时不重写。补丁目录中的文件不在清单中
+    
+    Args:
+        manifest_file (Path): 清单文件路径
+        table_name (str): 表格名称
+        table_folder (Path): 数据文件输出目录
+        codegen_dir (Path): C#代码输出目录
+        data_files (set): 本次生成的数据文件
+        codegen_files (set): 本次生成的C#代码文件
+        file_info (dict): {文件: {'sheet': 工作表名称, 'rows': 行数, 'schema': 结构指纹}}
+        stats (dict, optional): new_write_stats创建的统计字典
+    
+    Returns:
+        bool: 是否写入了清单文件
+    """
+    previous = load_manifest(manifest_file)
+    unchanged = set(stats['unchanged']) if stats is not None else set()
+    sections = []
+    for section, root, files in (('data', table_folder, data_files), ('code', codegen_dir, codegen_files)):
+        previous_entries = previous.get(section) or {}
+        entries = {}
+        for file in files:
+            name = relative_name(file, root)
+            size = file.stat().st_size
+            previous_entry = previous_entries.get(name) or {}
+            if file in unchanged and previous_entry.get('size') == size and previous_entry.get('hash'):
+                content_hash = previous_entry['hash']
+            else:
+                # 按字节计算，与下游构建资源包或客户端校验下载时计算的哈希一致
+                content_hash = hash_file(file, binary=True)
+            entries[name] = manifest_entry(content_hash, size, file_info.get(file))
+        sections.append(entries)
+    
+    written = write_if_changed(manifest_file, dump_manifest(table_name, *sections), stats)
+    if written:
+        print(f"已更新清单: {manifest_file}")
+    return written
+
+def split_sheets_data(data, table_name, output_path, output_script_path, engine='auto', columnar_min_rows=None,
+                      data_format='json', key_field=None, stream=False, jobs=1, intern_strings=False, patches=False,
+                      shard_rows=None, manifest=True):
+    """
+    将已拉取的按工作表分组的数据拆分成多个子文件，并生成对应的C#代码
+    
+    与split_json_file的处理完全相同，但直接使用内存中的数据，不需要先写出合并的JSON文件再读回
+    
+    Args:
+        data (dict): 按工作表名称分组的数据，{工作表名称: [字段类型行, 字段描述行, 数据行...]或SheetTable}
+        table_name (str): 表格名称（用作命名空间和输出子目录名）
+        output_path (Path): 拆分后的JSON文件输出目录
+        output_script_path (Path): 生成的C#代码输出目录
+        engine (str): 数据行转换方式，参见convert_sheet_rows
+        columnar_min_rows (int, optional): auto模式下使用列式转换的最小行数
+        data_format (str): 数据文件格式，json或binary
+        key_field (str, optional): 主键字段名，工作表中没有该字段时按约定使用id字段，参见detect_key_field
+        stream (bool): JSON格式时是否逐行转换并写出，不在内存中保存转换后的整个工作表
+        jobs (int): 并行处理工作表的进程数，1表示在当前进程中依次处理
+        intern_strings (bool): JSON格式时是否将string和arraystring值收集到共享的字符串表，数据文件中只写序号
+        patches (bool): JSON格式时是否记录每个工作表的版本，数据变化时生成只包含变化行的补丁文件
+        shard_rows (int, optional): JSON格式时行数超过该值的工作表按该行数分片写出，并写出分片索引
+        manifest (bool): 是否在数据文件目录中写出清单，记录所有数据文件和C#代码文件的哈希、大小、行数和结构指纹
+    
+    Returns:
+        bool: 操作是否成功
+    """
+    # 统计输出文件的写入情况，并记录本次生成的所有文件
+    stats = new_write_stats()
+    output_files = set()
+    codegen_files = set()
+    # 清单中每个文件所属的工作表、行数和结构指纹
+    file_info = {}
+    
+    try:
+        output_path = Path(output_path)
+        output_script_path = Path(output_script_path)
+        
+        # 确保输出目录存在
+        output_path.mkdir(exist_ok=True, parents=True)
+        
+        # 确保$name/GodeGen文件夹存在
+        codegen_dir = ensure_codegen_dir(output_script_path, table_name)
+        
+        # 创建与表格名相同的子文件夹
+        table_folder = output_path / table_name
+        table_folder.mkdir(exist_ok=True, parents=True)
+        
+        if manifest and MANIFEST_FILE_NAME in (f"{sheet_name.lower()}.json" for sheet_name in data):
+            print(f"错误: 工作表的数据文件与清单文件 {MANIFEST_FILE_NAME} 重名")
+            return False
+        
+        string_table = None
+        if intern_strings and data_format != 'json':
+            print("字符串表只用于JSON格式，二进制格式忽略--intern-strings")
+            intern_strings = False
+        if intern_strings:
+            if STRING_TABLE_NAME in (sheet_name.lower() for sheet_name in data):
+                print(f"错误: 工作表名称 {STRING_TABLE_NAME} 与字符串表的数据文件重名")
+                return False
             
-            # 为C#代码生成保存原始的字段类型和描述
-            if isinstance(value, list) and len(value) >= 2:
-                # 获取原始数据中的字段类型和描述
-                original_field_types = data[key][0]
-                original_field_descs = data[key][1] if len(data[key]) > 1 else {}
-                
-                # 准备字段数据
-                fields_data = {}
-                for field_name, field_type in original_field_types.items():
-                    fields_data[field_name] = {
-                        'type': field_type,
-                        'desc': original_field_descs.get(field_name, "")
-                    }
-                
-                # 生成对应的C#代码文件
-                generate_cs_file(
-                    Path("Template/Config.template"),
-                    codegen_dir,
-                    key,  # 类名
-                    table_name,  # 命名空间
-                    fields_data
-                )
-        
-        # 生成ConfigManager类文件
-        generate_config_manager(codegen_dir, table_name, sheet_names)
+            # 先写出字符串表，所有工作表的数据文件都引用其中的序号
+            with profiler.stage('intern_strings', workbook=table_name):
+                string_table = build_string_table(data)
+                string_file = table_folder / f"{STRING_TABLE_NAME}.json"
+                if write_if_changed(string_file, json.dumps(list(string_table), ensure_ascii=False, indent=2), stats):
+                    print(f"已创建文件: {string_file}")
+            output_files.add(string_file)
+            file_info[string_file] = {'rows': len(string_table)}
+            print(f"字符串表: {len(string_table)} 个不同的字符串")
+        
+        if shard_rows is not None and shard_rows < 1:
+            print(f"错误: 每个分片的行数必须大于0: {shard_rows}")
+            return False
+        if shard_rows and data_format != 'json':
+            print("分片只用于JSON格式，二进制格式忽略--shard-rows")
+            shard_rows = None
+        
+        patch_dir = table_folder / PATCH_DIR_NAME
+        versions = {}
+        if patches and data_format != 'json':
+            print("补丁只用于JSON格式，二进制格式忽略--patches")
+            patches = False
+        if patches and intern_strings:
+            # 字符串表的序号随所有工作表的内容变化，补丁中的序号无法对应客户端已有的字符串表
+            print("使用字符串表时无法生成补丁，忽略--patches")
+            patches = False
+        if patches and shard_rows:
+            # 补丁按整个数据文件比较，分片后没有完整的数据文件
+            print("分片输出时无法生成补丁，忽略--patches")
+            patches = False
+        if patches:
+            patch_dir.mkdir(exist_ok=True)
+            versions = load_versions(patch_dir)
+            patch_entries = {key: versions.get(key.lower(), {}) for key in data}
+        else:
+            patch_entries = {}
+        
+        # 拆分JSON文件，结果按工作表原来的顺序收集，与并行时的完成顺序无关
+        sheet_options = {
+            'engine': engine,
+            'columnar_min_rows': columnar_min_rows,
+            'data_format': data_format,
+            'key_field': key_field,
+            'stream': stream,
+            'string_table': string_table,
+            'shard_rows': shard_rows
+        }
+        jobs = min(jobs or 1, len(data))
+        if jobs > 1:
+            # 进程池模块导入较慢，只在并行时才导入
+            from concurrent.futures import ProcessPoolExecutor
+            print(f"使用 {jobs} 个进程并行拆分 {len(data)} 个工作表")
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [(key, executor.submit(process_sheet, key, value, table_name, table_folder, codegen_dir,
+                                                 patch_entry=patch_entries.get(key), **sheet_options))
+                           for key, value in data.items()]
+                results = []
+                for key, future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        # 子进程异常退出或数据无法pickle时，任务本身不会返回结果
+                        results.append({'sheet': key, 'error': f"{type(e).__name__}: {e}"})
+        else:
+            results = [process_sheet(key, value, table_name, table_folder, codegen_dir,
+                                     patch_entry=patch_entries.get(key), **sheet_options)
+                       for key, value in data.items()]
+    
+    except Exception as e:
+        print(f"拆分JSON文件时出错: {e}")
+        return False
+    
+    # 收集所有工作表名称，以及有主键的工作表的主键字段和类型
+    sheet_names = list(data.keys())
+    key_fields = {}
+    sharded_sheets = []
+    failed_sheets = []
+    new_versions = {}
+    
+    for result in results:
+        # 各工作表的耗时在处理它的进程中测量，这里统一计入性能报告
+        for stage_name, seconds in result.get('timings', {}).items():
+            profiler.record(stage_name, seconds, workbook=table_name, sheet=result['sheet'])
+        if result.get('metrics'):
+            profiler.add_sheet_metrics(table_name, result['sheet'], **result['metrics'])
+        
+        # 拆分失败的工作表可能已经写出了数据文件，只要有新的版本记录就要保存
+        lowercase_key = result['sheet'].lower()
+        if result.get('patch'):
+            new_versions[lowercase_key] = result['patch']
+        elif lowercase_key in versions:
+            new_versions[lowercase_key] = versions[lowercase_key]
+        
+        if result['error']:
+            print(f"工作表 {result['sheet']} 拆分失败: {result['error']}")
+            failed_sheets.append(result['sheet'])
+            continue
+        
+        output_files.update(result['output_files'])
+        codegen_files.update(result['codegen_files'])
+        for output_file, rows in result['file_rows'].items():
+            file_info[output_file] = {'sheet': result['sheet'], 'rows': rows, 'schema': result['schema']}
+        for codegen_file in result['codegen_files']:
+            file_info[codegen_file] = {'sheet': result['sheet'], 'rows': result['metrics'].get('rows'),
+                                       'schema': result['schema']}
+        for name in stats:
+            stats[name].extend(result['stats'][name])
+        if result['key_field']:
+            key_fields[result['sheet']] = result['key_field']
+        if result.get('sharded'):
+            sharded_sheets.append(result['sheet'])
+    
+    if patches:
+        try:
+            if write_if_changed(patch_dir / VERSIONS_FILE_NAME, dump_versions(new_versions), stats):
+                print(f"已更新版本文件: {patch_dir / VERSIONS_FILE_NAME}")
+        except Exception as e:
+            print(f"写入版本文件时出错: {e}")
+            return False
+    
+    if failed_sheets:
+        # 失败的工作表没有生成新文件，此时删除旧文件或重新生成ConfigManager会丢失这些工作表
+        print(f"有 {len(failed_sheets)} 个工作表拆分失败（{', '.join(failed_sheets)}），"
+              f"未生成ConfigManager，也未删除旧文件")
+        print_write_stats(stats)
+        return False
+    
+    try:
+        with profiler.stage('manager', workbook=table_name):
+            # 按启用的选项生成公共代码文件
+            support_files = [
+                (data_format == 'binary', 'ConfigBinaryReader'),
+                (intern_strings, 'ConfigStringTable'),
+                (patches, 'ConfigPatch'),
+                (sharded_sheets, 'ConfigShard'),
+            ]
+            for enabled, class_name in support_files:
+                if not enabled:
+                    continue
+                if not generate_support_file(f"{class_name}.template", f"{class_name}.cs", codegen_dir, table_name,
+                                             stats):
+                    return False
+                codegen_files.add(codegen_dir / f"{class_name}.cs")
+            
+            # 生成ConfigManager类文件
+            if not generate_config_manager(codegen_dir, table_name, sheet_names, stats, data_format, key_fields,
+                                           intern_strings, patches, sharded_sheets):
+                return False
+        codegen_files.add(codegen_dir / f"{table_name}ConfigManager.Loader.cs")
+        
+        # 少于两行数据的工作表不重新生成C#类，但ConfigManager仍然引用这些类，保留之前生成的类文件
+        for sheet_name in sheet_names:
+            class_files = [codegen_dir / f"{sheet_name}.cs"]
+            if data_format == 'binary':
+                class_files.append(codegen_dir / f"{sheet_name}.Reader.cs")
+            codegen_files.update(class_file for class_file in class_files if class_file.exists())
+        
+        manifest_file = table_folder / MANIFEST_FILE_NAME
+        data_files = set(output_files)
+        if manifest:
+            output_files.add(manifest_file)
+        
+        # 只删除已经不存在的工作表对应的旧文件（包括切换格式后另一种格式的数据文件）
+        remove_stale_files(table_folder, "*.json", output_files, stats)
+        remove_stale_files(table_folder, f"*{BINARY_EXTENSION}", output_files, stats)
+        remove_stale_files(codegen_dir, "*.cs", codegen_files, stats)
+        if patches:
+            # 删除已经不存在的工作表的补丁，以及超出保留数量的旧补丁
+            remove_stale_files(patch_dir, "*.json", kept_patch_files(patch_dir, new_versions), stats)
+        
+        if manifest:
+            with profiler.stage('manifest', workbook=table_name):
+                write_manifest(manifest_file, table_name, table_folder, codegen_dir, data_files, codegen_files,
+                               file_info, stats)
         
+        print_write_stats(stats)
         return True
     
     except Exception as e:
@@ -502,6 +1576,9 @@ def main():
     parser.add_argument('--input', required=True, help='输入JSON文件路径')
     parser.add_argument('--output-dir', help='输出目录路径，默认为输入文件的父目录的父目录下的export文件夹')
     parser.add_argument('--output-script-dir', help='输出脚本目录路径，默认为输入文件的父目录的父目录下的GodeGen文件夹')
+    parser.add_argument('--key_field', help='主键字段名，默认使用名为id的字段')
+    add_split_arguments(parser, '--format')
+    add_profile_arguments(parser)
     # 如果没有参数，但有位置参数，则将第一个位置参数作为输入文件
     if len(sys.argv) == 2 and not sys.argv[1].startswith('--'):
         args = parser.parse_args(['--input', sys.argv[1]])
@@ -510,7 +1587,9 @@ def main():
     
     # 拆分JSON文件
     print(f"正在拆分JSON文件: {args.input}")
-    success = split_json_file(args.input, args.output_dir, args.output_script_dir)
+    with profile_from_args(args):
+        success = split_json_file(args.input, args.output_dir, args.output_script_dir, key_field=args.key_field,
+                                  **split_options_from_args(args))
     
     if success:
         print("拆分JSON文件成功")
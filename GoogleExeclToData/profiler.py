@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import threading
+import contextlib
+from pathlib import Path
+
+# --profile未指定文件名时使用的报告文件
+DEFAULT_PROFILE_FILE = 'profile.json'
+
+# 这些阶段是对Google API的请求，第一个请求开始的时间即报告中的first_request_seconds
+REQUEST_STAGES = ('metadata', 'fetch')
+
+# 当前启用的记录器，为None时所有记录函数都不做任何事
+_active = None
+
+class Profiler:
+    """
+    记录导出流程各阶段的耗时、计数器和每个工作表的统计数据
+    
+    可以在多个线程中同时使用
+    """
+    
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self.sheets = {}
+        self._lock = threading.Lock()
+    
+    def record(self, name, seconds, start=None, **labels):
+        """
+        记录一个已完成的阶段
+        
+        Args:
+            name (str): 阶段名称，例如auth、fetch、convert
+            seconds (float): 耗时（秒）
+            start (float, optional): 开始时间（time.perf_counter），默认按结束时间倒推
+            **labels: 附加标签，例如workbook、sheet
+        """
+        if start is None:
+            start = time.perf_counter() - seconds
+        event = {'stage': name, 'start': round(start - self.start_time, 6), 'seconds': round(seconds, 6)}
+        event.update(labels)
+        with self._lock:
+            self.events.append(event)
+    
+    @contextlib.contextmanager
+    def stage(self, name, **labels):
+        """记录with块的耗时，块内抛出异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, start, **labels)
+    
+    def count(self, name, amount=1):
+        """累加计数器，例如API调用次数"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def add_sheet_metrics(self, workbook, sheet, **metrics):
+        """累加一个工作表的统计数据，例如rows、cells、bytes"""
+        key = f"{workbook}/{sheet}"
+        with self._lock:
+            sheet_metrics = self.sheets.setdefault(key, {})
+            for name, value in metrics.items():
+                sheet_metrics[name] = sheet_metrics.get(name, 0) + value
+    
+    def report(self):
+        """
+        生成报告
+        
+        Returns:
+            dict: 包含总耗时、第一个API请求开始的时间、按阶段汇总的耗时、按表格汇总的耗时、计数器、工作表统计和完整的阶段记录
+        """
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['start'])
+            counters = dict(sorted(self.counters.items()))
+            sheets = dict(sorted(self.sheets.items()))
+        
+        stages = {}
+        workbooks = {}
+        for event in events:
+            summary = stages.setdefault(event['stage'], {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            summary['count'] += 1
+            summary['total_seconds'] += event['seconds']
+            summary['max_seconds'] = max(summary['max_seconds'], event['seconds'])
+            if 'workbook' in event:
+                workbook = workbooks.setdefault(event['workbook'], {})
+                workbook[event['stage']] = workbook.get(event['stage'], 0.0) + event['seconds']
+        
+        for summary in stages.values():
+            summary['total_seconds'] = round(summary['total_seconds'], 6)
+        for workbook in workbooks.values():
+            for name in workbook:
+                workbook[name] = round(workbook[name], 6)
+        
+        first_request = next((event['start'] for event in events if event['stage'] in REQUEST_STAGES), None)
+        
+        return {
+            'total_seconds': round(time.perf_counter() - self.start_time, 6),
+            'first_request_seconds': first_request,
+            'stages': stages,
+            'workbooks': workbooks,
+            'counters': counters,
+            'sheets': sheets,
+            'events': events
+        }
+    
+    def write(self, output_file):
+        """将报告写入JSON文件，并打印各阶段的汇总"""
+        report = self.report()
+        output_file = Path(output_file)
+        output_file.parent.mkdir(exist_ok=True, parents=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        
+        print(f"性能报告已保存到: {output_file}（总耗时 {report['total_seconds']:.2f} 秒）")
+        if report['first_request_seconds'] is not None:
+            print(f"  第一个API请求开始于 {report['first_request_seconds']:.3f} 秒")
+        for name, summary in sorted(report['stages'].items(), key=lambda item: -item[1]['total_seconds']):
+            print(f"  {name}: {summary['total_seconds']:.3f} 秒，{summary['count']} 次，"
+                  f"最长 {summary['max_seconds']:.3f} 秒")
+        if len(report['workbooks']) > 1:
+            # 阶段之间可能相互包含（例如workbook.export包含convert），因此不求和，按耗时最长的阶段排序
+            print("按表格汇总:")
+            for name, workbook in sorted(report['workbooks'].items(), key=lambda item: -max(item[1].values())):
+                slowest = sorted(workbook.items(), key=lambda item: -item[1])[:3]
+                print(f"  {name}: " + "，".join(f"{stage} {seconds:.3f} 秒" for stage, seconds in slowest))
+        return report
+
+def enable():
+    """启用记录，返回新的Profiler"""
+    global _active
+    _active = Profiler()
+    return _active
+
+def disable():
+    """停用记录"""
+    global _active
+    _active = None
+
+def get_profiler():
+    """获取当前启用的Profiler，未启用时返回None"""
+    return _active
+
+def stage(name, **labels):
+    """记录with块的耗时，未启用时不做任何事"""
+    profiler = _active
+    return profiler.stage(name, **labels) if profiler else contextlib.nullcontext()
+
+def record(name, seconds, **labels):
+    """记录一个已完成的阶段，未启用时不做任何事"""
+    profiler = _active
+    if profiler:
+        profiler.record(name, seconds, **labels)
+
+def count(name, amount=1):
+    """累加计数器，未启用时不做任何事"""
+    profiler = _active
+    if profiler:
+        profiler.count(name, amount)
+
+def add_sheet_metrics(workbook, sheet, **metrics):
+    """累加一个工作表的统计数据，未启用时不做任何事"""
+    profiler = _active
+    if profiler:
+        profiler.add_sheet_metrics(workbook, sheet, **metrics)
+
+def add_profile_arguments(parser):
+    """为命令行解析器添加性能分析相关的参数"""
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_FILE, metavar='FILE',
+                        help=f'记录各阶段的耗时和计数，结束时以JSON格式写入FILE（默认为{DEFAULT_PROFILE_FILE}）')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='同时使用cProfile记录主线程的函数调用，保存为pstats文件')
+
+@contextlib.contextmanager
+def profile_from_args(args):
+    """
+    按命令行参数启用阶段记录和cProfile，with块结束时写出报告
+    
+    Yields:
+        Profiler: 启用的记录器，未指定--profile时为None
+    """
+    profiler = enable() if args.profile else None
+    cprofile = None
+    if args.cprofile:
+        # 只在指定--cprofile时才导入，不影响普通运行的启动时间
+        import cProfile
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if cprofile:
+            cprofile.disable()
+            cprofile.dump_stats(args.cprofile)
+            print(f"cProfile结果已保存到: {args.cprofile}（可使用 python -m pstats {args.cprofile} 查看）")
+        if profiler:
+            profiler.write(args.profile)
+            disable()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import threading
+import profiler
+
+# Sheets API读取配额：每个用户每分钟60个请求
+DEFAULT_REQUESTS_PER_MINUTE = 60
+# 令牌桶的容量，允许短时间内连续发出的请求数量
+DEFAULT_BURST = 10
+# 请求失败后最多重试的次数
+DEFAULT_MAX_RETRIES = 6
+# 指数退避的初始等待时间和最长等待时间（秒）
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 64.0
+# 每个HTTP连接的超时时间（秒）
+DEFAULT_HTTP_TIMEOUT = 120
+
+# 可以重试的HTTP状态码：频率限制和服务端错误
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+# 403响应的原因包含这些关键字时同样是频率限制，可以重试
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded', 'Quota exceeded')
+
+# 当前使用的调度器，由configure创建
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# 每个线程复用的已授权HTTP连接
+_local = threading.local()
+
+def error_status(error):
+    """获取googleapiclient.errors.HttpError（或FakeHttpError）的HTTP状态码，其他异常返回None"""
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable_error(error):
+    """请求失败是否可以重试：429、5xx、原因为频率限制的403，以及连接中断或超时"""
+    status = error_status(error)
+    if status is None:
+        return isinstance(error, (ConnectionError, TimeoutError))
+    if status in RETRYABLE_STATUS:
+        return True
+    return status == 403 and any(reason in str(error) for reason in RATE_LIMIT_REASONS)
+
+def retry_after_seconds(error):
+    """响应头中Retry-After指定的等待秒数，没有时返回None"""
+    resp = getattr(error, 'resp', None)
+    if not isinstance(resp, dict):
+        return None
+    try:
+        return float(resp.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def authorized_http(creds, timeout=DEFAULT_HTTP_TIMEOUT):
+    """
+    获取当前线程复用的已授权HTTP连接
+    
+    同一线程中创建的Sheets API和Drive API服务共用一个httplib2连接池，保持长连接；
+    httplib2的连接不是线程安全的，因此每个线程各自创建一个
+    """
+    cached = getattr(_local, 'http', None)
+    if cached and cached[0] is creds:
+        return cached[1]
+    
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=timeout))
+    _local.http = (creds, http)
+    return http
+
+class RequestScheduler:
+    """
+    调度所有Google API请求：按配额用令牌桶限制请求速率，请求遇到频率限制或服务端错误时
+    按带随机抖动的指数退避重试
+    
+    可以在多个线程中同时使用，所有线程共享同一个令牌桶
+    """
+    
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        """
+        Args:
+            requests_per_minute (float): 每分钟最多发出的请求数量，为None或0时不限制
+            burst (int): 令牌桶的容量
+            max_retries (int): 每个请求最多重试的次数
+            backoff_base (float): 第一次重试前的最长等待时间（秒），之后每次加倍
+            backoff_max (float): 每次重试前的最长等待时间（秒）
+        """
+        self.rate = requests_per_minute / 60 if requests_per_minute else None
+        self.capacity = max(1, burst)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.start_time = time.monotonic()
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'throttled_seconds': 0.0, 'backoff_seconds': 0.0}
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        从令牌桶中取出一个令牌，令牌不足时等待
+        
+        Returns:
+            float: 等待的秒数
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 先预订令牌再在锁外等待，令牌数为负表示已经被预订的令牌
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def _drain(self):
+        """遇到频率限制时清空令牌桶，其他线程的请求也随之放慢"""
+        if self.rate:
+            with self._lock:
+                self._tokens = min(self._tokens, 0.0)
+    
+    def backoff_delay(self, attempt, error=None):
+        """第attempt次重试前的等待秒数：在指数增长的上限内随机选择，服务端指定了Retry-After时不少于该值"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+    
+    def _add_stats(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.stats[name] += amount
+        for name, amount in amounts.items():
+            profiler.count(f"scheduler.{name}", amount)
+    
+    def execute(self, request, name='request'):
+        """
+        执行一个googleapiclient请求（任何带execute方法的对象）
+        
+        Args:
+            request: 例如service.spreadsheets().values().batchGet(...)返回的请求
+            name (str): 请求名称，用于输出重试信息
+        
+        Returns:
+            dict: 请求的响应
+        
+        Raises:
+            Exception: 不可重试的错误，或重试次数用尽后最后一次的错误
+        """
+        attempt = 0
+        while True:
+            waited = self.acquire()
+            self._add_stats(requests=1, throttled_seconds=waited)
+            try:
+                return request.execute()
+            except Exception as e:
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    self._add_stats(failures=1)
+                    raise
+                if error_status(e) in (403, 429):
+                    self._drain()
+                delay = self.backoff_delay(attempt, e)
+                attempt += 1
+                print(f"{name} 请求失败（{error_status(e) or type(e).__name__}），{delay:.1f} 秒后第 {attempt} 次重试")
+                self._add_stats(retries=1, backoff_seconds=delay)
+                time.sleep(delay)
+    
+    def summary(self):
+        """
+        请求统计
+        
+        Returns:
+            dict: 请求次数、重试次数、失败次数、令牌桶和退避的等待时间，以及每分钟的平均请求数
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        elapsed = time.monotonic() - self.start_time
+        stats['throttled_seconds'] = round(stats['throttled_seconds'], 3)
+        stats['backoff_seconds'] = round(stats['backoff_seconds'], 3)
+        stats['requests_per_minute'] = round(stats['requests'] / elapsed * 60, 1) if elapsed > 0 else None
+        return stats
+
+def configure(requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST, max_retries=DEFAULT_MAX_RETRIES):
+    """创建新的调度器并设为当前调度器，返回该调度器"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = RequestScheduler(requests_per_minute, burst, max_retries)
+        return _scheduler
+
+def get_scheduler():
+    """获取当前调度器，尚未配置时按默认配额创建"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+def execute(request, name='request'):
+    """通过当前调度器执行请求，参见RequestScheduler.execute"""
+    return get_scheduler().execute(request, name)
+
+def add_scheduler_arguments(parser):
+    """为命令行解析器添加请求调度相关的参数"""
+    parser.add_argument('--max-requests-per-minute', type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f'每分钟最多发出的Google API请求数量（0表示不限制），默认为{DEFAULT_REQUESTS_PER_MINUTE}')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'请求遇到429或5xx错误时最多重试的次数，默认为{DEFAULT_MAX_RETRIES}')
+
+def configure_from_args(args):
+    """按命令行参数配置调度器；回放时不访问网络，不限制请求速率"""
+    requests_per_minute = None if getattr(args, 'replay', None) else args.max_requests_per_minute
+    return configure(requests_per_minute, DEFAULT_BURST, args.max_retries)
+
+def print_summary(scheduler=None):
+    """打印请求统计，只在发生过等待或重试时打印"""
+    stats = (scheduler or get_scheduler()).summary()
+    if stats['retries'] or stats['throttled_seconds'] >= 1:
+        print(f"API请求 {stats['requests']} 次（平均每分钟 {stats['requests_per_minute']} 次），"
+              f"重试 {stats['retries']} 次，失败 {stats['failures']} 次，"
+              f"限速等待 {stats['throttled_seconds']:.1f} 秒，退避等待 {stats['backoff_seconds']:.1f} 秒")
+    return stats
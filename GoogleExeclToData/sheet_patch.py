@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from pathlib import Path
+
+# 补丁文件所在的子目录（位于表格的数据文件目录下）和记录每个工作表当前版本的文件
+PATCH_DIR_NAME = 'patches'
+VERSIONS_FILE_NAME = 'versions.json'
+
+# 每个工作表最多保留的补丁数量，更早的补丁会被删除（版本更旧的客户端需要重新下载完整的数据文件）
+MAX_PATCH_HISTORY = 50
+
+def patch_file_name(sheet_file_name, version):
+    """升级到version的补丁文件名，例如item.3.json"""
+    return f"{sheet_file_name}.{version}.json"
+
+def load_versions(patch_dir):
+    """
+    读取每个工作表当前的版本
+    
+    Returns:
+        dict: {工作表数据文件名（小写的工作表名称）: {'version': 版本号, 'hash': 数据文件的哈希}}，文件不存在或无法读取时为空
+    """
+    versions_file = Path(patch_dir) / VERSIONS_FILE_NAME
+    try:
+        with open(versions_file, 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+        return versions if isinstance(versions, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def dump_versions(versions):
+    """版本文件的内容，按工作表排序，相同的版本总是生成相同的文本"""
+    return json.dumps(dict(sorted(versions.items())), ensure_ascii=False, indent=2)
+
+def load_previous_rows(data_file):
+    """
+    读取上一次导出的数据文件中的数据行
+    
+    Returns:
+        list: 数据行列表，文件不存在或不是数据行列表时返回None
+    """
+    try:
+        with open(data_file, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None
+    return rows
+
+def _row_signature(row):
+    # 按JSON文本比较，避免1、1.0和True被当作相同的值
+    return json.dumps(row, ensure_ascii=False, sort_keys=True)
+
+def diff_rows(old_rows, new_rows, key_field=None):
+    """
+    比较两次导出的数据行
+    
+    所有行都有主键时按主键匹配：新增的行追加到末尾，修改的行原位替换，删除的行按主键删除；
+    否则按行号匹配：修改的行按行号替换，多出的行追加到末尾，减少的行从末尾删除
+    
+    Args:
+        old_rows (list): 上一次导出的数据行
+        new_rows (list): 本次导出的数据行
+        key_field (str, optional): 主键字段名
+    
+    Returns:
+        dict: 按主键匹配时为{'keyField', 'added', 'changed', 'removed'}，
+            按行号匹配时为{'keyField': None, 'added', 'changed', 'changedIndexes', 'removedCount'}
+    """
+    if key_field and all(key_field in row for row in old_rows) and all(key_field in row for row in new_rows):
+        old_signatures = {json.dumps(row[key_field]): _row_signature(row) for row in old_rows}
+        new_keys = set()
+        added = []
+        changed = []
+        for row in new_rows:
+            key = json.dumps(row[key_field])
+            new_keys.add(key)
+            signature = old_signatures.get(key)
+            if signature is None:
+                added.append(row)
+            elif signature != _row_signature(row):
+                changed.append(row)
+        removed = [row[key_field] for row in old_rows if json.dumps(row[key_field]) not in new_keys]
+        return {'keyField': key_field, 'added': added, 'changed': changed, 'removed': removed}
+    
+    common = min(len(old_rows), len(new_rows))
+    changed_indexes = [index for index in range(common)
+                       if _row_signature(old_rows[index]) != _row_signature(new_rows[index])]
+    return {
+        'keyField': None,
+        'added': new_rows[common:],
+        'changed': [new_rows[index] for index in changed_indexes],
+        'changedIndexes': changed_indexes,
+        'removedCount': len(old_rows) - common
+    }
+
+def build_patch(sheet_name, from_version, to_version, diff=None):
+    """
+    生成补丁文件的内容（不缩进，减小下发的大小）
+    
+    Args:
+        sheet_name (str): 工作表名称
+        from_version (int): 补丁适用的版本
+        to_version (int): 应用补丁后的版本
+        diff (dict, optional): diff_rows的结果，为None时生成重置记录{'reset': true}，
+            表示无法计算变化的行，客户端需要重新加载完整的数据文件
+    
+    Returns:
+        str: JSON文本
+    """
+    patch = {'sheet': sheet_name, 'fromVersion': from_version, 'toVersion': to_version}
+    if diff is None:
+        patch['reset'] = True
+    else:
+        patch.update(diff)
+    return json.dumps(patch, ensure_ascii=False, separators=(',', ':'))
+
+def kept_patch_files(patch_dir, versions):
+    """
+    需要保留的补丁文件：每个工作表最近MAX_PATCH_HISTORY个版本的补丁，以及版本文件
+    
+    Returns:
+        set: 文件路径集合
+    """
+    patch_dir = Path(patch_dir)
+    keep_files = {patch_dir / VERSIONS_FILE_NAME}
+    for sheet_file_name, entry in versions.items():
+        version = entry.get('version', 0)
+        for kept_version in range(max(2, version - MAX_PATCH_HISTORY + 1), version + 1):
+            keep_files.add(patch_dir / patch_file_name(sheet_file_name, kept_version))
+    return keep_files
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+# 分片索引文件名的后缀，例如item.index.json
+SHARD_INDEX_SUFFIX = 'index'
+
+def shard_file_name(sheet_file_name, shard):
+    """第shard个分片的文件名（不含扩展名，与Resources路径一致），例如item.0"""
+    return f"{sheet_file_name}.{shard}"
+
+def shard_index_file_name(sheet_file_name):
+    """分片索引的文件名（不含扩展名），例如item.index"""
+    return f"{sheet_file_name}.{SHARD_INDEX_SUFFIX}"
+
+def should_shard(row_count, shard_rows):
+    """行数超过每个分片的行数时才分片"""
+    return bool(shard_rows) and row_count > shard_rows
+
+def key_bounds(rows, key_field, key_strings=None):
+    """
+    一个分片中主键的最小值和最大值
+    
+    Args:
+        rows (list): 分片中的数据行
+        key_field (str): 主键字段名，为None时没有范围
+        key_strings (list, optional): 字符串表，主键已替换为字符串表序号时按序号取回原始字符串
+    
+    Returns:
+        dict: {'minKey': 最小值, 'maxKey': 最大值}，没有主键或主键无法比较（转换失败保留了原始字符串）时为空
+    """
+    if not key_field:
+        return {}
+    keys = [row[key_field] for row in rows if key_field in row]
+    if key_strings is not None:
+        keys = [key_strings[key] for key in keys]
+    try:
+        return {'minKey': min(keys), 'maxKey': max(keys)} if keys else {}
+    except TypeError:
+        return {}
+
+def build_shard_index(sheet_name, key_field, shard_rows, shards):
+    """
+    生成分片索引文件的内容
+    
+    Args:
+        sheet_name (str): 工作表名称
+        key_field (str): 主键字段名，没有主键时为None
+        shard_rows (int): 每个分片的行数
+        shards (list): 每个分片的{'file': 文件名, 'rows': 行数, 'minKey': 最小主键, 'maxKey': 最大主键}
+    
+    Returns:
+        str: JSON文本
+    """
+    index = {
+        'sheet': sheet_name,
+        'keyField': key_field,
+        'rowCount': sum(shard['rows'] for shard in shards),
+        'shardRows': shard_rows,
+        'shards': shards
+    }
+    return json.dumps(index, ensure_ascii=False, indent=2)
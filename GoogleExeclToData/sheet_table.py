@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+# 数据行在SheetTable.rows中的起始位置（之前是字段类型行和字段描述行）
+DATA_ROW_START = 2
+
+class SheetTable:
+    """
+    一个工作表的紧凑表示：标题行只保存一份，其余每行保存为与标题行等长的元组
+    
+    与values_to_dicts返回的字典列表一一对应（rows[0]为字段类型行，rows[1]为字段描述行，之后为数据行），
+    按序号或遍历取出的每一行都是新生成的字典，只在写出JSON等需要字典的地方才逐行生成
+    """
+    
+    __slots__ = ('headers', 'rows')
+    
+    def __init__(self, headers, rows):
+        """
+        Args:
+            headers (tuple): 标题行
+            rows (list): 元组列表，每个元组与标题行等长
+        """
+        self.headers = tuple(headers)
+        self.rows = rows
+    
+    @classmethod
+    def from_values(cls, values):
+        """
+        从Sheets API返回的values二维数组创建，第一行为标题行
+        
+        与values_to_dicts相同，较短的行用空字符串补齐，超出标题行的单元格被丢弃
+        """
+        headers = tuple(values[0])
+        width = len(headers)
+        rows = []
+        for row in itertools.islice(values, 1, None):
+            if len(row) < width:
+                rows.append(tuple(row) + ('',) * (width - len(row)))
+            else:
+                rows.append(tuple(row[:width]))
+        return cls(headers, rows)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __getitem__(self, index):
+        """第index行对应的字典"""
+        return dict(zip(self.headers, self.rows[index]))
+    
+    def __iter__(self):
+        headers = self.headers
+        for row in self.rows:
+            yield dict(zip(headers, row))
+    
+    def column_indexes(self):
+        """
+        {字段名: 列序号}，字段顺序与字典中的键顺序一致
+        
+        标题重复时与dict(zip(headers, row))相同：字段位置取第一次出现的位置，值取最后一列
+        """
+        indexes = {}
+        for index, header in enumerate(self.headers):
+            indexes[header] = index
+        return indexes
+    
+    def data_rows(self):
+        """数据行（不包含字段类型行和字段描述行）的元组列表"""
+        return self.rows[DATA_ROW_START:]
+    
+    def column(self, field_name):
+        """逐个返回数据行中某个字段的单元格"""
+        index = self.column_indexes()[field_name]
+        return (row[index] for row in itertools.islice(self.rows, DATA_ROW_START, None))
+    
+    def to_dicts(self):
+        """转换为字典列表，与values_to_dicts的结果相同"""
+        return list(self)
+
+def materialize_rows(data):
+    """
+    将数据中的SheetTable转换为字典列表，其他数据原样返回
+    
+    Args:
+        data (SheetTable|list|dict): 单个工作表的数据，或按工作表名称分组的数据
+    
+    Returns:
+        list|dict: 只包含字典列表的数据
+    """
+    if isinstance(data, SheetTable):
+        return data.to_dicts()
+    if isinstance(data, dict):
+        return {sheet_name: value.to_dicts() if isinstance(value, SheetTable) else value
+                for sheet_name, value in data.items()}
+    return data
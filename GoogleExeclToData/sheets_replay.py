@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from fake_sheets import FakeSheetsService, FakeDriveService, FakeRequest, FakeHttpError, parse_a1_range
+
+# 录制目录中每个表格的文件：{表格ID}/spreadsheet.json、{表格ID}/revision.json、{表格ID}/values/{范围哈希}.json
+SPREADSHEET_FILE_NAME = 'spreadsheet.json'
+REVISION_FILE_NAME = 'revision.json'
+VALUES_DIR_NAME = 'values'
+
+class SheetsRecorder:
+    """
+    将Sheets API和Drive API的原始响应按表格和范围保存到录制目录，供ReplaySheetsService回放
+    
+    每个响应写入单独的文件，可以在多个线程中同时使用
+    """
+    
+    def __init__(self, record_dir):
+        self.record_dir = Path(record_dir)
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def _write(self, path, content):
+        """原子地写入JSON文件"""
+        path.parent.mkdir(exist_ok=True, parents=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        with self._lock:
+            self.count += 1
+    
+    def _write_values(self, spreadsheet_id, range_name, values):
+        sheet_name = parse_a1_range(range_name)[0]
+        digest = hashlib.sha1(range_name.encode('utf-8')).hexdigest()
+        self._write(self.record_dir / spreadsheet_id / VALUES_DIR_NAME / f"{digest}.json",
+                    {'sheet': sheet_name, 'range': range_name, 'values': values})
+    
+    def record(self, method, params, response):
+        """
+        保存一个请求的响应
+        
+        Args:
+            method (str): 请求方法，例如spreadsheets.get、spreadsheets.values.batchGet、files.get
+            params (dict): 创建请求时的参数
+            response (dict): 请求的响应
+        """
+        if method == 'spreadsheets.get':
+            self._write(self.record_dir / params['spreadsheetId'] / SPREADSHEET_FILE_NAME, response)
+        elif method == 'spreadsheets.values.get':
+            self._write_values(params['spreadsheetId'], params['range'], response.get('values', []))
+        elif method == 'spreadsheets.values.batchGet':
+            # valueRanges与请求的ranges顺序一致，响应中的range是规范化后的范围，因此按请求的范围保存
+            for range_name, value_range in zip(params['ranges'], response.get('valueRanges', [])):
+                self._write_values(params['spreadsheetId'], range_name, value_range.get('values', []))
+        elif method == 'files.get':
+            self._write(self.record_dir / params['fileId'] / REVISION_FILE_NAME, response)
+
+class _RecordingResource:
+    """包装googleapiclient的资源对象，返回的请求在execute时将响应交给SheetsRecorder"""
+    
+    def __init__(self, resource, recorder, path=''):
+        self._resource = resource
+        self._recorder = recorder
+        self._path = path
+    
+    def __getattr__(self, name):
+        method = getattr(self._resource, name)
+        method_path = f"{self._path}{name}"
+        
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if hasattr(result, 'execute'):
+                return _RecordingRequest(result, self._recorder, method_path, kwargs)
+            return _RecordingResource(result, self._recorder, f"{method_path}.")
+        return call
+
+class _RecordingRequest:
+    def __init__(self, request, recorder, method, params):
+        self._request = request
+        self._recorder = recorder
+        self._method = method
+        self._params = params
+    
+    def execute(self, *args, **kwargs):
+        response = self._request.execute(*args, **kwargs)
+        self._recorder.record(self._method, self._params, response)
+        return response
+
+def recording_service(service, recorder):
+    """
+    包装Sheets或Drive API服务，执行的每个请求的响应都会保存到录制目录
+    
+    Args:
+        service: build_service或build_drive_service返回的服务对象，为None时返回None
+        recorder (SheetsRecorder): 录制器
+    """
+    return _RecordingResource(service, recorder) if service else None
+
+class ReplaySheetsService(FakeSheetsService):
+    """
+    从录制目录回放Sheets API响应的服务对象，不需要网络和凭证，也不导入Google API客户端库
+    
+    请求的范围与录制时完全相同时返回录制的响应；否则如果录制了整个工作表，则按范围截取
+    """
+    
+    def __init__(self, replay_dir, latency=0.0):
+        """
+        Args:
+            replay_dir (str): 录制目录
+            latency (float): 每个请求模拟的网络延迟（秒）
+        """
+        self.replay_dir = Path(replay_dir)
+        self.recorded_ranges = {}
+        spreadsheets = {}
+        column_counts = {}
+        
+        if not self.replay_dir.is_dir():
+            raise FileNotFoundError(f"回放目录 '{replay_dir}' 不存在")
+        
+        for workbook_dir in sorted(path for path in self.replay_dir.iterdir() if path.is_dir()):
+            spreadsheet_id = workbook_dir.name
+            spreadsheet_file = workbook_dir / SPREADSHEET_FILE_NAME
+            workbook = {}
+            column_counts[spreadsheet_id] = {}
+            if spreadsheet_file.exists():
+                with open(spreadsheet_file, 'r', encoding='utf-8') as f:
+                    for sheet in json.load(f).get('sheets', []):
+                        workbook[sheet['properties']['title']] = None
+                        column_count = sheet['properties'].get('gridProperties', {}).get('columnCount')
+                        if column_count is not None:
+                            column_counts[spreadsheet_id][sheet['properties']['title']] = column_count
+            
+            for values_file in sorted((workbook_dir / VALUES_DIR_NAME).glob('*.json')):
+                with open(values_file, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                self.recorded_ranges[(spreadsheet_id, entry['range'])] = entry['values']
+                if all(bound is None for bound in parse_a1_range(entry['range'])[1:]):
+                    # 整个工作表的数据，可以用来回放该工作表的任意范围
+                    workbook[entry['sheet']] = entry['values']
+                else:
+                    workbook.setdefault(entry['sheet'], None)
+            spreadsheets[spreadsheet_id] = workbook
+        
+        super().__init__(spreadsheets, latency, column_counts)
+    
+    def _value_range(self, spreadsheet_id, range_name):
+        values = self.recorded_ranges.get((spreadsheet_id, range_name))
+        if values is None:
+            sheet_name = parse_a1_range(range_name)[0]
+            if self._workbook(spreadsheet_id).get(sheet_name) is None:
+                raise FakeHttpError(404, f"回放目录中没有记录范围 {range_name}")
+            return super()._value_range(spreadsheet_id, range_name)
+        
+        value_range = {'range': range_name, 'majorDimension': 'ROWS'}
+        if values:
+            value_range['values'] = values
+        return value_range
+
+class ReplayDriveService(FakeDriveService):
+    """从录制目录回放Drive API的files().get响应（表格的修改标记）"""
+    
+    def __init__(self, replay_dir):
+        super().__init__()
+        self.replay_dir = Path(replay_dir)
+    
+    def get(self, fileId, fields=None, **kwargs):
+        def build_response():
+            revision_file = self.replay_dir / fileId / REVISION_FILE_NAME
+            if not revision_file.exists():
+                raise FakeHttpError(404, f"回放目录中没有记录表格 {fileId} 的修改标记")
+            with open(revision_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return FakeRequest(self, 'files.get', build_response)
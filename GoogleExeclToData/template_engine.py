@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+# 模板标签：{{{表达式}}} 或 {{表达式}}，两者都原样输出（生成的是C#代码，不需要HTML转义）
+TAG_PATTERN = re.compile(r'\{\{\{\s*(.+?)\s*\}\}\}|\{\{\s*(.+?)\s*\}\}')
+
+# 已编译的模板缓存，{模板文件绝对路径: Template}
+_template_cache = {}
+
+class TemplateError(ValueError):
+    """模板语法错误"""
+
+class Template:
+    """
+    编译后的模板，支持Handlebars语法的一个子集：
+        
+        {{name}} / {{{name}}}              输出变量（this.name只在当前上下文中查找，name会逐级向外查找）
+        {{@index}} {{@first}} {{@last}}    each循环中的序号、是否第一个、是否最后一个
+        {{#each list}}...{{/each}}         遍历列表，块内的上下文为列表元素
+        {{#if name}}...{{else}}...{{/if}}  条件块，unless与之相反
+        {{#helper name}}...{{else}}...{{/helper}}  自定义条件块，由render的helpers参数提供判断函数
+    
+    与Mustache一样，单独占一行的块标签（前后只有空白）连同所在的行一起删除，不会在输出中留下空行
+    """
+    
+    def __init__(self, source, name='<template>'):
+        """
+        Args:
+            source (str): 模板文本
+            name (str): 模板名称，仅用于错误信息
+        """
+        self.name = name
+        self._render = _compile(_parse(_tokenize(source), name), name)
+    
+    def render(self, context, helpers=None):
+        """
+        渲染模板
+        
+        Args:
+            context (dict): 模板数据
+            helpers (dict, optional): 自定义块标签，{名称: 接收参数值、返回是否渲染主体的函数}
+        
+        Returns:
+            str: 渲染结果
+        """
+        out = []
+        self._render([context], {}, helpers or {}, out)
+        return ''.join(out)
+
+def load_template(template_path):
+    """
+    读取并编译模板文件，同一进程中每个模板文件只编译一次
+    
+    Args:
+        template_path (str|Path): 模板文件路径
+    
+    Returns:
+        Template: 编译后的模板
+    """
+    key = os.path.abspath(template_path)
+    template = _template_cache.get(key)
+    if template is None:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template = Template(f.read(), str(template_path))
+        _template_cache[key] = template
+    return template
+
+def _tokenize(source):
+    """
+    将模板文本拆分为文本和标签，并删除单独占一行的块标签所在的行
+    
+    Returns:
+        list: [('text', 文本) | ('tag', 标签内容, 行号)]
+    """
+    tokens = []
+    position = 0
+    for match in TAG_PATTERN.finditer(source):
+        tokens.append(['text', source[position:match.start()]])
+        tokens.append(['tag', match.group(1) or match.group(2), source.count('\n', 0, match.start()) + 1])
+        position = match.end()
+    tokens.append(['text', source[position:]])
+    
+    # tokens中文本和标签交替出现，标签前后一定是文本
+    previous_standalone = False
+    for index in range(1, len(tokens), 2):
+        tag = tokens[index][1]
+        before = tokens[index - 1][1]
+        after = tokens[index + 1][1]
+        line_start = before.rfind('\n') + 1
+        line_end = after.find('\n')
+        # 标签之前的文本位于行首的条件：文本中有换行、是模板开头，或者前一个标签连同换行一起被删除了
+        at_line_start = line_start > 0 or index == 1 or previous_standalone
+        standalone = (
+            (tag[0] in '#/' or tag == 'else')
+            and at_line_start
+            and not before[line_start:].strip()
+            and not (after[:line_end] if line_end >= 0 else after).strip()
+        )
+        previous_standalone = standalone and line_end >= 0
+        if standalone:
+            tokens[index - 1][1] = before[:line_start]
+            tokens[index + 1][1] = after[line_end + 1:] if line_end >= 0 else ''
+    
+    return [tuple(token) for token in tokens]
+
+def _parse(tokens, name):
+    """
+    将标记列表解析为语法树
+    
+    Returns:
+        list: 节点列表，('text', 文本) | ('var', 表达式) | ('block', 名称, 参数, 主体, else部分)
+    """
+    root = []
+    # 栈中每一项为(块名称, 参数, 主体节点列表, else节点列表, 当前写入的列表, 行号)
+    stack = []
+    current = root
+    for token in tokens:
+        if token[0] == 'text':
+            if token[1]:
+                current.append(('text', token[1]))
+            continue
+        
+        tag, line = token[1], token[2]
+        if tag.startswith('#'):
+            parts = tag[1:].split(None, 1)
+            body = []
+            stack.append([parts[0], parts[1] if len(parts) > 1 else '', body, [], current, line])
+            current = body
+        elif tag == 'else':
+            if not stack:
+                raise TemplateError(f"{name} 第 {line} 行: else不在任何块中")
+            current = stack[-1][3]
+        elif tag.startswith('/'):
+            if not stack or stack[-1][0] != tag[1:]:
+                raise TemplateError(f"{name} 第 {line} 行: 结束标签 {{{{{tag}}}}} 与开始标签不匹配")
+            block_name, argument, body, inverse, parent, _ = stack.pop()
+            parent.append(('block', block_name, argument, body, inverse))
+            current = parent
+        else:
+            current.append(('var', tag))
+    
+    if stack:
+        raise TemplateError(f"{name} 第 {stack[-1][5]} 行: 块 {{{{#{stack[-1][0]}}}}} 没有结束标签")
+    return root
+
+def _compile_lookup(expression):
+    """将表达式编译为取值函数 lookup(上下文栈, 循环变量)，找不到时返回None"""
+    if expression.startswith('@'):
+        loop_name = expression[1:]
+        return lambda stack, loop: loop.get(loop_name)
+    
+    if expression == 'this':
+        return lambda stack, loop: stack[-1]
+    
+    if expression.startswith('this.'):
+        key = expression[5:]
+        
+        def lookup_this(stack, loop):
+            scope = stack[-1]
+            return scope.get(key) if isinstance(scope, dict) else None
+        return lookup_this
+    
+    def lookup_name(stack, loop):
+        for scope in reversed(stack):
+            if isinstance(scope, dict) and expression in scope:
+                return scope[expression]
+        return None
+    return lookup_name
+
+def _compile(nodes, name):
+    """将语法树编译为渲染函数 render(上下文栈, 循环变量, helpers, 输出列表)"""
+    parts = [_compile_node(node, name) for node in nodes]
+    
+    def render(stack, loop, helpers, out):
+        for part in parts:
+            part(stack, loop, helpers, out)
+    return render
+
+def _compile_node(node, name):
+    if node[0] == 'text':
+        text = node[1]
+        return lambda stack, loop, helpers, out: out.append(text)
+    
+    if node[0] == 'var':
+        lookup = _compile_lookup(node[1])
+        
+        def render_var(stack, loop, helpers, out):
+            value = lookup(stack, loop)
+            if value is not None:
+                out.append(value if isinstance(value, str) else str(value))
+        return render_var
+    
+    _, block_name, argument, body, inverse = node
+    render_body = _compile(body, name)
+    render_inverse = _compile(inverse, name)
+    lookup = _compile_lookup(argument)
+    
+    if block_name == 'each':
+        def render_each(stack, loop, helpers, out):
+            items = lookup(stack, loop) or []
+            if not items:
+                render_inverse(stack, loop, helpers, out)
+                return
+            last_index = len(items) - 1
+            for index, item in enumerate(items):
+                item_loop = {'index': index, 'first': index == 0, 'last': index == last_index}
+                stack.append(item)
+                try:
+                    render_body(stack, item_loop, helpers, out)
+                finally:
+                    stack.pop()
+        return render_each
+    
+    if block_name in ('if', 'unless'):
+        expected = block_name == 'if'
+        
+        def render_condition(stack, loop, helpers, out):
+            if bool(lookup(stack, loop)) == expected:
+                render_body(stack, loop, helpers, out)
+            else:
+                render_inverse(stack, loop, helpers, out)
+        return render_condition
+    
+    def render_helper(stack, loop, helpers, out):
+        helper = helpers.get(block_name)
+        if helper is None:
+            raise TemplateError(f"{name}: 未定义的块标签 {block_name}")
+        if helper(lookup(stack, loop)):
+            render_body(stack, loop, helpers, out)
+        else:
+            render_inverse(stack, loop, helpers, out)
+    return render_helper
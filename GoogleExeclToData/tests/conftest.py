@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 脚本都在上一级目录中直接运行，测试时同样从该目录导入
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PACKAGE_DIR))
+
+import request_scheduler
+
+@pytest.fixture(autouse=True)
+def unlimited_scheduler():
+    """替身服务不需要限速，每个测试使用不限制请求速率的调度器"""
+    request_scheduler.configure(requests_per_minute=0)
+    yield
+    request_scheduler.configure()
+
+@pytest.fixture
+def package_dir(monkeypatch):
+    """切换到脚本所在的目录，代码生成按相对路径读取Template目录中的模板"""
+    monkeypatch.chdir(PACKAGE_DIR)
+    return PACKAGE_DIR
+
+def read_tree(root):
+    """
+    读取目录中的所有文件
+    
+    Returns:
+        dict: {相对路径: 文件内容（字节）}
+    """
+    root = Path(root)
+    return {path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob('*')) if path.is_file()}
@@ -0,0 +1,52 @@
+/************************************************
+ * Config class is : Monster
+ ************************************************/
+
+using System;
+using System.Collections.Generic;
+
+namespace Config.Wb
+{
+    public class Monster
+    {
+        /// <summary>
+        /// ID
+        /// </summary>
+        public int Id { get; set; }
+        /// <summary>
+        /// Name
+        /// line2
+        /// line3
+        /// </summary>
+        public string Name { get; set; }
+        /// <summary>
+        /// HP
+        /// </summary>
+        public int Hp { get; set; }
+        /// <summary>
+        /// Spd
+        /// </summary>
+        public float Speed { get; set; }
+        /// <summary>
+        /// On
+        /// </summary>
+        public bool Enabled { get; set; }
+        /// <summary>
+        /// Costs
+        /// </summary>
+        public List<int> Costs { get; set; }
+        /// <summary>
+        /// Tags
+        /// </summary>
+        public List<string> Tags { get; set; }
+        /// <summary>
+        /// R
+        /// </summary>
+        public float Ratio { get; set; }
+        /// <summary>
+        /// K
+        /// </summary>
+        public string Kind { get; set; }
+
+    }
+}
\ No newline at end of file
@@ -0,0 +1,179 @@
+
+using System;
+using System.Collections;
+using System.Collections.Generic;
+using System.Threading.Tasks;
+using UnityEngine;
+using Newtonsoft.Json;
+using Framework;
+
+namespace Config.Wb
+{
+    public partial class WbConfigManager
+    {
+        public List<Item> ItemList => getConfig<Item>();
+        public List<Monster> MonsterList => getConfig<Monster>();
+        public List<Empty> EmptyList => getConfig<Empty>();
+        public List<Solo> SoloList => getConfig<Solo>();
+
+        private List<Item> itemList;
+        private List<Monster> monsterList;
+        private List<Empty> emptyList;
+        private List<Solo> soloList;
+
+        private Dictionary<int, Item> itemById;
+        public Item GetItemById(int id)
+        {
+            if (itemById == null)
+            {
+                var list = getConfig<Item>();
+                var index = new Dictionary<int, Item>(list.Count);
+                foreach (var item in list)
+                {
+                    index[item.Id] = item;
+                }
+                itemById = index;
+            }
+            return itemById.TryGetValue(id, out var value) ? value : null;
+        }
+        private Dictionary<int, Monster> monsterById;
+        public Monster GetMonsterById(int id)
+        {
+            if (monsterById == null)
+            {
+                var list = getConfig<Monster>();
+                var index = new Dictionary<int, Monster>(list.Count);
+                foreach (var item in list)
+                {
+                    index[item.Id] = item;
+                }
+                monsterById = index;
+            }
+            return monsterById.TryGetValue(id, out var value) ? value : null;
+        }
+        private readonly Dictionary<Type, string> typeToEnum = new Dictionary<Type,string> { 
+            [typeof(Item)] = "item",
+            [typeof(Monster)] = "monster",
+            [typeof(Empty)] = "empty",
+            [typeof(Solo)] = "solo"
+        };
+        private readonly object loadLock = new object();
+        private static readonly string[] allSubModules = new string[] {
+            "item",
+            "monster",
+            "empty",
+            "solo",
+        };
+        public Task PreloadAllAsync()
+        {
+            return preloadAsync(allSubModules);
+        }
+        public Task PreloadAsync(params Type[] types)
+        {
+            var subModules = new string[types.Length];
+            for (var i = 0; i < types.Length; i++)
+            {
+                subModules[i] = typeToEnum[types[i]];
+            }
+            return preloadAsync(subModules);
+        }
+        public void Unload<T>()
+        {
+            Unload(typeToEnum[typeof(T)]);
+        }
+        public void Unload(string subModule)
+        {
+            lock (loadLock)
+            {
+                switch (subModule)
+                { 
+                    case "item": itemList = null; itemById = null; break;
+                    case "monster": monsterList = null; monsterById = null; break;
+                    case "empty": emptyList = null; break;
+                    case "solo": soloList = null; break;
+                    default: throw new ArgumentOutOfRangeException(nameof(subModule), subModule, null);
+                }
+            }
+        }
+        private async Task preloadAsync(string[] subModules)
+        {
+            var tasks = new List<Task>(subModules.Length);
+            foreach (var subModule in subModules)
+            {
+                if (isLoaded(subModule)) continue;
+                var data = loadData(subModule);
+                if (data == null) continue;
+                tasks.Add(Task.Run(() => publish(subModule, deserialize(subModule, data))));
+            }
+            await Task.WhenAll(tasks);
+        }
+        private void tryLoad(string subModule)
+        {
+            if (isLoaded(subModule)) return;
+            var data = loadData(subModule);
+            if (data == null) return;
+            publish(subModule, deserialize(subModule, data));
+        }
+        private bool isLoaded(string subModule)
+        {
+            switch (subModule)
+            { 
+                case "item": return itemList != null;
+                case "monster": return monsterList != null;
+                case "empty": return emptyList != null;
+                case "solo": return soloList != null;
+                default: throw new ArgumentOutOfRangeException(nameof(subModule), subModule, null);
+            }
+        }
+        private object loadData(string subModule)
+        {
+            var path = $"Configs/DataJson/Wb/{subModule}";
+            var ta = ResourcesManager.Instance.LoadResource<TextAsset>(path);
+            var data = ta.text;
+            if (string.IsNullOrEmpty(data))
+            {
+                DebugUtil.LogError($"Load {path} error!");
+                return null;
+            }
+            return data;
+        }
+        private object deserialize(string subModule, object data)
+        {
+            switch (subModule)
+            { 
+                case "item": return JsonConvert.DeserializeObject<List<Item>>((string)data);
+                case "monster": return JsonConvert.DeserializeObject<List<Monster>>((string)data);
+                case "empty": return JsonConvert.DeserializeObject<List<Empty>>((string)data);
+                case "solo": return JsonConvert.DeserializeObject<List<Solo>>((string)data);
+                default: throw new ArgumentOutOfRangeException(nameof(subModule), subModule, null);
+            }
+        }
+        private void publish(string subModule, object list)
+        {
+            lock (loadLock)
+            {
+                switch (subModule)
+                { 
+                    case "item": if (itemList == null) itemList = (List<Item>)list; break;
+                    case "monster": if (monsterList == null) monsterList = (List<Monster>)list; break;
+                    case "empty": if (emptyList == null) emptyList = (List<Empty>)list; break;
+                    case "solo": if (soloList == null) soloList = (List<Solo>)list; break;
+                    default: throw new ArgumentOutOfRangeException(nameof(subModule), subModule, null);
+                }
+            }
+        }
+        private List<T> getConfig<T>()
+        {
+            var subModule = typeToEnum[typeof(T)];
+            tryLoad(subModule);
+            switch (subModule)
+            { 
+                case "item": return itemList as List<T>;
+                case "monster": return monsterList as List<T>;
+                case "empty": return emptyList as List<T>;
+                case "solo": return soloList as List<T>;
+                default: throw new ArgumentOutOfRangeException(nameof(subModule), subModule, null);
+            }
+        }
+    }
+}
\ No newline at end of file
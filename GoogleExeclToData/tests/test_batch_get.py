@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from urllib.parse import quote
+
+from fake_sheets import FakeSheetsService
+import google_sheets_to_json_batch_oauth as exporter
+from google_sheets_to_json_batch_oauth import chunk_ranges, kept_column_spans
+
+def encoded_length(ranges):
+    return sum(len(quote(range_name, safe='')) + len('&ranges=') for range_name in ranges)
+
+def test_chunk_ranges_limits_count():
+    ranges = [f"S{index}" for index in range(7)]
+    
+    assert chunk_ranges(ranges, max_ranges=3) == [ranges[0:3], ranges[3:6], ranges[6:]]
+
+def test_chunk_ranges_bounds_encoded_url_length():
+    # 中文和引号编码后长度成倍增加，按编码后的长度分批
+    ranges = [f"'配置表{index}'!A3:D" for index in range(40)]
+    
+    chunks = chunk_ranges(ranges, max_ranges=50, max_chars=300)
+    
+    assert [range_name for chunk in chunks for range_name in chunk] == ranges
+    assert len(chunks) > 1
+    assert all(encoded_length(chunk) <= 300 for chunk in chunks)
+
+def test_chunk_ranges_keeps_oversized_range_alone():
+    ranges = ['A', 'B' * 200, 'C']
+    
+    assert chunk_ranges(ranges, max_chars=100) == [['A'], ['B' * 200], ['C']]
+
+def test_batch_get_values_preserves_sheet_order_across_batches():
+    workbook = {f"Sheet {index}": [['id'], [index]] for index in range(5)}
+    service = FakeSheetsService({'id': workbook})
+    
+    values = exporter.batch_get_values(service, 'id', list(workbook), batch_size=2)
+    
+    assert list(values) == list(workbook)
+    assert values['Sheet 3'] == [['id'], [3]]
+    assert service.requests == ['values.batchGet'] * 3
+
+def test_kept_column_spans_skips_note_columns_and_columns_outside_headers():
+    headers = ['id', 'memo', 'name', 'hp', 'desc', 'tags']
+    field_types = ['number', 'note', 'string', 'number', 'note', 'arraystring', 'number']
+    
+    assert kept_column_spans(headers, field_types) == [(0, 0), (2, 3), (5, 5)]
+    # 字段类型行比标题行短时，缺少类型的列仍然保留
+    assert kept_column_spans(headers, ['number', 'note']) == [(0, 0), (2, 5)]
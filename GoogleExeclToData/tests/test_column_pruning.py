@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from conftest import read_tree
+from fake_sheets import FakeSheetsService
+import google_sheets_to_json_batch_oauth as exporter
+from json_splitter import split_sheets_data
+
+SPREADSHEET_ID = 'pruning'
+
+def build_workbook():
+    return {
+        # 最后两行只在note列中有内容，整表拉取时仍然拆分为空对象
+        'Item': [
+            ['id', 'memo', 'name', 'extra'],
+            ['number', 'note', 'string', 'note'],
+            ['ID', 'Memo', 'Name', 'Extra'],
+            [1, 'a', 'Sword'],
+            [],
+            [2, '', 'Shield', 'x'],
+            ['', 'only memo'],
+            ['', '', '', 'only extra'],
+        ],
+        # 字段类型行为空时，标题行之后的行仍然从第三行开始
+        'Untyped': [
+            ['id', 'name'],
+            [],
+            ['ID', 'Name'],
+            [1, 'a'],
+            [2, 'b'],
+        ],
+        # 标题行以外的列中有内容的行
+        'Wide': [
+            ['id', 'name'],
+            ['number', 'string'],
+            ['ID', 'Name'],
+            [1, 'a'],
+            ['', '', 'outside'],
+        ],
+        'Header': [['id', 'name']],
+        'Blank': [],
+    }
+
+def fetch(prune_columns, column_counts=None):
+    service = FakeSheetsService({SPREADSHEET_ID: build_workbook()}, column_counts=column_counts)
+    return exporter.get_sheet_data(service, SPREADSHEET_ID, prune_columns=prune_columns), service
+
+def split_output(data, root):
+    assert split_sheets_data(data, 'Pruning', root / 'json', root / 'cs')
+    return read_tree(root)
+
+@pytest.mark.parametrize('column_counts', [None, {SPREADSHEET_ID: {'Item': 40, 'Wide': 3}}])
+def test_pruned_split_matches_full_fetch(package_dir, tmp_path, column_counts):
+    full_data, _ = fetch(False, column_counts)
+    pruned_data, service = fetch(True, column_counts)
+    
+    assert list(pruned_data) == list(full_data)
+    for sheet_name in full_data:
+        assert len(pruned_data[sheet_name]) == len(full_data[sheet_name]), sheet_name
+    assert split_output(pruned_data, tmp_path / 'pruned') == split_output(full_data, tmp_path / 'full')
+    # 标题行、保留的列和剩余行各一次batchGet
+    assert service.requests == ['spreadsheets.get'] + ['values.batchGet'] * 3
+
+def test_pruned_fetch_requests_column_counts_for_cached_sheet_names(tmp_path):
+    service = FakeSheetsService({SPREADSHEET_ID: build_workbook()})
+    all_sheets = list(build_workbook())
+    data = exporter.get_all_sheets_data(service, SPREADSHEET_ID, all_sheets, prune_columns=True)
+    
+    assert len(data['Item']) == 7
+    assert service.requests.count('spreadsheets.get') == 1
+
+def test_stitch_column_spans_keeps_row_count():
+    header_rows = [['id', 'memo', 'name']]
+    spans = [(0, 0), (2, 2)]
+    
+    values = exporter.stitch_column_spans(header_rows, spans, [[[1], [], [3]], [['a']]], row_count=5)
+    
+    assert values == [['id', 'name'], [], [1, 'a'], [], [3], [], []]
+    assert exporter.stitch_column_spans(header_rows, spans, [[], []]) == [['id', 'name']]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('google_auth_oauthlib')
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+import google_sheets_to_json_batch_oauth as exporter
+
+def utc_now():
+    """与google-auth的expiry一样不带时区的UTC时间"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def saved_token(tmp_path, scopes):
+    creds = Credentials('token', refresh_token='refresh', scopes=scopes,
+                        expiry=utc_now() + timedelta(hours=1))
+    token_file = tmp_path / 'token.pickle'
+    token_file.write_bytes(pickle.dumps(creds))
+    return str(token_file)
+
+@pytest.fixture
+def auth_flow(monkeypatch):
+    """替换浏览器授权流程，记录授权时请求的权限"""
+    requested = []
+    
+    class Flow:
+        def run_local_server(self, port=0):
+            return Credentials('new-token', scopes=requested[-1], expiry=utc_now() + timedelta(hours=1))
+    
+    def from_client_secrets_file(creds_file, scopes):
+        requested.append(scopes)
+        return Flow()
+    monkeypatch.setattr(InstalledAppFlow, 'from_client_secrets_file', from_client_secrets_file)
+    monkeypatch.setattr(exporter, '_credentials_cache', {})
+    return requested
+
+def test_token_with_all_scopes_is_used(tmp_path, auth_flow):
+    token_file = saved_token(tmp_path, exporter.SCOPES)
+    
+    assert exporter.load_credentials('credentials.json', token_file).token == 'token'
+    assert auth_flow == []
+
+def test_token_missing_scope_is_reauthorized(tmp_path, auth_flow, capsys):
+    token_file = saved_token(tmp_path, exporter.SCOPES[:1])
+    
+    creds = exporter.load_credentials('credentials.json', token_file)
+    
+    assert creds.token == 'new-token'
+    assert auth_flow == [exporter.SCOPES]
+    assert '缺少所需的权限' in capsys.readouterr().out
+    with open(token_file, 'rb') as f:
+        assert pickle.load(f).has_scopes(exporter.SCOPES)
+
+@pytest.mark.parametrize('expires_in, expected', [(3600, False), (30, True), (-30, True), (None, False)])
+def test_credentials_need_refresh(expires_in, expected):
+    expiry = utc_now() + timedelta(seconds=expires_in) if expires_in is not None else None
+    creds = SimpleNamespace(valid=expires_in is None or expires_in > 0, expiry=expiry)
+    
+    assert exporter.credentials_need_refresh(creds) == expected
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+
+import export_workbooks
+from export_workbooks import FetchPool, fetch_workbooks
+from fake_sheets import FakeSheetsService
+
+def fake_workbooks(count):
+    spreadsheets = {f"id{index}": {'Item': [['id', 'name'], ['number', 'string'], ['ID', 'Name'], [index, 'a']]}
+                    for index in range(count)}
+    workbooks = [{'name': f"Wb{index}", 'sheet_id': f"id{index}"} for index in range(count)]
+    return spreadsheets, workbooks
+
+def test_fetch_pool_reuses_services_across_rounds(monkeypatch):
+    spreadsheets, workbooks = fake_workbooks(6)
+    built = []
+    
+    def build_services(creds, with_drive, recorder=None, replay_dir=None):
+        built.append(threading.get_ident())
+        return FakeSheetsService(spreadsheets), None
+    monkeypatch.setattr(export_workbooks, 'build_services', build_services)
+    
+    with FetchPool(None, workers=2) as pool:
+        for _ in range(3):
+            fetched = dict((workbook['name'], data) for workbook, data in fetch_workbooks(None, workbooks, pool=pool))
+            assert sorted(fetched) == [workbook['name'] for workbook in workbooks]
+            assert all(fetched.values())
+    
+    # 每个线程只创建一次服务，三轮拉取共用两个线程
+    assert len(built) == len(set(built)) <= 2
+
+def test_fetch_workbooks_without_pool_shuts_down_its_own(monkeypatch):
+    spreadsheets, workbooks = fake_workbooks(2)
+    monkeypatch.setattr(export_workbooks, 'build_services', lambda *args: (FakeSheetsService(spreadsheets), None))
+    
+    before = threading.active_count()
+    assert len(list(fetch_workbooks(None, workbooks, workers=2))) == 2
+    assert threading.active_count() == before
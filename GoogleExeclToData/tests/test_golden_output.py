@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import read_tree
+from fake_sheets import FakeSheetsService
+from sheets_replay import SheetsRecorder, ReplaySheetsService, recording_service
+import google_sheets_to_json_batch_oauth as exporter
+from json_splitter import split_json_file, split_sheets_data
+
+# 固定的工作表数据（Sheets API返回的values）和拆分结果；数据文件和每个工作表的C#类与最初版本的脚本逐字节相同，
+# ConfigManager包含之后增加的按主键查找和异步预加载
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+WORKBOOK_FILE = DATA_DIR / 'golden_workbook.json'
+GOLDEN_DIR = DATA_DIR / 'golden'
+SPREADSHEET_ID = 'golden'
+
+def load_workbook():
+    with open(WORKBOOK_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def golden_tree():
+    return read_tree(GOLDEN_DIR)
+
+def split_data(data, root, **split_options):
+    assert split_sheets_data(data, 'Wb', root / 'export', root / 'GodeGen', manifest=False, **split_options)
+    return read_tree(root)
+
+def grouped_json(values_by_sheet):
+    """导出脚本按工作表分组写出的JSON：每个工作表为以标题行为键的字典列表"""
+    return {sheet_name: exporter.values_to_dicts(values) for sheet_name, values in values_by_sheet.items()}
+
+@pytest.mark.parametrize('split_options', [
+    {},
+    {'engine': 'python'},
+    {'engine': 'pandas'},
+    {'stream': True},
+    {'jobs': 2},
+], ids=['auto', 'python', 'pandas', 'stream', 'jobs'])
+def test_split_json_file_matches_golden(package_dir, tmp_path, split_options):
+    if split_options.get('engine') == 'pandas':
+        pytest.importorskip('pandas')
+    input_file = tmp_path / 'output' / 'Wb.json'
+    input_file.parent.mkdir()
+    input_file.write_text(json.dumps(grouped_json(load_workbook()), ensure_ascii=False, indent=2), encoding='utf-8')
+    
+    assert split_json_file(str(input_file), str(tmp_path / 'out' / 'export'), str(tmp_path / 'out' / 'GodeGen'),
+                           manifest=False, **split_options)
+    assert read_tree(tmp_path / 'out') == golden_tree()
+
+@pytest.mark.parametrize('prune_columns', [False, True], ids=['full', 'pruned'])
+def test_fake_sheets_fetch_matches_golden(package_dir, tmp_path, prune_columns):
+    service = FakeSheetsService({SPREADSHEET_ID: load_workbook()})
+    data = exporter.get_sheet_data(service, SPREADSHEET_ID, prune_columns=prune_columns)
+    
+    assert split_data(data, tmp_path) == golden_tree()
+
+def test_replayed_fetch_matches_golden(package_dir, tmp_path):
+    recorder = SheetsRecorder(tmp_path / 'record')
+    service = recording_service(FakeSheetsService({SPREADSHEET_ID: load_workbook()}), recorder)
+    exporter.get_sheet_data(service, SPREADSHEET_ID, prune_columns=True)
+    
+    replay = ReplaySheetsService(tmp_path / 'record')
+    data = exporter.get_sheet_data(replay, SPREADSHEET_ID, prune_columns=True)
+    
+    assert split_data(data, tmp_path / 'replayed') == golden_tree()
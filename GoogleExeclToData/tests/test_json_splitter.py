@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from json_splitter import iter_unique_keys, check_unique_keys, split_sheets_data
+
+def test_iter_unique_keys_yields_rows_lazily():
+    rows = [{'id': 1}, {'id': 2}, {}]
+    seen = []
+    
+    for row in iter_unique_keys('Item', iter(rows), 'id'):
+        seen.append(row)
+    
+    assert seen == rows
+
+def test_iter_unique_keys_raises_after_all_rows_with_every_duplicate():
+    rows = [{'id': 1}, {'id': 2}, {'id': 1}, {'id': 2}, {'id': 3}]
+    seen = []
+    
+    with pytest.raises(ValueError) as error:
+        for row in iter_unique_keys('Item', rows, 'id'):
+            seen.append(row)
+    
+    # 流式输出依赖所有行都先返回，错误信息中的行号从表格第4行开始计算
+    assert seen == rows
+    assert '2 个重复值' in str(error.value)
+    assert '第 4 行和第 6 行' in str(error.value)
+
+def test_rows_without_key_only_warn(capsys):
+    check_unique_keys('Item', [{'id': 1}, {'name': 'no key'}, {}], 'id')
+    
+    assert '1 行缺少主键 id' in capsys.readouterr().out
+
+def test_keys_of_different_types_are_distinct():
+    check_unique_keys('Item', [{'id': 1}, {'id': '1'}], 'id')
+
+def test_shrunk_sheet_keeps_its_class_file(package_dir, tmp_path):
+    def split(row_count):
+        data = {'Item': [{'id': 'number'}, {'id': 'ID'}] + [{'id': index} for index in range(row_count)]}
+        assert split_sheets_data(data, 'Wb', tmp_path / 'json', tmp_path / 'cs')
+    
+    split(3)
+    class_file = tmp_path / 'cs' / 'Wb' / 'GodeGen' / 'Item.cs'
+    content = class_file.read_text(encoding='utf-8')
+    
+    # 数据行删光后不重新生成类，但ConfigManager仍然引用Item
+    split(0)
+    
+    assert class_file.read_text(encoding='utf-8') == content
+    assert 'Item' in (tmp_path / 'cs' / 'Wb' / 'GodeGen' / 'WbConfigManager.Loader.cs').read_text(encoding='utf-8')
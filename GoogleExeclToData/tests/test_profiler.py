@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import profiler
+
+def test_cprofile_is_imported_only_when_requested(package_dir):
+    code = ("import sys, google_sheets_to_json_batch_oauth, export_workbooks; "
+            "print('cProfile' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=package_dir, capture_output=True, text=True, check=True)
+    
+    assert output.stdout.strip() == 'False'
+
+def test_cprofile_stats_are_written(tmp_path):
+    stats_file = tmp_path / 'run.pstats'
+    
+    with profiler.profile_from_args(SimpleNamespace(profile=None, cprofile=str(stats_file))):
+        sum(range(1000))
+    
+    assert stats_file.stat().st_size > 0
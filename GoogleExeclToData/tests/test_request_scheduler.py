@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import request_scheduler
+from request_scheduler import RequestScheduler, retry_after_seconds, is_retryable_error
+from fake_sheets import FakeHttpError
+
+class HeaderResponse(dict):
+    """httplib2.Response一样带status属性的响应头字典"""
+    
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+class HeaderHttpError(Exception):
+    def __init__(self, status, headers=None, message=''):
+        super().__init__(message)
+        self.resp = HeaderResponse(status, headers)
+
+class FlakyRequest:
+    """前几次执行抛出指定的错误，之后返回响应"""
+    
+    def __init__(self, errors, response=None):
+        self.errors = list(errors)
+        self.response = response or {'ok': True}
+        self.calls = 0
+    
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.response
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录退避和限速的等待时间，不真正等待"""
+    slept = []
+    monkeypatch.setattr(request_scheduler.time, 'sleep', slept.append)
+    return slept
+
+def test_retry_after_header():
+    assert retry_after_seconds(HeaderHttpError(429, {'retry-after': '7'})) == 7.0
+    assert retry_after_seconds(HeaderHttpError(429, {'retry-after': 'soon'})) is None
+    assert retry_after_seconds(FakeHttpError(429)) is None
+
+def test_retryable_errors():
+    assert is_retryable_error(FakeHttpError(429))
+    assert is_retryable_error(FakeHttpError(503))
+    assert is_retryable_error(FakeHttpError(403, 'userRateLimitExceeded'))
+    assert not is_retryable_error(FakeHttpError(403, 'The caller does not have permission'))
+    assert not is_retryable_error(FakeHttpError(404))
+    assert is_retryable_error(TimeoutError())
+    assert not is_retryable_error(ValueError())
+
+def test_backoff_delay_is_bounded_and_grows(monkeypatch):
+    scheduler = RequestScheduler(None, backoff_base=1, backoff_max=8)
+    monkeypatch.setattr(request_scheduler.random, 'uniform', lambda low, high: high)
+    
+    assert [scheduler.backoff_delay(attempt) for attempt in range(5)] == [1, 2, 4, 8, 8]
+
+def test_backoff_delay_honors_retry_after_up_to_max(monkeypatch):
+    scheduler = RequestScheduler(None, backoff_base=1, backoff_max=30)
+    monkeypatch.setattr(request_scheduler.random, 'uniform', lambda low, high: low)
+    
+    assert scheduler.backoff_delay(0, HeaderHttpError(429, {'retry-after': '12'})) == 12
+    assert scheduler.backoff_delay(0, HeaderHttpError(429, {'retry-after': '120'})) == 30
+
+def test_execute_retries_then_succeeds(sleeps):
+    scheduler = RequestScheduler(None, max_retries=3)
+    request = FlakyRequest([FakeHttpError(500), HeaderHttpError(429, {'retry-after': '2'})])
+    
+    assert scheduler.execute(request) == {'ok': True}
+    assert request.calls == 3
+    assert len(sleeps) == 2 and sleeps[1] >= 2
+    assert (scheduler.stats['requests'], scheduler.stats['retries'], scheduler.stats['failures']) == (3, 2, 0)
+
+def test_execute_gives_up_after_max_retries(sleeps):
+    scheduler = RequestScheduler(None, max_retries=2)
+    request = FlakyRequest([FakeHttpError(503)] * 5)
+    
+    with pytest.raises(FakeHttpError):
+        scheduler.execute(request)
+    assert request.calls == 3
+    assert scheduler.stats['failures'] == 1
+
+def test_execute_does_not_retry_client_errors(sleeps):
+    scheduler = RequestScheduler(None)
+    request = FlakyRequest([FakeHttpError(400)])
+    
+    with pytest.raises(FakeHttpError):
+        scheduler.execute(request)
+    assert request.calls == 1
+    assert sleeps == []
+
+def test_token_bucket_waits_after_burst(sleeps):
+    scheduler = RequestScheduler(requests_per_minute=60, burst=2)
+    
+    waits = [scheduler.acquire() for _ in range(4)]
+    
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(1.0, abs=0.05)
+    assert waits[3] == pytest.approx(2.0, abs=0.05)
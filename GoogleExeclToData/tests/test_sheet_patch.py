@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+import json_splitter
+import sheet_patch
+from json_splitter import split_sheets_data
+from sheet_patch import diff_rows
+
+def item_sheet(*rows):
+    return {'Item': [{'id': 'number', 'name': 'string'}, {'id': 'ID', 'name': 'Name'}] + list(rows)}
+
+def export(tmp_path, data):
+    assert split_sheets_data(data, 'Wb', tmp_path / 'json', tmp_path / 'cs', patches=True)
+    return tmp_path / 'json' / 'Wb'
+
+def read_json(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+def test_changed_sheet_writes_patch(package_dir, tmp_path):
+    export(tmp_path, item_sheet({'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}))
+    table_folder = export(tmp_path, item_sheet({'id': 1, 'name': 'a'}, {'id': 2, 'name': 'c'}, {'id': 3, 'name': 'd'}))
+    
+    assert read_json(table_folder / 'patches' / 'versions.json')['item']['version'] == 2
+    patch = read_json(table_folder / 'patches' / 'item.2.json')
+    assert (patch['fromVersion'], patch['toVersion'], patch['keyField']) == (1, 2, 'id')
+    assert patch['changed'] == [{'id': 2, 'name': 'c'}]
+    assert patch['added'] == [{'id': 3, 'name': 'd'}]
+    assert 'reset' not in patch
+
+def test_missing_previous_data_file_writes_reset(package_dir, tmp_path):
+    table_folder = export(tmp_path, item_sheet({'id': 1, 'name': 'a'}))
+    (table_folder / 'item.json').unlink()
+    export(tmp_path, item_sheet({'id': 1, 'name': 'b'}))
+    
+    assert read_json(table_folder / 'patches' / 'versions.json')['item']['version'] == 2
+    assert read_json(table_folder / 'patches' / 'item.2.json') == \
+        {'sheet': 'Item', 'fromVersion': 1, 'toVersion': 2, 'reset': True}
+    
+    # 重置之后的版本照常生成补丁
+    export(tmp_path, item_sheet({'id': 1, 'name': 'c'}))
+    patch = read_json(table_folder / 'patches' / 'item.3.json')
+    assert (patch['fromVersion'], patch['changed']) == (2, [{'id': 1, 'name': 'c'}])
+
+def test_diff_rows_by_key():
+    old_rows = [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}, {'id': 3, 'name': 'c'}]
+    new_rows = [{'id': 3, 'name': 'c'}, {'id': 1, 'name': 'A'}, {'id': 4, 'name': 'd'}]
+    
+    assert diff_rows(old_rows, new_rows, 'id') == {
+        'keyField': 'id',
+        'added': [{'id': 4, 'name': 'd'}],
+        'changed': [{'id': 1, 'name': 'A'}],
+        'removed': [2],
+    }
+
+def test_diff_rows_by_position_without_key():
+    old_rows = [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]
+    new_rows = [{'name': 'a'}, {'name': 'B'}]
+    
+    assert diff_rows(old_rows, new_rows) == {
+        'keyField': None,
+        'added': [],
+        'changed': [{'name': 'B'}],
+        'changedIndexes': [1],
+        'removedCount': 1,
+    }
+
+def test_diff_rows_falls_back_to_position_when_a_row_has_no_key():
+    diff = diff_rows([{'id': 1}], [{'id': 1}, {'name': 'no key'}], 'id')
+    
+    assert diff['keyField'] is None
+    assert diff['added'] == [{'name': 'no key'}]
+
+def test_diff_rows_distinguishes_values_by_type():
+    # 1、1.0和True在Python中相等，但写出的JSON不同
+    diff = diff_rows([{'id': 1, 'value': 1}], [{'id': 1, 'value': True}], 'id')
+    
+    assert diff['changed'] == [{'id': 1, 'value': True}]
+
+def test_export_without_patches_in_between_writes_reset(package_dir, tmp_path):
+    export(tmp_path, item_sheet({'id': 1, 'name': 'v10'}))
+    table_folder = export(tmp_path, item_sheet({'id': 1, 'name': 'v11'}))
+    # 中间一次没有记录版本的导出，磁盘上的数据文件不再是版本2
+    assert split_sheets_data(item_sheet({'id': 1, 'name': 'v12'}), 'Wb', tmp_path / 'json', tmp_path / 'cs')
+    export(tmp_path, item_sheet({'id': 1, 'name': 'v13'}))
+    
+    assert read_json(table_folder / 'patches' / 'item.3.json') == \
+        {'sheet': 'Item', 'fromVersion': 2, 'toVersion': 3, 'reset': True}
+
+@pytest.mark.parametrize('stream', [False, True], ids=['memory', 'stream'])
+def test_previous_rows_are_read_only_for_changed_sheets(package_dir, tmp_path, monkeypatch, stream):
+    loaded = []
+    
+    def load_previous_rows(data_file):
+        loaded.append(data_file.name)
+        return sheet_patch.load_previous_rows(data_file)
+    monkeypatch.setattr(json_splitter, 'load_previous_rows', load_previous_rows)
+    
+    data = item_sheet({'id': 1, 'name': 'a'})
+    data['Other'] = [{'id': 'number'}, {'id': 'ID'}, {'id': 1}]
+    assert split_sheets_data(data, 'Wb', tmp_path / 'json', tmp_path / 'cs', patches=True, stream=stream)
+    assert split_sheets_data(data, 'Wb', tmp_path / 'json', tmp_path / 'cs', patches=True, stream=stream)
+    assert loaded == []
+    
+    data['Item'][2] = {'id': 1, 'name': 'b'}
+    assert split_sheets_data(data, 'Wb', tmp_path / 'json', tmp_path / 'cs', patches=True, stream=stream)
+    assert set(loaded) == {'item.json'}
+    patch = read_json(tmp_path / 'json' / 'Wb' / 'patches' / 'item.2.json')
+    assert patch['changed'] == [{'id': 1, 'name': 'b'}]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from conftest import read_tree
+from json_splitter import write_sheet_shards, iter_unique_keys
+from sheet_shard import key_bounds
+
+def item_rows(count):
+    return [{'id': index, 'name': f"item{index}"} for index in range(count)]
+
+def test_write_sheet_shards_splits_rows_and_writes_index(tmp_path):
+    output_files = write_sheet_shards('Item', item_rows(5), tmp_path, 'item', 2, 'id')
+    
+    assert sorted(path.name for path in output_files) == ['item.0.json', 'item.1.json', 'item.2.json', 'item.index.json']
+    assert output_files[tmp_path / 'item.index.json'] == 5
+    index = json.loads((tmp_path / 'item.index.json').read_text(encoding='utf-8'))
+    assert [(shard['file'], shard['rows'], shard['minKey'], shard['maxKey']) for shard in index['shards']] == \
+        [('item.0', 2, 0, 1), ('item.1', 2, 2, 3), ('item.2', 1, 4, 4)]
+    rows = []
+    for shard in index['shards']:
+        rows.extend(json.loads((tmp_path / f"{shard['file']}.json").read_text(encoding='utf-8')))
+    assert rows == item_rows(5)
+
+def test_write_sheet_shards_keeps_existing_files_on_duplicate_key(tmp_path):
+    write_sheet_shards('Item', item_rows(5), tmp_path, 'item', 2, 'id')
+    before = read_tree(tmp_path)
+    
+    # 流式输出时重复的主键在所有行都返回后才报错，此时前面的分片都已生成
+    rows = item_rows(6) + [{'id': 0, 'name': 'duplicate'}]
+    with pytest.raises(ValueError):
+        write_sheet_shards('Item', iter_unique_keys('Item', rows, 'id'), tmp_path, 'item', 2, 'id')
+    
+    assert read_tree(tmp_path) == before
+
+def test_key_bounds():
+    rows = [{'id': 5}, {'id': 2}, {'name': 'no key'}, {'id': 9}]
+    
+    assert key_bounds(rows, 'id') == {'minKey': 2, 'maxKey': 9}
+    assert key_bounds(rows, None) == {}
+    assert key_bounds([{'name': 'a'}], 'id') == {}
+
+def test_key_bounds_maps_interned_keys_back_to_strings():
+    strings = ['zeta', 'alpha', 'mid']
+    
+    assert key_bounds([{'id': 0}, {'id': 1}, {'id': 2}], 'id', strings) == {'minKey': 'alpha', 'maxKey': 'zeta'}
+
+def test_key_bounds_without_order_for_mixed_keys():
+    # 转换失败保留原始字符串的主键与数字无法比较，分片不记录主键范围
+    assert key_bounds([{'id': 1}, {'id': 'x'}], 'id') == {}
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from template_engine import Template, TemplateError
+
+def render(source, context, helpers=None):
+    return Template(source).render(context, helpers)
+
+def test_variables_are_not_escaped():
+    assert render('{{a}} {{{b}}} {{missing}}!', {'a': 'List<int>', 'b': 3}) == 'List<int> 3 !'
+
+def test_each_exposes_loop_variables_and_outer_names():
+    source = '{{#each items}}{{@index}}:{{this.name}}{{#unless @last}},{{/unless}}{{/each}} in {{ns}}'
+    context = {'ns': 'Wb', 'items': [{'name': 'a'}, {'name': 'b'}]}
+    
+    assert render(source, context) == '0:a,1:b in Wb'
+
+def test_this_lookup_is_local_but_bare_name_falls_back_to_outer_context():
+    source = '{{#each items}}[{{this.ns}}|{{ns}}]{{/each}}'
+    
+    assert render(source, {'ns': 'outer', 'items': [{}, {'ns': 'inner'}]}) == '[|outer][inner|inner]'
+
+def test_if_else_and_empty_each_else():
+    source = '{{#if flag}}yes{{else}}no{{/if}} {{#each items}}x{{else}}none{{/each}}'
+    
+    assert render(source, {'flag': True, 'items': []}) == 'yes none'
+    assert render(source, {'flag': 0, 'items': [1]}) == 'no x'
+
+def test_standalone_block_lines_are_removed():
+    source = 'start\n    {{#if flag}}\n    body\n    {{/if}}\nend\n'
+    
+    assert render(source, {'flag': True}) == 'start\n    body\nend\n'
+    assert render(source, {'flag': False}) == 'start\nend\n'
+
+def test_inline_block_tags_keep_their_line():
+    assert render('a {{#if flag}}b{{/if}}\nc', {'flag': True}) == 'a b\nc'
+
+def test_custom_helper_blocks():
+    helpers = {'isString': lambda value: value == 'string'}
+    source = '{{#each fields}}{{#isString this.type}}S{{else}}O{{/isString}}{{/each}}'
+    
+    assert render(source, {'fields': [{'type': 'string'}, {'type': 'number'}]}, helpers) == 'SO'
+    with pytest.raises(TemplateError):
+        render(source, {'fields': [{'type': 'string'}]})
+
+@pytest.mark.parametrize('source, line', [
+    ('{{#if a}}\n{{/each}}', 2),
+    ('x\n{{#each a}}', 2),
+    ('{{else}}', 1),
+])
+def test_syntax_errors_report_line(source, line):
+    with pytest.raises(TemplateError, match=f"第 {line} 行"):
+        Template(source)